@@ -0,0 +1,28 @@
+from api_call.client import APIClient
+from auth.okta_auth import Auth
+
+
+def main():
+    # TODO - provide authorization settings - see README.md for details
+    auth_settings = {}
+
+    # Perform authentication
+    auth = Auth(tenant="test", role="basic", settings=auth_settings)
+
+    # Create the new client - it will execute the required API actions
+    client = APIClient(auth=auth)
+
+    # TODO - provide ids of the submitted activities
+    activity_ids = ["<your_activity_id_1>", "<your_activity_id_2>"]
+
+    # All pending activities are polled together, each one is returned as soon as it finishes
+    for activity in client.activity().as_completed(activity_ids, timeout_minutes=120):
+        print(f"{activity.activityId}: {activity.status.value}")
+
+    # Or wait for all of them at once
+    activities = client.activity().wait_many(activity_ids)
+    print([activity.status.value for activity in activities])
+
+
+if __name__ == "__main__":
+    main()
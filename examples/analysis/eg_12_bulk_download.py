@@ -20,10 +20,7 @@ if not os.path.exists(output_folder):
     os.makedirs(output_folder)
 
 for analysis_name, analysis_id in analysis.items():
-    analysis_data = client.analysis().get_data(analysis_id)
-
-    with open(output_folder + analysis_name + ".json", "w", encoding="utf-8") as f:
-        print(f"Saving {analysis_name} ({analysis_id})...")
-        f.write(analysis_data.decode("utf-8"))
+    print(f"Saving {analysis_name} ({analysis_id})...")
+    client.analysis().get_data(analysis_id, path=output_folder + analysis_name + ".json")
 
 print("Finished bulk download.")
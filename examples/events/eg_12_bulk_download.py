@@ -17,17 +17,16 @@ output_folder = "data_download/"
 events = {p["name"]: p["id"] for p in client.events().list()}
 
 for event_name, event_id in events.items():
-    event_data = client.events().get_data(event_id)
     try:
         filepath = output_folder + event_name
         filepath = filepath.strip()
         if not os.path.exists(os.path.dirname(filepath)):
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
 
-        with open(filepath + ".json", "w", encoding="utf-8") as f:
-            print(f"Saving {event_name} ({event_id})...")
-            f.write(event_data.decode("utf-8"))
+        print(f"Saving {event_name} ({event_id})...")
+        # The payload is streamed straight to the file, it is never held in memory
+        client.events().get_data(event_id, path=filepath + ".json")
     except Exception as e:
-        print()
+        print(f"Failed to download event {event_name} ({event_id}). Reason: '{e}'. Skipping.")
 
 print("Finished bulk download.")
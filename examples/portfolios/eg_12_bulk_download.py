@@ -23,13 +23,10 @@ failed = []
 
 for portfolio_name, portfolio_id in portfolios.items():
     try:
-        portfolio_data = client.portfolios().get_data(portfolio_id)
-
-        with open(
-            output_folder + portfolio_name + ".csv", "w", encoding="utf-8", newline=""
-        ) as f:
-            print(f"Saving {portfolio_name} ({portfolio_id})...")
-            f.write(portfolio_data.decode("utf-8"))
+        print(f"Saving {portfolio_name} ({portfolio_id})...")
+        client.portfolios().get_data(
+            portfolio_id, path=output_folder + portfolio_name + ".csv"
+        )
         succeeded.append(portfolio_name)
     except Exception as e:
         failed.append(portfolio_name)
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+
+DEFAULT_TTL = 300.0
+
+NGRAM = 3
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i: i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class _Snapshot(NamedTuple):
+    assets: List[Dict]
+    by_name: Dict[str, List[int]]
+    by_ngram: Dict[str, Set[str]]
+    loaded_at: Optional[float]
+
+
+class AssetNameCache:
+    """
+    Time limited cache of a collection listing, indexed by asset name.
+
+    Exact lookups use a hash index of the names, substring lookups use a trigram
+    index of the names, so neither scans the listing.
+
+    The listing and its indexes are replaced together, so lookups from other threads
+    never see a partially loaded cache, and 'get' loads the listing once for all the
+    threads finding the cache expired.
+
+    :param ttl: Number of seconds after which the listing has to be refreshed.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._snapshot = _Snapshot([], {}, {}, None)
+        self._generation = 0
+        self._loads = 0
+        self._load_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._snapshot.assets)
+
+    def is_valid(self) -> bool:
+        return self._is_valid(self._snapshot)
+
+    def _is_valid(self, snapshot: _Snapshot) -> bool:
+        return (
+            snapshot.loaded_at is not None
+            and self._clock() - snapshot.loaded_at < self.ttl
+        )
+
+    def invalidate(self):
+        self._generation += 1
+        self._snapshot = self._snapshot._replace(loaded_at=None)
+
+    def get(self, loader: Callable[[], List[Dict]], refresh: bool = False) -> "AssetNameCache":
+        """
+        Loads the listing with 'loader' if the cache is expired (or 'refresh').
+        Concurrent callers wait for one load instead of listing the collection again.
+        """
+        if not refresh and self.is_valid():
+            return self
+
+        loads = self._loads
+        with self._load_lock:
+            # another thread loaded the listing while this one was waiting
+            if self._loads != loads and self.is_valid():
+                return self
+            if not refresh and self.is_valid():
+                return self
+
+            generation = self._generation
+            assets = loader()
+            self.load(assets)
+            # invalidated during the load, the listing may miss the change
+            if self._generation != generation:
+                self._snapshot = self._snapshot._replace(loaded_at=None)
+        return self
+
+    def load(self, assets: List[Dict]):
+        by_name = defaultdict(list)
+        by_ngram = defaultdict(set)
+        for position, asset in enumerate(assets):
+            name = asset["name"]
+            if name not in by_name:
+                for ngram in _ngrams(name):
+                    by_ngram[ngram].add(name)
+            by_name[name].append(position)
+
+        self._snapshot = _Snapshot(assets, dict(by_name), dict(by_ngram), self._clock())
+        self._loads += 1
+
+    def exact(self, asset_name: str) -> List[Dict]:
+        snapshot = self._snapshot
+        return [snapshot.assets[i] for i in snapshot.by_name.get(asset_name, [])]
+
+    def containing(self, text: str) -> List[Dict]:
+        snapshot = self._snapshot
+        if len(text) < NGRAM:
+            names = snapshot.by_name.keys()
+        else:
+            candidates = sorted(
+                (snapshot.by_ngram.get(ngram, set()) for ngram in _ngrams(text)), key=len
+            )
+            names = set.intersection(*candidates)
+
+        positions = sorted(
+            position
+            for name in names
+            if text in name
+            for position in snapshot.by_name[name]
+        )
+        return [snapshot.assets[i] for i in positions]
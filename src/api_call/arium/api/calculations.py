@@ -4,7 +4,6 @@ import time
 from http import HTTPStatus
 from typing import Dict, TYPE_CHECKING, Union
 
-import requests
 from typing_extensions import deprecated
 
 from api_call.arium.api.request import (
@@ -12,8 +11,8 @@ from api_call.arium.api.request import (
     get_data,
     calc_polling,
     get_content_from_url,
-    retry,
 )
+from api_call.arium.api.transport import Transport
 from config.get_logger import get_logger
 
 if TYPE_CHECKING:
@@ -55,7 +54,6 @@ class Calculations:
 
         return upload_url
 
-    @retry(times=10)
     def upload_request(
         self,
         client: "APIClient",
@@ -78,7 +76,7 @@ class Calculations:
         logger.debug(f"Upload request with presigned.")
 
         if presigned:
-            self.upload_response = requests.put(
+            self.upload_response = client.transport.put(
                 url=self._get_presigned_upload(client=client, url=endpoint),
                 data=request,
                 headers={"Content-Type": ""},
@@ -111,12 +109,20 @@ class Calculations:
         return self
 
     def get_results(
-        self, csv_output: bool = True, raw: bool = False, verify: bool = True
+        self,
+        csv_output: bool = True,
+        raw: bool = False,
+        verify: bool = True,
+        transport: Transport = None,
     ):
         if self.presigned:
             for url in self.results_urls:
                 result = get_content_from_url(
-                    url=url, csv_output=csv_output, raw=raw, verify=verify
+                    url=url,
+                    csv_output=csv_output,
+                    raw=raw,
+                    verify=verify,
+                    transport=transport,
                 )
                 yield next(result) if raw else result
         else:
@@ -6,10 +6,12 @@ from typing_extensions import deprecated
 
 from api_call.arium.api.client_assets import AssetsClient
 from api_call.arium.api.exceptions import AriumAPACException
+from api_call.arium.api.poller import CALCULATION_POLLING, PollingPolicy, PollStatus, poll
 from api_call.arium.api.request import (
     get_data,
     asset_list_reports,
     asset_get_report,
+    iter_csv_content,
 )
 from config.constants import COLLECTION_CALCULATIONS
 from config.get_logger import get_logger
@@ -41,10 +43,14 @@ class CalculationsAsset(AssetsClient):
 
         return self.create(asset_name=name, data=data, wait=wait)
 
-    def wait(self, asset_id: str):
-        time.sleep(5.0)
-        if not self.is_ready(asset_id):
-            self.wait(asset_id)
+    def wait(self, asset_id: str, policy: PollingPolicy = CALCULATION_POLLING, timeout: float = None):
+        poll(
+            lambda: PollStatus(self.is_ready(asset_id)),
+            policy=policy,
+            timeout=timeout,
+            key=f"{self.collection}/{asset_id}",
+            on_poll=self.client.transport.hooks.poll_tick,
+        )
 
     def is_ready(self, asset_id: str):
         asset = self.get(asset_id)
@@ -81,11 +87,12 @@ class CalculationsAsset(AssetsClient):
             files = self.list_reports(asset_id=asset["id"])
             if files:
                 for file in files:
-                    data = self.get_report_file(asset_id=asset["id"], file=file["file"])
                     if self.get_type(asset_id) == "boxplot":
-                        return data
-                    for row in data:
-                        yield row
+                        return self.get_report_file(asset_id=asset["id"], file=file["file"])
+                    data = self.get_report_file(
+                        asset_id=asset["id"], file=file["file"], unzip=False, load=False
+                    )
+                    yield from iter_csv_content(data, unzip=file["file"].endswith(".zip"))
 
     def report_binary(self, asset_id: str):
         asset = self.get(asset_id)
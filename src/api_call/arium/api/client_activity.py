@@ -1,18 +1,43 @@
+import io
+import math
+import os
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import Future
+from datetime import datetime
 from enum import Enum
+from http import HTTPStatus
 from io import BytesIO
-from types import MethodType
-from typing import List
-
-import requests
-
-from api_call.arium.api.request import get_content
+from functools import partial
+from typing import BinaryIO, List, Iterable, Iterator, Dict
+
+from requests import Response
+
+from api_call.arium.api.futures import ActivityFuture
+from api_call.arium.api.poller import (
+    ACTIVITY_POLLING,
+    Poller,
+    PollingPolicy,
+    PollStatus,
+    PollTimeoutError,
+    poll,
+)
+from api_call.arium.api.exceptions import AriumAPACResponseException
+from api_call.arium.api.remote_file import is_remote, open_remote_file, tail_range
+from api_call.arium.api.request import DEFAULT_CHUNK_SIZE, get_content, spool_response
+from api_call.arium.api.tracing import Span
 from api_call.arium.model.activity import ActivityList, Activity, ActivitySubmitRequest, ActivityStatus, Report
 from config.get_logger import get_logger
 
 logger = get_logger(__name__)
 
+FINAL_STATUSES = (ActivityStatus.COMPLETED, ActivityStatus.FAILED, ActivityStatus.CANCELED)
+
+# the number of pending activities from which the statuses are read from the activity list
+LIST_THRESHOLD = 10
+
+# the reports larger than this are fetched into a temporary file instead of memory
+REPORT_SPILL_SIZE = 64 * 1024 * 1024
+
 
 class Order(Enum):
     Ascending = 1
@@ -23,33 +48,211 @@ class Sort(Enum):
     StartTime = "startTime"
 
 
+class _StatusTimer:
+    """
+    Records on the span of an activity wait the time the activity spent queued
+    ('queued_seconds') and running ('running_seconds'), as seen by the polls.
+    """
+
+    def __init__(self, span: Span):
+        self._span = span
+        self._start = time.monotonic()
+        self._running_since = None
+
+    def update(self, status: ActivityStatus):
+        now = time.monotonic()
+        if self._running_since is None and status != ActivityStatus.QUEUED:
+            self._running_since = now
+            self._span.set(queued_seconds=round(now - self._start, 3))
+        if self._running_since is not None and status in FINAL_STATUSES:
+            self._span.set(running_seconds=round(now - self._running_since, 3))
+
+
+def _status_value(status) -> str:
+    return status.value if isinstance(status, ActivityStatus) else status
+
+
+def _end_span(span: Span, future: Future):
+    if future.cancelled():
+        span.set(status=ActivityStatus.CANCELED.value)
+    elif future.exception() is not None:
+        span.fail(future.exception())
+    else:
+        span.set(status=_status_value(future.result().status))
+    span.end()
+
+
 class ReportsClient:
 
-    def __init__(self, client: "APIClient", activity_id: str):
+    def __init__(self, client: "APIClient", activity_id: str, spill_size: int = REPORT_SPILL_SIZE):
+        """
+        :param spill_size: The size in bytes above which the fetched reports are kept in a
+            temporary file instead of memory
+        """
         self._client = client
         self._activity_id = activity_id
+        self._spill_size = spill_size
 
     def list(self) -> List[Report]:
         endpoint = f"/{{tenant}}/calculations/assets/{self._activity_id}/reports"
-        response = self._client.get_request(endpoint=endpoint)
-        content = get_content(response=response, get_from_location=False)
+        with self._client.transport.tracer.span("report.list", activity_id=self._activity_id):
+            response = self._client.get_request(endpoint=endpoint)
+            content = get_content(response=response, get_from_location=False)
         # Convert each item to Report
         reports = []
 
         for item in content:
             report = Report.from_dict(item)
-            report._fetch = MethodType(self.fetch, report.file)
+            report._fetch = partial(self.fetch, report.file, size=report.size)
+            report._open = partial(self.open, report.file, size=report.size)
+            report._download = partial(self.download, report.file)
             reports.append(report)
         return reports
 
-    def fetch(self, file_name: str) -> BytesIO:
+    def _link(self, file_name: str) -> str:
         endpoint = f"/{{tenant}}/calculations/assets/{self._activity_id}/reports/{file_name}"
         response = self._client.get_request(endpoint=endpoint)
         content = get_content(response=response, get_from_location=False)
-
-        link = content.get("link")
-        link_response = requests.get(link, allow_redirects=True)
-        return BytesIO(link_response.content)
+        return content.get("link")
+
+    def _get(self, url: str, **kwargs) -> Response:
+        return self._client.transport.get(url, allow_redirects=True, verify=self._client.verify, **kwargs)
+
+    def _spool(self, link_response: Response, size: int = None) -> BinaryIO:
+        if link_response.status_code != HTTPStatus.OK:
+            raise AriumAPACResponseException(link_response)
+        return spool_response(link_response, self._spill_size, size=size)
+
+    def fetch(self, file_name: str, size: int = None) -> BinaryIO:
+        """
+        Downloads the report file in chunks, into memory when it is not larger than
+        'spill_size' bytes, otherwise into a temporary file.
+        :param file_name: The report file
+        :param size: The expected size of the file, when the download does not tell it
+        """
+        with self._client.transport.tracer.span(
+                "report.fetch", activity_id=self._activity_id, file=file_name
+        ) as span:
+            link = self._link(file_name)
+            with self._get(link, stream=True) as link_response:
+                file = self._spool(link_response, size=size)
+
+            span.set(bytes=file.seek(0, io.SEEK_END), spilled=not isinstance(file, BytesIO))
+            file.seek(0)
+            return file
+
+    def download(
+            self, file_name: str, path: str, size: int = None, resume: bool = True,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> int:
+        """
+        Downloads the report file in chunks to '<path>.part', renamed to 'path' once its size
+        is checked. Returns the size of the file.
+        :param file_name: The report file
+        :param path: The downloaded file
+        :param size: The expected size of the file, else the size sent by the storage
+        :param resume: Continue the '.part' file of a previous download and resume the download
+            with a Range request when the connection is interrupted. The download fails after
+            'max_attempts' (of the retry policy) interruptions in a row without progress.
+        :param chunk_size: The size of the written chunks
+        """
+        part = f"{path}.part"
+        policy = self._client.transport.retry_policy
+        with self._client.transport.tracer.span(
+                "report.download", activity_id=self._activity_id, file=file_name
+        ) as span:
+            link = self._link(file_name)
+            if not resume and os.path.exists(part):
+                os.remove(part)
+
+            stalls = 0
+            resumes = 0
+            while True:
+                position = os.path.getsize(part) if os.path.exists(part) else 0
+                if size is not None and position > size:
+                    # not the part of this report
+                    os.remove(part)
+                    position = 0
+                if size is not None and position == size:
+                    break
+
+                try:
+                    size = self._download_part(link, part, position, size, chunk_size)
+                    break
+                except policy.retry_exceptions as e:
+                    received = os.path.getsize(part) if os.path.exists(part) else 0
+                    stalls = 0 if received > position else stalls + 1
+                    if not resume or stalls >= policy.max_attempts:
+                        raise
+                    resumes += 1
+                    delay = policy.backoff(stalls)
+                    logger.warning(
+                        f"Report {file_name} download interrupted at {received} bytes ({e}), "
+                        f"resuming in {delay:.2f}s."
+                    )
+                    policy.sleep(delay)
+
+            received = os.path.getsize(part)
+            span.set(bytes=received, resumes=resumes)
+            if size is not None and received != size:
+                raise ValueError(f"The report {file_name} has {received} bytes, expected {size}.")
+            os.replace(part, path)
+            return received
+
+    def _download_part(self, link: str, part: str, position: int, size: int, chunk_size: int) -> int:
+        """
+        Appends the file from 'position' to the part file. Returns the size of the file, from
+        the response if 'size' is not known.
+        """
+        headers = {"Range": f"bytes={position}-"} if position else {}
+        with self._get(link, headers=headers, stream=True) as link_response:
+            if link_response.status_code == HTTPStatus.OK:
+                # the whole file, the storage ignored the range
+                position = 0
+                length = link_response.headers.get("Content-Length")
+                if size is None and length is not None:
+                    size = int(length)
+            elif link_response.status_code == HTTPStatus.PARTIAL_CONTENT:
+                total = link_response.headers.get("Content-Range", "").rpartition("/")[2]
+                if size is None and total.isdigit():
+                    size = int(total)
+            else:
+                raise AriumAPACResponseException(link_response)
+
+            with open(part, "r+b" if position else "wb") as f:
+                f.seek(position)
+                f.truncate()
+                for chunk in link_response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+        return size
+
+    def open(self, file_name: str, size: int = None) -> BinaryIO:
+        """
+        Opens the report file without downloading it: the parts being read (e.g. the
+        central directory of the zip archive and the selected files) are fetched with HTTP
+        Range requests on the presigned link. The file is downloaded as by 'fetch' when the
+        storage does not support Range requests.
+        :param file_name: The report file
+        :param size: The expected size of the file, when the download does not tell it
+        """
+        with self._client.transport.tracer.span(
+                "report.open", activity_id=self._activity_id, file=file_name
+        ) as span:
+            link = self._link(file_name)
+            with self._get(link, headers=tail_range(), stream=True) as link_response:
+                file = open_remote_file(self._get, link, link_response)
+                if file is None and link_response.status_code != HTTPStatus.PARTIAL_CONTENT:
+                    # the storage ignored the range and sends the whole file
+                    file = self._spool(link_response, size=size)
+
+            if file is None:
+                # a partial content without the size of the file
+                with self._get(link, stream=True) as link_response:
+                    file = self._spool(link_response, size=size)
+
+            span.set(remote=is_remote(file))
+            file.seek(0)
+            return file
 
 
 class ActivityClient:
@@ -73,29 +276,21 @@ class ActivityClient:
 
     def submit(self, activity_submit_request: ActivitySubmitRequest, wait: bool = False,
                timeout_minutes: int = 60) -> Activity:
-        endpoint = f"/{{tenant}}/activity"
-        data = activity_submit_request.to_dict()
-        print(data)
-        response = self._client.post_request(endpoint=endpoint, json=data)
-        content: dict = get_content(response=response, get_from_location=False)
+        with self._client.transport.tracer.span("activity.submit", wait=wait) as span:
+            activity_id = self._post_activity(activity_submit_request)
+            span.set(activity_id=activity_id)
 
-        if not (activity_id := content.get("data", {}).get("activityId")):
-            raise ValueError("Activity ID is not returned. Response is missing 'activityId' field.")
+            if not wait:
+                return self.get(activity_id=activity_id)
 
-        if not wait:
-            return self.get(activity_id=activity_id)
+            return self.wait(activity_id=activity_id, timeout_minutes=timeout_minutes)
 
-        return self.wait(activity_id=activity_id, timeout_minutes=timeout_minutes)
-
-    def wait(self, activity_id: str, timeout_minutes: int = 60) -> Activity:
+    def wait(self, activity_id: str, timeout_minutes: int = 60, policy: PollingPolicy = ACTIVITY_POLLING) -> Activity:
         get_logger().info(f"Waiting for activity completion, start time: {datetime.now()}")
         startTime = datetime.now()
+        tracer = self._client.transport.tracer
 
-        timeout_limit = datetime.now() + timedelta(minutes=timeout_minutes)
-        while True:
-            if datetime.now() > timeout_limit:
-                raise TimeoutError(f"Activity polling timed out after {timeout_minutes} minutes")
-
+        def check() -> PollStatus:
             activity = self.get(activity_id=activity_id)
 
             activity_status = activity.status
@@ -103,19 +298,171 @@ class ActivityClient:
             if not isinstance(activity_status, ActivityStatus):
                 activity_status = ActivityStatus(activity_status)
 
-            match activity_status:
-                case ActivityStatus.FAILED:
-                    return activity
-                case ActivityStatus.CANCELED:
-                    return activity
-                case ActivityStatus.COMPLETED:
-                    return activity
-                case _:
-                    # Continue polling for other statuses (QUEUED, RUNNING, etc.)
-                    time.sleep(15)
-                    elapsed = datetime.now() - startTime
-                    elapsed_str = str(elapsed).split(".", 1)[0]  # HH:MM:SS
-                    get_logger().info(f"Activity status: {activity_status}, time elapsed: {elapsed_str}. Sleeping for 15 seconds.")
+            timer.update(activity_status)
+            if activity_status in FINAL_STATUSES:
+                return PollStatus(True, activity)
+
+            # Continue polling for other statuses (QUEUED, RUNNING, etc.)
+            elapsed = datetime.now() - startTime
+            elapsed_str = str(elapsed).split(".", 1)[0]  # HH:MM:SS
+            get_logger().info(f"Activity status: {activity_status}, time elapsed: {elapsed_str}.")
+            return PollStatus(False, activity)
+
+        with tracer.span("activity.wait", activity_id=activity_id) as span:
+            timer = _StatusTimer(span)
+            try:
+                activity = poll(
+                    check,
+                    policy=policy,
+                    timeout=timeout_minutes * 60,
+                    key=activity_id,
+                    on_poll=self._client.transport.hooks.poll_tick,
+                )
+            except PollTimeoutError:
+                raise TimeoutError(f"Activity polling timed out after {timeout_minutes} minutes") from None
+            span.set(status=_status_value(activity.status))
+            return activity
+
+    def as_completed(
+            self,
+            activity_ids: Iterable[str],
+            timeout_minutes: int = 60,
+            policy: PollingPolicy = ACTIVITY_POLLING,
+            page_size: int = 100,
+            list_threshold: int = LIST_THRESHOLD,
+    ) -> Iterator[Activity]:
+        """
+        Yields the activities as they reach COMPLETED, FAILED or CANCELED.
+
+        All pending activities are polled together. When at least 'list_threshold' of them
+        are pending, their statuses are read from the pages of the activity list instead of
+        one request per activity; the activities not found on the pages are requested by id.
+        """
+        poller = Poller(
+            policy=policy,
+            batch_check=partial(
+                self._check_many, page_size=page_size, list_threshold=list_threshold
+            ),
+            on_poll=self._client.transport.hooks.poll_tick,
+        )
+        for activity_id in dict.fromkeys(activity_ids):
+            poller.watch(activity_id, timeout=timeout_minutes * 60)
+
+        get_logger().info(f"Waiting for {len(poller)} activities.")
+        try:
+            for _, activity in poller.as_completed():
+                get_logger().info(
+                    f"Activity {activity.activityId} finished with status: {activity.status}, "
+                    f"{len(poller)} pending."
+                )
+                yield activity
+        except PollTimeoutError as e:
+            raise TimeoutError(
+                f"Activity {e.key} polling timed out after {timeout_minutes} minutes"
+            ) from None
+
+    def wait_many(
+            self,
+            activity_ids: Iterable[str],
+            timeout_minutes: int = 60,
+            policy: PollingPolicy = ACTIVITY_POLLING,
+            page_size: int = 100,
+            list_threshold: int = LIST_THRESHOLD,
+    ) -> List[Activity]:
+        """
+        Waits for all the activities, returns them in the order of 'activity_ids'.
+        """
+        activity_ids = list(activity_ids)
+        activities = {
+            activity.activityId: activity
+            for activity in self.as_completed(
+                activity_ids,
+                timeout_minutes=timeout_minutes,
+                policy=policy,
+                page_size=page_size,
+                list_threshold=list_threshold,
+            )
+        }
+        return [activities[activity_id] for activity_id in activity_ids]
+
+    def submit_async(
+            self,
+            activity_submit_request: ActivitySubmitRequest,
+            timeout_minutes: int = 60,
+            policy: PollingPolicy = ACTIVITY_POLLING,
+    ) -> ActivityFuture:
+        """
+        Submits the activity and returns a future of its final Activity, polled by the
+        background poller of the client. Cancelling the future cancels the activity.
+        """
+        with self._client.transport.tracer.span("activity.submit", wait=False) as span:
+            activity_id = self._post_activity(activity_submit_request)
+            span.set(activity_id=activity_id)
+        return self.wait_async(activity_id, timeout_minutes=timeout_minutes, policy=policy)
+
+    def wait_async(
+            self,
+            activity_id: str,
+            timeout_minutes: int = 60,
+            policy: PollingPolicy = ACTIVITY_POLLING,
+    ) -> ActivityFuture:
+        """
+        Returns a future of the final Activity, polled by the background poller of the client.
+        """
+
+        tracer = self._client.transport.tracer
+        # polled by the background thread, the span is made current for every poll
+        span = tracer.start_span("activity.wait", activity_id=activity_id)
+        timer = _StatusTimer(span)
+
+        def check() -> PollStatus:
+            with tracer.use(span):
+                activity = self.get(activity_id=activity_id)
+            span.add("polls")
+            timer.update(activity.status)
+            logger.debug(f"Activity {activity_id} status: {activity.status}.")
+            return PollStatus(activity.status in FINAL_STATUSES, activity)
+
+        future = ActivityFuture(activity_id, on_cancel=partial(self.cancel, activity_id))
+        future.add_done_callback(partial(_end_span, span))
+        return self._client.background().watch(
+            future, check, timeout=timeout_minutes * 60, policy=policy
+        )
+
+    def _post_activity(self, activity_submit_request: ActivitySubmitRequest) -> str:
+        endpoint = f"/{{tenant}}/activity"
+        data = activity_submit_request.to_dict()
+        logger.debug(f"Submitting activity: {data}")
+        response = self._client.post_request(endpoint=endpoint, json=data)
+        content: dict = get_content(response=response, get_from_location=False)
+
+        if not (activity_id := content.get("data", {}).get("activityId")):
+            raise ValueError("Activity ID is not returned. Response is missing 'activityId' field.")
+        return activity_id
+
+    def _check_many(
+            self, activity_ids: List[str], page_size: int, list_threshold: int
+    ) -> Dict[str, PollStatus]:
+        activities = {}
+        if len(activity_ids) >= list_threshold:
+            pending = set(activity_ids)
+            max_pages = math.ceil(len(activity_ids) / page_size) + 1
+            for page in range(1, max_pages + 1):
+                activity_list = self.list(limit=page_size, page=page)
+                for activity in activity_list.list:
+                    if activity.activityId in pending:
+                        activities[activity.activityId] = activity
+                if len(activities) == len(pending) or len(activity_list.list) < page_size:
+                    break
+
+        for activity_id in activity_ids:
+            if activity_id not in activities:
+                activities[activity_id] = self.get(activity_id=activity_id)
+
+        return {
+            activity_id: PollStatus(activity.status in FINAL_STATUSES, activity)
+            for activity_id, activity in activities.items()
+        }
 
     def get(self, activity_id: str) -> Activity:
         endpoint = f"/{{tenant}}/activity/{activity_id}"
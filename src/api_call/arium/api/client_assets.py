@@ -1,8 +1,18 @@
 import hashlib
 import json
-from typing import Optional, List, Dict, TYPE_CHECKING, Union
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Optional, List, Dict, TYPE_CHECKING, Union, Iterator, BinaryIO
 
 from api_call.arium.api import request
+from api_call.arium.api.asset_cache import AssetNameCache
+from api_call.arium.api.futures import OperationFuture
+from api_call.arium.api.poller import ASSET_POLLING, PollingPolicy
+from api_call.arium.api.request import ASSET_PENDING_STATUSES
+from api_call.arium.api.text_file import NormalizedTextFile
+from api_call.arium.api.upload_index import UploadIndex
 from api_call.arium.util.perturbations import (
     PerturbationsParameters,
     add_perturbations_parameters_to_event,
@@ -15,16 +25,28 @@ from config.constants import (
     COLLECTION_ANALYSES,
     COLLECTION_CURRENCY_TABLES,
 )
+from config.get_logger import get_logger
 
 if TYPE_CHECKING:
     from api_call.client import APIClient
 
+logger = get_logger(__name__)
+
 
 class AssetsClient:
-    def __init__(self, client: "APIClient", collection: str):
+    def __init__(
+        self,
+        client: "APIClient",
+        collection: str,
+        upload_index: UploadIndex = None,
+    ):
         self.client = client
         self.collection = collection
-        self._list = None
+        self.upload_index = upload_index
+        self._name_cache = AssetNameCache()
+        # the (name, digest) of the uploaded assets still processing, by asset id
+        self._pending_uploads: Dict[str, tuple] = {}
+        self._pending_lock = threading.Lock()
 
     def list(self, latest: bool = True) -> Optional[List]:
         return request.asset_list(
@@ -33,6 +55,40 @@ class AssetsClient:
             latest=latest,
         )
 
+    def iter(
+        self, latest: bool = True, page_size: int = 100, prefetch: bool = True
+    ) -> Iterator[Dict]:
+        """
+        Lazily iterates over the assets of the collection, page by page.
+        With 'prefetch', the next page is requested while the current one is consumed.
+        """
+        fetch_page = partial(
+            request.asset_list_page,
+            client=self.client,
+            collection=self.collection,
+            latest=latest,
+            limit=page_size,
+        )
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_page = executor.submit(fetch_page, page=1) if prefetch else None
+            page_number = 1
+            fetched = 0
+            while True:
+                content = next_page.result() if prefetch else fetch_page(page=page_number)
+                items = content["content"]
+                fetched += len(items)
+
+                has_next = items and len(items) >= page_size and fetched < content["total"]
+                if has_next and prefetch:
+                    next_page = executor.submit(fetch_page, page=page_number + 1)
+
+                yield from items
+
+                if not has_next:
+                    return
+                page_number += 1
+
     def get(self, asset_id: str) -> Optional[Dict]:
         return request.asset_get(
             client=self.client,
@@ -40,14 +96,28 @@ class AssetsClient:
             asset_id=asset_id,
         )
 
-    def get_by_name(self, asset_name: str, exact=True, refresh=True):
-        if self._list is None or refresh:
-            self._list = self.list()
+    def get_by_name(self, asset_name: str, exact=True, refresh=False):
+        """
+        Finds the assets by exact name or by a part of the name. The listing is cached
+        for 'name_cache_ttl' seconds and dropped by create, rename, delete and copy.
+        """
+        cache = self._name_cache.get(self.list, refresh=refresh)
 
         if exact:
-            return [item for item in self._list if asset_name == item["name"]]
+            return cache.exact(asset_name)
+
+        return cache.containing(asset_name)
 
-        return [item for item in self._list if asset_name in item["name"]]
+    @property
+    def name_cache_ttl(self) -> float:
+        return self._name_cache.ttl
+
+    @name_cache_ttl.setter
+    def name_cache_ttl(self, ttl: float):
+        self._name_cache.ttl = ttl
+
+    def invalidate_cache(self):
+        self._name_cache.invalidate()
 
     def versions(self, asset_id: str) -> Optional[List]:
         return request.asset_versions(
@@ -59,29 +129,147 @@ class AssetsClient:
     def create(
         self, asset_name: str, data: Union[Dict, str], wait=True, presigned=False
     ) -> Optional[Dict]:
-        return request.asset_post(
-            client=self.client,
-            collection=self.collection,
-            asset_name=asset_name,
-            data=data,
-            presigned=presigned,
-            wait=wait,
+        params = None
+        if self.upload_index is not None:
+            digest = hashlib.sha1(request.encode_payload(data)).hexdigest()
+            if (asset := self._find_upload(asset_name, digest)) is not None:
+                return asset
+            params = {"digest": digest, "digest_algorithm": "sha1"}
+
+        try:
+            asset = request.asset_post(
+                client=self.client,
+                collection=self.collection,
+                asset_name=asset_name,
+                data=data,
+                params=params,
+                presigned=presigned,
+                wait=wait,
+            )
+        finally:
+            self.invalidate_cache()
+        self._add_upload(asset_name, params, asset)
+        return asset
+
+    def create_async(
+        self,
+        asset_name: str,
+        *args,
+        timeout: float = None,
+        policy: PollingPolicy = ASSET_POLLING,
+        **kwargs,
+    ) -> OperationFuture:
+        """
+        Uploads the asset in the background and returns a future of the processed asset.
+        The arguments are the same as in 'create'. Cancelling the future stops waiting,
+        an upload which already started is not rolled back.
+        """
+        background = self.client.background()
+        upload = background.submit(self.create, asset_name, *args, wait=False, **kwargs)
+        future = OperationFuture(f"{self.collection}/{asset_name}", on_cancel=upload.cancel)
+
+        def uploaded(upload):
+            if upload.cancelled() or future.done():
+                return
+            if (e := upload.exception()) is not None:
+                future.set_exception(e)
+                return
+            asset_id = upload.result()["id"]
+            check = partial(request.asset_poll_status, self.client, self.collection, asset_id)
+            future.add_done_callback(partial(self._upload_processed, asset_id))
+            background.watch(future, check, timeout=timeout, policy=policy)
+
+        upload.add_done_callback(uploaded)
+        return future
+
+    def _find_upload(self, asset_name: str, digest: str) -> Optional[Dict]:
+        """
+        Returns the asset already uploaded with the same name and content, if indexed.
+        The asset is reused only if it is still the latest asset with this name (another
+        content may have been uploaded since). It is read from the server, with 'verify'
+        it is reused only if it is not in error and has the same name.
+        """
+        workspace = self.client.get_workspace()
+        indexed = self.upload_index.lookup(workspace, self.collection, digest, asset_name)
+        if indexed is None:
+            return None
+
+        asset_id = indexed["id"]
+        try:
+            current = [asset["id"] for asset in self.get_by_name(asset_name, refresh=True)]
+            asset = self.get(asset_id) if current == [asset_id] else None
+        except Exception:
+            asset = None
+        if asset is None or (
+                self.upload_index.verify and (asset.get("status") == "error" or asset.get("name") != asset_name)
+        ):
+            logger.info(f"Indexed {self.collection}/{asset_name} is not valid, uploading.")
+            self.upload_index.remove(workspace, self.collection, asset_id)
+            return None
+
+        logger.info(f"Skipped upload, {self.collection}/{asset_name} content is unchanged ({asset_id}).")
+        return asset
+
+    def _add_upload(self, asset_name: str, params: Optional[Dict], asset: Optional[Dict]):
+        """
+        Indexes the uploaded asset once it is processed without error. An asset still
+        processing (created without waiting) is indexed by 'create_async' when processed.
+        """
+        if self.upload_index is None or not params or not asset:
+            return
+        status = asset.get("status")
+        if status in ASSET_PENDING_STATUSES:
+            with self._pending_lock:
+                self._pending_uploads[asset["id"]] = (asset_name, params["digest"])
+            return
+        if status is None or status == "error":
+            return
+        self.upload_index.add(
+            self.client.get_workspace(),
+            self.collection,
+            params["digest"],
+            asset_name,
+            asset["id"],
         )
 
+    def _upload_processed(self, asset_id: str, future: Future):
+        with self._pending_lock:
+            pending = self._pending_uploads.pop(asset_id, None)
+        if pending is None or future.cancelled() or future.exception() is not None:
+            return
+        asset_name, digest = pending
+        self._add_upload(asset_name, {"digest": digest}, future.result())
+
+    def _remove_upload(self, asset_id: str):
+        with self._pending_lock:
+            self._pending_uploads.pop(asset_id, None)
+        if self.upload_index is not None:
+            self.upload_index.remove(self.client.get_workspace(), self.collection, asset_id)
+
     def delete(self, asset_id: str) -> Optional[Dict]:
-        return request.asset_delete(
-            client=self.client,
-            collection=self.collection,
-            asset_id=asset_id,
-        )
+        try:
+            content = request.asset_delete(
+                client=self.client,
+                collection=self.collection,
+                asset_id=asset_id,
+            )
+        finally:
+            self.invalidate_cache()
+        self._remove_upload(asset_id)
+        return content
 
     def rename(self, asset_id: str, asset_name: str):
-        return request.asset_rename(
-            client=self.client,
-            collection=self.collection,
-            asset_id=asset_id,
-            asset_name=asset_name,
-        )
+        try:
+            content = request.asset_rename(
+                client=self.client,
+                collection=self.collection,
+                asset_id=asset_id,
+                asset_name=asset_name,
+            )
+        finally:
+            self.invalidate_cache()
+        self._remove_upload(asset_id)
+        return content
 
     def set_description(self, asset_id: str, description: str):
         return request.asset_set_description(
@@ -98,21 +286,45 @@ class AssetsClient:
             asset_id=asset_id,
         )
 
-    def get_data(self, asset_id: str) -> Optional[bytes]:
+    def get_data(
+        self,
+        asset_id: str,
+        path: str = None,
+        chunk_size: int = request.DEFAULT_CHUNK_SIZE,
+    ) -> Optional[Union[bytes, str]]:
+        """
+        Returns the data payload. If 'path' is given, the payload is streamed
+        to the file in chunks and the path is returned instead.
+        """
         return request.asset_get_data(
             client=self.client,
             collection=self.collection,
             asset_id=asset_id,
+            path=path,
+            chunk_size=chunk_size,
         )
 
-    def copy(self, asset_id: str, asset_name: str) -> Optional[Dict]:
-        return request.asset_copy(
+    def iter_data(
+        self, asset_id: str, chunk_size: int = request.DEFAULT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        return request.asset_iter_data(
             client=self.client,
             collection=self.collection,
             asset_id=asset_id,
-            asset_name=asset_name,
+            chunk_size=chunk_size,
         )
 
+    def copy(self, asset_id: str, asset_name: str) -> Optional[Dict]:
+        try:
+            return request.asset_copy(
+                client=self.client,
+                collection=self.collection,
+                asset_id=asset_id,
+                asset_name=asset_name,
+            )
+        finally:
+            self.invalidate_cache()
+
     def lock(self, asset_id: str):
         return request.asset_lock(
             client=self.client,
@@ -143,13 +355,16 @@ class AssetsClient:
     def copy_workspace(
         self, from_tenant: str, to_tenant: str, asset_ids: List[str] = None
     ) -> Optional[Dict]:
-        return request.asset_copy_workspace(
-            client=self.client,
-            collection=self.collection,
-            from_tenant=from_tenant,
-            to_tenant=to_tenant,
-            asset_ids=asset_ids,
-        )
+        try:
+            return request.asset_copy_workspace(
+                client=self.client,
+                collection=self.collection,
+                from_tenant=from_tenant,
+                to_tenant=to_tenant,
+                asset_ids=asset_ids,
+            )
+        finally:
+            self.invalidate_cache()
 
     def export_data(
         self, asset_ids: List[str], export_name: str = None, output_folder: str = ""
@@ -163,12 +378,15 @@ class AssetsClient:
         )
 
     def import_data(self, path: str) -> Optional[Dict]:
-        return request.asset_import(
-            client=self.client,
-            collection=self.collection,
-            path=path,
-            verify=self.client.verify,
-        )
+        try:
+            return request.asset_import(
+                client=self.client,
+                collection=self.collection,
+                path=path,
+                verify=self.client.verify,
+            )
+        finally:
+            self.invalidate_cache()
 
 
 class PortfoliosClient(AssetsClient):
@@ -179,29 +397,53 @@ class PortfoliosClient(AssetsClient):
         self,
         asset_name: str,
         data: str = None,
-        file: str = None,
+        file: Union[str, BinaryIO] = None,
         csv_date_format: str = None,
         has_header: bool = True,
         wait: bool = True,
     ) -> Optional[Dict]:
-        if data is None:
-            if file is None:
-                raise Exception("'data' of 'file' parameter is required.")
-            with open(file, encoding="utf8") as f:
-                data = f.read()
-
+        """
+        Creates the portfolio from 'data' or 'file' (path or binary file object).
+        The file is streamed to the presigned url, it is never loaded into memory.
+        """
+        if data is None and file is None:
+            raise Exception("'data' of 'file' parameter is required.")
+
+        file = file if data is None else None
         csv_date_format = "dd/mm/yyyy" if csv_date_format is None else csv_date_format
-        digest = hashlib.sha1(data.encode("utf-8").strip()).hexdigest()
-        return request.asset_post(
-            client=self.client,
-            collection=self.collection,
-            asset_name=asset_name,
-            data=data,
-            params={"csv_date_format": csv_date_format, "csv_has_header": has_header, "digest": digest, "digest_algorithm": "sha1"},
-            presigned=True,
-            wait=wait,
-            verify=self.client.verify,
-        )
+        params = {"csv_date_format": csv_date_format, "csv_has_header": has_header}
+
+        if self.upload_index is not None:
+            digest = self._digest(data, file)
+            if (asset := self._find_upload(asset_name, digest)) is not None:
+                return asset
+            params.update({"digest": digest, "digest_algorithm": "sha1"})
+
+        try:
+            asset = request.asset_post(
+                client=self.client,
+                collection=self.collection,
+                asset_name=asset_name,
+                data=data,
+                file=file,
+                params=params,
+                presigned=True,
+                wait=wait,
+                verify=self.client.verify,
+            )
+        finally:
+            self.invalidate_cache()
+        self._add_upload(asset_name, params, asset)
+        return asset
+
+    @staticmethod
+    def _digest(data: Optional[str], file: Union[str, BinaryIO, None]) -> str:
+        if file is None:
+            return hashlib.sha1(request.encode_payload(data)).hexdigest()
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, "rb") as f:
+                return request.file_digest(NormalizedTextFile(f))
+        return request.file_digest(NormalizedTextFile(file))
 
 
 class EventsClient(AssetsClient):
@@ -252,24 +494,25 @@ class SizesClient(AssetsClient):
         self,
         asset_name: str,
         data: str = None,
-        file: str = None,
+        file: Union[str, BinaryIO] = None,
         has_header: bool = True,
         wait: bool = True,
     ) -> Optional[Dict]:
-        if data is None:
-            if file is None:
-                raise Exception("'data' of 'file' parameter is required.")
-            with open(file) as f:
-                data = f.read()
-
-        return request.asset_post(
-            client=self.client,
-            collection=self.collection,
-            asset_name=asset_name,
-            data=data,
-            params={"csv_has_header": has_header},
-            presigned=True,
-        )
+        if data is None and file is None:
+            raise Exception("'data' of 'file' parameter is required.")
+
+        try:
+            return request.asset_post(
+                client=self.client,
+                collection=self.collection,
+                asset_name=asset_name,
+                data=data,
+                file=file if data is None else None,
+                params={"csv_has_header": has_header},
+                presigned=True,
+            )
+        finally:
+            self.invalidate_cache()
 
 
 class ProgrammesClient(AssetsClient):
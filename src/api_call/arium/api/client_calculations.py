@@ -66,7 +66,12 @@ class CalculationsClient:
                 endpoint=endpoint,
             )
             .pooling(client=self.client)
-            .get_results(csv_output=csv_output, raw=raw, verify=self.client.verify)
+            .get_results(
+                csv_output=csv_output,
+                raw=raw,
+                verify=self.client.verify,
+                transport=self.client.transport,
+            )
         )
 
         yield from results
@@ -93,7 +98,7 @@ class CalculationsClient:
                 endpoint=endpoint,
             )
             .pooling(self.client)
-            .get_results(csv_output=csv_output, raw=raw)
+            .get_results(csv_output=csv_output, raw=raw, transport=self.client.transport)
         )
 
         return next(results)
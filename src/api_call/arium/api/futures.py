@@ -0,0 +1,169 @@
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from api_call.arium.api.hooks import PollEvent
+from api_call.arium.api.poller import Poller, PollingPolicy, PollStatus, PollTimeoutError
+from config.get_logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class OperationFuture(Future):
+    """
+    concurrent.futures.Future of a server side operation (activity, asset upload).
+
+    Supports callbacks, 'result(timeout)' and 'asyncio.wrap_future'. Cancelling the
+    future stops the polling and calls 'on_cancel' (e.g. cancels the activity).
+    """
+
+    def __init__(self, name: str, on_cancel: Callable[[], None] = None):
+        super().__init__()
+        self.name = name
+        self._on_cancel = on_cancel
+        self._on_stop: Optional[Callable[[], None]] = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name} {self._state}>"
+
+    def cancel(self) -> bool:
+        if self.done():
+            return False
+
+        if self._on_cancel is not None:
+            try:
+                self._on_cancel()
+            except Exception as e:
+                logger.error(f"Failed to cancel {self.name}: {e}")
+                return False
+
+        if not super().cancel():
+            return False
+        if self._on_stop is not None:
+            self._on_stop()
+        return True
+
+
+class ActivityFuture(OperationFuture):
+    def __init__(self, activity_id: str, on_cancel: Callable[[], None] = None):
+        super().__init__(name=activity_id, on_cancel=on_cancel)
+        self.activity_id = activity_id
+
+
+class BackgroundPoller:
+    """
+    Daemon thread polling the pending operations of a client in one loop and
+    completing their futures, plus a small worker pool for blocking start up work
+    (e.g. uploads) of the non blocking calls.
+
+    :param policy: Default backoff policy of the polled operations.
+    :param max_workers: The number of workers running the start up work.
+    :param on_poll: Callback receiving a PollEvent after every poll.
+    """
+
+    def __init__(
+            self,
+            policy: PollingPolicy = None,
+            max_workers: int = DEFAULT_MAX_WORKERS,
+            on_poll: Callable[[PollEvent], None] = None,
+    ):
+        self._poller = Poller(policy=policy, on_poll=on_poll)
+        self._futures: Dict[OperationFuture, OperationFuture] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="arium-background"
+        )
+
+    def __len__(self) -> int:
+        return len(self._poller)
+
+    def close(self):
+        """
+        Cancels the pending futures (without cancelling the operations) and the queued work.
+        """
+        with self._condition:
+            futures = list(self._futures)
+            for future in futures:
+                self._poller.unwatch(future)
+            self._futures.clear()
+        for future in futures:
+            Future.cancel(future)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fun, *args, **kwargs) -> Future:
+        """
+        Runs the blocking function in the worker pool.
+        """
+        return self._executor.submit(fun, *args, **kwargs)
+
+    def watch(
+            self,
+            future: OperationFuture,
+            check: Callable[[], PollStatus],
+            timeout: float = None,
+            policy: PollingPolicy = None,
+    ) -> OperationFuture:
+        """
+        Polls 'check' in the background and completes the future with its final value.
+        """
+        if future.done():
+            return future
+
+        future._on_stop = lambda: self._unwatch(future)
+        with self._condition:
+            self._futures[future] = future
+            self._poller.watch(future, check, timeout=timeout, policy=policy)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="arium-poller", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+        return future
+
+    def _unwatch(self, future: OperationFuture):
+        with self._condition:
+            self._poller.unwatch(future)
+            self._futures.pop(future, None)
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                next_due = self._poller.next_due()
+                if next_due is None:
+                    self._condition.wait()
+                    continue
+                delay = next_due - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+
+            for key, outcome in self._poller.step():
+                with self._condition:
+                    future = self._futures.pop(key, None)
+                if future is None or future.done():
+                    continue
+                try:
+                    self._resolve(future, outcome)
+                except Exception as e:
+                    logger.error(f"Failed to complete {future.name}: {e}")
+
+    @staticmethod
+    def _resolve(future: OperationFuture, outcome):
+        try:
+            if isinstance(outcome, PollTimeoutError):
+                future.set_exception(
+                    TimeoutError(f"{future.name} polling timed out after {outcome.timeout} seconds")
+                )
+            elif isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome.value)
+        except InvalidStateError:
+            # cancelled after the 'done' check
+            pass
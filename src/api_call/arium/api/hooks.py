@@ -0,0 +1,94 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from config.get_logger import get_logger
+
+logger = get_logger(__name__)
+
+BEFORE_REQUEST = "before_request"
+AFTER_RESPONSE = "after_response"
+ON_RETRY = "on_retry"
+ON_POLL = "on_poll"
+
+EVENTS = (BEFORE_REQUEST, AFTER_RESPONSE, ON_RETRY, ON_POLL)
+
+
+@dataclass
+class RequestEvent:
+    """
+    One attempt of an HTTP request. 'status', 'elapsed', 'bytes_received' and 'error'
+    are set when the response (or the error) is received, 'bytes_sent' is then the size
+    of the sent body (a 'json' body is counted only then).
+    """
+
+    method: str
+    url: str
+    family: str
+    attempt: int
+    bytes_sent: int = 0
+    status: Optional[int] = None
+    elapsed: Optional[float] = None
+    bytes_received: int = 0
+    error: Optional[Exception] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RetryEvent:
+    method: str
+    url: str
+    attempt: int
+    delay: float
+    reason: str
+    status: Optional[int] = None
+
+
+@dataclass
+class PollEvent:
+    """
+    One poll of a target: 'delay' is the time until its next poll (0 when done).
+    """
+
+    key: Hashable
+    polls: int
+    done: bool
+    delay: float = 0.0
+
+
+class Hooks:
+    """
+    Instrumentation callbacks of a transport, called with the event of:
+    'before_request' and 'after_response' (RequestEvent), 'on_retry' (RetryEvent)
+    and 'on_poll' (PollEvent). Errors of the callbacks are logged and ignored.
+    """
+
+    def __init__(self):
+        self._callbacks: Dict[str, List[Callable[[Any], None]]] = {name: [] for name in EVENTS}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"Hooks({ {name: len(callbacks) for name, callbacks in self._callbacks.items()} })"
+
+    def add(self, name: str, callback: Callable[[Any], None]):
+        if name not in self._callbacks:
+            raise ValueError(f"Unknown hook '{name}', expected one of: {', '.join(EVENTS)}.")
+        with self._lock:
+            self._callbacks[name] = self._callbacks[name] + [callback]
+
+    def remove(self, name: str, callback: Callable[[Any], None]):
+        with self._lock:
+            self._callbacks[name] = [c for c in self._callbacks[name] if c != callback]
+
+    def has(self, name: str) -> bool:
+        return bool(self._callbacks[name])
+
+    def emit(self, name: str, event: Any):
+        for callback in self._callbacks[name]:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.warning(f"Hook {name} {callback} failed: {e}")
+
+    def poll_tick(self, event: PollEvent):
+        self.emit(ON_POLL, event)
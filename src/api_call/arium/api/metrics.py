@@ -0,0 +1,187 @@
+import bisect
+import json
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from api_call.arium.api.hooks import (
+    AFTER_RESPONSE,
+    ON_POLL,
+    ON_RETRY,
+    Hooks,
+    PollEvent,
+    RequestEvent,
+    RetryEvent,
+)
+
+# upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[0-9a-fA-F-]{8,}$|^\d+$")
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """
+    Groups the urls by endpoint: the ids of the path are replaced with '{id}',
+    the query is dropped.
+    """
+    parts = urlsplit(url)
+    segments = [
+        "{id}" if _ID_SEGMENT.match(segment) else segment
+        for segment in parts.path.split("/")
+    ]
+    return f"{method} {parts.netloc}{'/'.join(segments)}"
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates the quantile as the upper bound of the bucket holding it.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        total = 0
+        for i, count in enumerate(self.counts):
+            total += count
+            if total >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "min": self.min,
+            "max": self.max,
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                **{str(bound): count for bound, count in zip(self.buckets, self.counts)},
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class _Endpoint:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.latency = Histogram(buckets)
+        self.statuses: Dict[str, int] = defaultdict(int)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "requests": self.latency.count,
+            "statuses": dict(self.statuses),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "retries": self.retries,
+            "latency": self.latency.to_dict(),
+        }
+
+
+class MetricsCollector:
+    """
+    In-process metrics of the HTTP calls and the polls of the transports it is installed on:
+    latency histograms, status counts, bytes sent and received and retries by endpoint,
+    and the polls and the time waited between the polls.
+
+    :param buckets: Upper bounds of the latency histogram buckets, in seconds.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._installed: List[Hooks] = []
+        self.reset()
+
+    def __repr__(self) -> str:
+        return f"MetricsCollector(endpoints={len(self._endpoints)})"
+
+    def install(self, hooks: Hooks) -> "MetricsCollector":
+        hooks.add(AFTER_RESPONSE, self.on_response)
+        hooks.add(ON_RETRY, self.on_retry)
+        hooks.add(ON_POLL, self.on_poll)
+        self._installed.append(hooks)
+        return self
+
+    def uninstall(self):
+        for hooks in self._installed:
+            hooks.remove(AFTER_RESPONSE, self.on_response)
+            hooks.remove(ON_RETRY, self.on_retry)
+            hooks.remove(ON_POLL, self.on_poll)
+        self._installed = []
+
+    def reset(self):
+        with self._lock:
+            self._endpoints: Dict[str, _Endpoint] = {}
+            self._polls = 0
+            self._completed_polls = 0
+            self._poll_wait = 0.0
+
+    def _endpoint(self, method: str, url: str) -> _Endpoint:
+        name = endpoint_name(method, url)
+        if name not in self._endpoints:
+            self._endpoints[name] = _Endpoint(self.buckets)
+        return self._endpoints[name]
+
+    def on_response(self, event: RequestEvent):
+        with self._lock:
+            endpoint = self._endpoint(event.method, event.url)
+            if event.elapsed is not None:
+                endpoint.latency.observe(event.elapsed)
+            status = str(event.status) if event.status is not None else type(event.error).__name__
+            endpoint.statuses[status] += 1
+            endpoint.bytes_sent += event.bytes_sent
+            endpoint.bytes_received += event.bytes_received
+
+    def on_retry(self, event: RetryEvent):
+        with self._lock:
+            self._endpoint(event.method, event.url).retries += 1
+
+    def on_poll(self, event: PollEvent):
+        with self._lock:
+            self._polls += 1
+            self._completed_polls += int(event.done)
+            self._poll_wait += event.delay
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            endpoints = {name: endpoint.to_dict() for name, endpoint in self._endpoints.items()}
+            totals = {
+                "requests": sum(e["requests"] for e in endpoints.values()),
+                "retries": sum(e["retries"] for e in endpoints.values()),
+                "bytes_sent": sum(e["bytes_sent"] for e in endpoints.values()),
+                "bytes_received": sum(e["bytes_received"] for e in endpoints.values()),
+                "latency_seconds": round(sum(e["latency"]["sum"] for e in endpoints.values()), 6),
+            }
+            polls = {
+                "polls": self._polls,
+                "completed": self._completed_polls,
+                "wait_seconds": round(self._poll_wait, 6),
+            }
+        return {"totals": totals, "endpoints": endpoints, "polls": polls}
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.snapshot(), **kwargs)
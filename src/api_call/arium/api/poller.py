@@ -0,0 +1,297 @@
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from api_call.arium.api.hooks import PollEvent
+from config.get_logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def parse_retry_after(response) -> Optional[float]:
+    """
+    Returns the number of seconds requested by the 'Retry-After' header, if present.
+    """
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After", None)
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class PollingPolicy:
+    """
+    Exponential backoff between the polls of one target.
+
+    :param initial: The first interval in seconds.
+    :param factor: Multiplier applied to the interval after every poll.
+    :param max_interval: The maximum interval in seconds.
+    :param jitter: Random spread of every interval, as a fraction of the interval.
+    :param timeout: Default number of seconds after which polling gives up.
+    """
+
+    initial: float = 1.0
+    factor: float = 2.0
+    max_interval: float = 30.0
+    jitter: float = 0.2
+    timeout: Optional[float] = None
+
+    def next_interval(self, interval: Optional[float]) -> float:
+        if interval is None:
+            return self.initial
+        return min(interval * self.factor, self.max_interval)
+
+    def delay(self, interval: float, retry_after: Optional[float] = None) -> float:
+        delay = interval * (1 + random.uniform(-self.jitter, self.jitter))
+        delay = min(max(delay, 0.0), self.max_interval)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+ASSET_POLLING = PollingPolicy(initial=0.5, factor=1.5, max_interval=10.0)
+CALCULATION_POLLING = PollingPolicy(initial=1.0, factor=1.5, max_interval=15.0)
+ACTIVITY_POLLING = PollingPolicy(initial=2.0, factor=1.5, max_interval=15.0)
+PDCA_POLLING = PollingPolicy(initial=2.0, factor=1.5, max_interval=15.0)
+
+
+@dataclass
+class PollStatus:
+    """
+    Result of one poll: whether the target is finished, its current value
+    and the server requested delay (seconds) before the next poll.
+    """
+
+    done: bool
+    value: Any = None
+    retry_after: Optional[float] = None
+
+
+class PollTimeoutError(TimeoutError):
+    def __init__(self, key: Hashable, timeout: float):
+        self.key = key
+        self.timeout = timeout
+        super().__init__(f"Polling of {key} timed out after {timeout} seconds")
+
+
+@dataclass
+class _Target:
+    key: Hashable
+    check: Optional[Callable[[], PollStatus]]
+    timeout: Optional[float]
+    deadline: Optional[float]
+    due: float
+    policy: Optional[PollingPolicy] = None
+    interval: Optional[float] = None
+    polls: int = field(default=0)
+
+
+class Poller:
+    """
+    Polls many targets (asset, activity, ... ids) in a single loop.
+
+    Each target has its own exponential backoff with jitter, an optional deadline
+    and honors the 'Retry-After' delay reported by its checks. Targets watched without
+    their own check are polled together with 'batch_check', which receives the list of
+    due keys and returns a dictionary of PollStatus by key.
+
+    :param policy: Backoff policy of the targets.
+    :param batch_check: Function checking many targets with one call.
+    :param on_poll: Callback receiving a PollEvent after every poll of a target.
+    """
+
+    def __init__(
+            self,
+            policy: PollingPolicy = None,
+            batch_check: Callable[[List[Hashable]], Dict[Hashable, PollStatus]] = None,
+            clock: Callable[[], float] = time.monotonic,
+            sleep: Callable[[float], None] = time.sleep,
+            on_poll: Callable[[PollEvent], None] = None,
+    ):
+        self.policy = policy if policy is not None else PollingPolicy()
+        self.batch_check = batch_check
+        self.on_poll = on_poll
+        self._clock = clock
+        self._sleep = sleep
+        self._targets: Dict[Hashable, _Target] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._targets)
+
+    def pending(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._targets)
+
+    def watch(
+            self,
+            key: Hashable,
+            check: Callable[[], PollStatus] = None,
+            timeout: float = None,
+            policy: PollingPolicy = None,
+    ):
+        """
+        Starts polling the target, the first poll is due immediately.
+        The target can use its own 'policy' instead of the poller one.
+        """
+        if check is None and self.batch_check is None:
+            raise ValueError("'check' is required when the poller has no 'batch_check'.")
+
+        policy = policy if policy is not None else self.policy
+        timeout = timeout if timeout is not None else policy.timeout
+        now = self._clock()
+        deadline = now + timeout if timeout is not None else None
+        with self._lock:
+            self._targets[key] = _Target(key, check, timeout, deadline, due=now, policy=policy)
+
+    def unwatch(self, key: Hashable):
+        with self._lock:
+            self._targets.pop(key, None)
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            if not self._targets:
+                return None
+            return min(target.due for target in self._targets.values())
+
+    def step(self) -> List[Tuple[Hashable, Any]]:
+        """
+        Polls all due targets once. Returns the finished targets as (key, outcome) pairs,
+        where outcome is the final PollStatus or the exception which ended the polling.
+        """
+        now = self._clock()
+        with self._lock:
+            due = [target for target in self._targets.values() if target.due <= now]
+
+        statuses: Dict[Hashable, Any] = {}
+        batch = [target.key for target in due if target.check is None]
+        if batch:
+            try:
+                results = self.batch_check(batch)
+                for key in batch:
+                    statuses[key] = results.get(key, PollStatus(False))
+            except Exception as e:
+                statuses.update({key: e for key in batch})
+
+        for target in due:
+            if target.check is not None:
+                try:
+                    statuses[target.key] = target.check()
+                except Exception as e:
+                    statuses[target.key] = e
+
+        finished = []
+        events = []
+        now = self._clock()
+        with self._lock:
+            for target in due:
+                outcome = statuses[target.key]
+                target.polls += 1
+                if isinstance(outcome, Exception) or outcome.done:
+                    finished.append((target.key, outcome))
+                elif target.deadline is not None and now >= target.deadline:
+                    finished.append((target.key, PollTimeoutError(target.key, target.timeout)))
+                else:
+                    target.interval = target.policy.next_interval(target.interval)
+                    delay = target.policy.delay(target.interval, outcome.retry_after)
+                    target.due = now + delay
+                    if target.deadline is not None:
+                        target.due = min(target.due, target.deadline)
+                    logger.debug(f"Polling {target.key} again in {delay:.2f}s.")
+                    events.append(PollEvent(target.key, target.polls, False, target.due - now))
+                    continue
+                self._targets.pop(target.key, None)
+                events.append(PollEvent(target.key, target.polls, True))
+
+        if self.on_poll is not None:
+            for event in events:
+                self.on_poll(event)
+        return finished
+
+    def as_completed(self) -> Iterator[Tuple[Hashable, Any]]:
+        """
+        Yields (key, value) of the targets as they finish, raises the first error.
+        """
+        while True:
+            for key, outcome in self.step():
+                if isinstance(outcome, Exception):
+                    raise outcome
+                yield key, outcome.value
+
+            next_due = self.next_due()
+            if next_due is None:
+                return
+            self._sleep(max(0.0, next_due - self._clock()))
+
+
+def poll(
+        check: Callable[[], PollStatus],
+        policy: PollingPolicy = None,
+        timeout: float = None,
+        key: Hashable = "target",
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        on_poll: Callable[[PollEvent], None] = None,
+) -> Any:
+    """
+    Polls a single target until it is finished and returns its value.
+    """
+    poller = Poller(policy=policy, clock=clock, sleep=sleep, on_poll=on_poll)
+    poller.watch(key, check, timeout=timeout)
+    for _, value in poller.as_completed():
+        return value
+
+
+async def poll_async(
+        check: Callable[[], Awaitable[PollStatus]],
+        policy: PollingPolicy = None,
+        timeout: float = None,
+        key: Hashable = "target",
+        clock: Callable[[], float] = time.monotonic,
+        on_poll: Callable[[PollEvent], None] = None,
+) -> Any:
+    """
+    asyncio version of 'poll', waiting between the polls with 'asyncio.sleep'.
+    """
+    policy = policy if policy is not None else PollingPolicy()
+    timeout = timeout if timeout is not None else policy.timeout
+    deadline = clock() + timeout if timeout is not None else None
+    interval = None
+    polls = 0
+    while True:
+        status = await check()
+        polls += 1
+        if status.done:
+            if on_poll is not None:
+                on_poll(PollEvent(key, polls, True))
+            return status.value
+
+        now = clock()
+        if deadline is not None and now >= deadline:
+            raise PollTimeoutError(key, timeout)
+
+        interval = policy.next_interval(interval)
+        delay = policy.delay(interval, status.retry_after)
+        if deadline is not None:
+            delay = min(delay, deadline - now)
+        if on_poll is not None:
+            on_poll(PollEvent(key, polls, False, delay))
+        await asyncio.sleep(delay)
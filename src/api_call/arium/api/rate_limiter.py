@@ -0,0 +1,217 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+from config.get_logger import get_logger
+
+logger = get_logger(__name__)
+
+FAMILY_ASSETS = "assets"
+FAMILY_ACTIVITY = "activity"
+FAMILY_PDCA_MATCH = "pdca_match"
+FAMILY_PDCA_AUGMENT = "pdca_augment"
+FAMILY_STORAGE = "storage"
+FAMILY_DEFAULT = "default"
+
+def endpoint_family(url: str) -> str:
+    """
+    Returns the endpoint family of an Arium or PDCA API url.
+    """
+    segments = [segment for segment in urlsplit(url).path.split("/") if segment]
+    if "activity" in segments:
+        return FAMILY_ACTIVITY
+    if "assets" in segments:
+        return FAMILY_ASSETS
+    if "match" in segments:
+        return FAMILY_PDCA_MATCH
+    if "augment" in segments:
+        return FAMILY_PDCA_AUGMENT
+    return FAMILY_DEFAULT
+
+
+@dataclass
+class RateLimit:
+    """
+    Limits of one endpoint family.
+
+    :param rate: The sustained number of requests per second, None for no limit.
+    :param burst: The number of requests which can be sent at once after an idle period.
+    :param max_in_flight: The maximum number of requests in progress, None for no limit.
+    """
+
+    rate: Optional[float] = None
+    burst: int = 1
+    max_in_flight: Optional[int] = None
+
+
+DEFAULT_LIMITS = {
+    FAMILY_ASSETS: RateLimit(rate=20, burst=40, max_in_flight=16),
+    FAMILY_ACTIVITY: RateLimit(rate=10, burst=20, max_in_flight=16),
+    FAMILY_PDCA_MATCH: RateLimit(rate=5, burst=10, max_in_flight=8),
+    FAMILY_PDCA_AUGMENT: RateLimit(rate=5, burst=10, max_in_flight=8),
+    FAMILY_STORAGE: RateLimit(rate=None, max_in_flight=32),
+}
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket. 'reserve' takes a token and returns how long the caller
+    has to wait for it, so the waiting is done outside of the lock.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class _Family:
+    def __init__(self, name: str, limit: RateLimit, clock: Callable[[], float]):
+        self.name = name
+        self.limit = limit
+        self.bucket = TokenBucket(limit.rate, limit.burst, clock) if limit.rate else None
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.waited = 0.0
+        self.max_wait = 0.0
+        self.peak_in_flight = 0
+
+    def has_slot(self) -> bool:
+        return self.limit.max_in_flight is None or self.in_flight < self.limit.max_in_flight
+
+    def enter(self, waited: float):
+        self.in_flight += 1
+        self.requests += 1
+        self.waited += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def metrics(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "waited_seconds": round(self.waited, 6),
+            "max_wait_seconds": round(self.max_wait, 6),
+        }
+
+
+class RateLimiter:
+    """
+    Client side rate limiter and concurrency governor of the HTTP calls of a transport.
+
+    Each endpoint family (assets, activity, PDCA match and augment, presigned storage)
+    has its own token bucket and cap of the requests in flight. The families without
+    limits use the 'default' limit. Waiting is done by the calling thread (the
+    AsyncAPIClient calls run in threads).
+
+    :param limits: RateLimit by endpoint family, DEFAULT_LIMITS if not given.
+    :param default: RateLimit of the other endpoints, no limit if not given.
+    """
+
+    def __init__(
+            self,
+            limits: Dict[str, RateLimit] = None,
+            default: RateLimit = None,
+            clock: Callable[[], float] = time.monotonic,
+            sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.limits = dict(limits if limits is not None else DEFAULT_LIMITS)
+        self.default = default if default is not None else RateLimit()
+        self._clock = clock
+        self._sleep = sleep
+        self._families: Dict[str, _Family] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"RateLimiter(limits={self.limits}, default={self.default})"
+
+    def _family(self, name: str) -> _Family:
+        with self._lock:
+            if name not in self._families:
+                limit = self.limits.get(name, self.default)
+                self._families[name] = _Family(name, limit, self._clock)
+            return self._families[name]
+
+    def acquire(self, family: str) -> Callable[[], None]:
+        """
+        Waits for a token and a free slot of the family. Returns the function releasing
+        the slot, which can be called more than once (the slot is released once).
+        """
+        state = self._family(family)
+        start = self._clock()
+        if state.bucket is not None and (delay := state.bucket.reserve()) > 0:
+            self._sleep(delay)
+
+        with state.condition:
+            while not state.has_slot():
+                state.condition.wait()
+            state.enter(self._clock() - start)
+
+        lock = threading.Lock()
+        released = False
+
+        def release():
+            nonlocal released
+            with lock:
+                if released:
+                    return
+                released = True
+            self._exit(state)
+
+        return release
+
+    @contextmanager
+    def limit(self, family: str):
+        """
+        Waits for a token and a free slot of the family, holds the slot until exit.
+        """
+        release = self.acquire(family)
+        try:
+            yield
+        finally:
+            release()
+
+    @staticmethod
+    def _exit(state: _Family):
+        with state.condition:
+            state.in_flight -= 1
+            state.condition.notify()
+
+    def record(self, family: str, status_code: int):
+        """
+        Records the response status, throttled (429) responses are counted.
+        """
+        if status_code == 429:
+            state = self._family(family)
+            with state.condition:
+                state.throttled += 1
+            logger.debug(f"Request of {family} endpoints throttled by the server.")
+
+    def metrics(self) -> Dict[str, Dict]:
+        with self._lock:
+            families = list(self._families.values())
+        result = {}
+        for state in families:
+            with state.condition:
+                result[state.name] = state.metrics()
+        return result
@@ -0,0 +1,125 @@
+import io
+import re
+from http import HTTPStatus
+from typing import Callable, Optional
+
+from requests import Response
+
+from api_call.arium.api.exceptions import AriumAPACResponseException
+
+# the size of the end of the file read by the first request: the end of central directory
+# record of a zip archive (up to 64 KB with its comment) and usually the central directory
+TAIL_SIZE = 256 * 1024
+# the minimum size of the next requests
+BLOCK_SIZE = 1024 * 1024
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+def tail_range(size: int = TAIL_SIZE) -> dict:
+    """
+    The headers of a request of the last 'size' bytes of a file.
+    """
+    return {"Range": f"bytes=-{size}"}
+
+
+class RemoteFile(io.RawIOBase):
+    """
+    Read-only, seekable file over a remote file, read with HTTP Range requests. The end of
+    the file, received before, is kept and read without requests.
+    :param get: The GET request function
+    :param url: The url of the file
+    :param size: The size of the file
+    :param tail: The last bytes of the file
+    """
+
+    def __init__(self, get: Callable[..., Response], url: str, size: int, tail: bytes = b""):
+        super().__init__()
+        self._get = get
+        self._url = url
+        self.size = size
+        self._tail = tail
+        self._tail_start = size - len(tail)
+        self._position = 0
+        # the number of the Range requests and the bytes received
+        self.requests = 0
+        self.received = len(tail)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self.size - self._position)
+        if size <= 0:
+            return 0
+
+        first = self._position
+        if first >= self._tail_start:
+            start = first - self._tail_start
+            data = self._tail[start:start + size]
+        else:
+            data = self._read_range(first, first + size - 1)
+
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def _read_range(self, first: int, last: int) -> bytes:
+        with self._get(self._url, headers={"Range": f"bytes={first}-{last}"}) as response:
+            if response.status_code != HTTPStatus.PARTIAL_CONTENT:
+                raise AriumAPACResponseException(response)
+            self.requests += 1
+            self.received += len(response.content)
+            return response.content
+
+
+def is_remote(file) -> bool:
+    """
+    Whether the file is a remote file opened by 'open_remote_file'.
+    """
+    return isinstance(getattr(file, "raw", None), RemoteFile)
+
+
+def open_remote_file(
+        get: Callable[..., Response], url: str, response: Response, block_size: int = BLOCK_SIZE
+) -> Optional[io.BufferedReader]:
+    """
+    Opens the remote file from the response to a request of its end ('tail_range'). The
+    file is read in blocks of at least 'block_size' bytes. Returns None if the response is
+    not a partial content with the size of the file (the server does not support ranges).
+    :param get: The GET request function
+    :param url: The url of the file
+    :param response: The response to the request of the end of the file
+    :param block_size: The minimum size of the Range requests
+    """
+    if response.status_code != HTTPStatus.PARTIAL_CONTENT:
+        return None
+    match = _CONTENT_RANGE.fullmatch(response.headers.get("Content-Range", "").strip())
+    if match is None:
+        return None
+
+    first, last, size = (int(value) for value in match.groups())
+    tail = response.content
+    if last != size - 1 or len(tail) != last - first + 1:
+        return None
+    return io.BufferedReader(RemoteFile(get, url, size, tail), buffer_size=block_size)
@@ -3,18 +3,30 @@ import csv
 import hashlib
 import json
 import os
-import traceback
+import tempfile
 import zipfile
 from http import HTTPStatus
+from contextlib import ExitStack
+from functools import partial
 from io import BytesIO
-from time import sleep
-from typing import List, Optional, Dict, Union, Generator, Any
+from typing import List, Optional, Dict, Union, Generator, Any, BinaryIO, Iterator
 from typing import TYPE_CHECKING
 from urllib.parse import urlencode
 
-import requests
+from requests import Response
 
 from api_call.arium.api.exceptions import AriumAPACResponseException, exception_handler
+from api_call.arium.api.poller import (
+    ASSET_POLLING,
+    CALCULATION_POLLING,
+    PollingPolicy,
+    PollStatus,
+    parse_retry_after,
+    poll,
+)
+from api_call.arium.api.text_file import NormalizedTextFile
+from api_call.arium.api.transport import Transport, default_transport
+from api_call.arium.api.zip_csv import iter_zip_csv, read_csv_stream
 from config.get_logger import get_logger
 
 if TYPE_CHECKING:
@@ -22,50 +34,12 @@ if TYPE_CHECKING:
 
 logger = get_logger(__name__)
 
+DEFAULT_CHUNK_SIZE = 1024 * 1024
 
-def retry(times):
-    """
-    Retries the wrapped function.
-    :param times: The number of times to repeat
-    """
-
-    def decorator(func):
-        def f(*args, **kwargs):
-            delay = 1
-            attempt = 0
-            max_attempts = times
-            if 'retry' in kwargs:
-                try:
-                    retries = kwargs.get('retry', 1)
-                    del kwargs['retry']
-                    if type(retries) is int:
-                        max_attempts = retries
-                except Exception as e:
-                    logger.warning(f"retry parameter must be an integer")
-                    logger.error(e)
-
-            while attempt < max_attempts:
-                try:
-                    return func(*args, **kwargs)
-                except requests.exceptions.ConnectionError as e:
-                    logger.warning(str(e))
-                    traceback.print_exc()
-                    logger.info(
-                        "Connection error thrown when attempting to run %s, attempt "
-                        "%d of %d" % (func.__name__, attempt + 1, max_attempts)
-                    )
-                    attempt += 1
-                    sleep(delay)
-                    delay *= 2
-            return func(*args, **kwargs)
-
-        return f
-
-    return decorator
-
+# the statuses of an asset being uploaded or processed
+ASSET_PENDING_STATUSES = ("uploading", "processing")
 
 @exception_handler
-@retry(times=10)
 def get_content(
         response,
         accept=None,
@@ -74,6 +48,7 @@ def get_content(
         verify=True,
         csv_content: bool = False,
         unzip: bool = True,
+        transport: Transport = None,
 ) -> Union[bytes, str, Dict]:
     if accept is None:
         accept = [HTTPStatus.OK, HTTPStatus.NO_CONTENT]
@@ -82,7 +57,8 @@ def get_content(
         if get_from_location:
             location_header = response.headers.get("Location", None)
             if location_header:
-                response = requests.get(url=location_header, verify=verify)
+                transport = transport if transport is not None else default_transport()
+                response = transport.get(url=location_header, verify=verify)
         content = response.content
         if not load:
             return content
@@ -90,13 +66,7 @@ def get_content(
             if not csv_content:
                 content = json.loads(response.content)
             else:
-                if unzip:
-                    with zipfile.ZipFile(BytesIO(response.content)) as input_zip:
-                        content = input_zip.read(input_zip.namelist()[0])
-                else:
-                    content = response.content
-
-                content = list(read_csv(content.splitlines(), delimiter=","))
+                content = list(iter_csv_content(content, unzip=unzip, delimiter=","))
 
         except Exception as e:
             logger.debug(e)
@@ -106,6 +76,21 @@ def get_content(
         raise AriumAPACResponseException(response)
 
 
+def iter_csv_content(
+        content: bytes, unzip: bool = True, delimiter: Optional[str] = ","
+) -> Iterator[List[str]]:
+    """
+    Yields the CSV rows of the content, of the first file of the archive with 'unzip'.
+    The rows are decoded incrementally, without a decompressed copy of the content.
+    :param delimiter: The delimiter, None to detect ',' or '|' from the header line
+    """
+    if not unzip:
+        yield from read_csv_stream(BytesIO(content), delimiter=delimiter)
+        return
+    with zipfile.ZipFile(BytesIO(content)) as input_zip:
+        yield from iter_zip_csv(input_zip, members=input_zip.namelist()[0], delimiter=delimiter)
+
+
 def read_csv(data, delimiter: str = ","):
     reader = csv.reader(
         codecs.iterdecode(data, "utf-8"),
@@ -120,23 +105,24 @@ def get_csv_content(response, raw: bool = False, delimiter: str = ","):
     if raw:
         yield response
     else:
-        yield from read_csv(response.content.splitlines(), delimiter=delimiter)
+        yield from read_csv(BytesIO(response.content), delimiter=delimiter)
 
 
-@retry(times=10)
 def get_content_from_url(
         url: str,
         csv_output: bool = False,
         raw: bool = False,
         delimiter: str = ",",
         verify=True,
+        transport: Transport = None,
 ) -> Generator[Any, None, None]:
+    transport = transport if transport is not None else default_transport()
     if csv_output:
-        with requests.get(url, verify=verify) as resp:
+        with transport.get(url, verify=verify) as resp:
             yield from get_csv_content(resp, raw=raw, delimiter=delimiter)
     else:
-        with requests.get(url, verify=verify) as resp:
-            yield resp if raw else get_content(resp)
+        with transport.get(url, verify=verify) as resp:
+            yield resp if raw else get_content(resp, transport=transport)
 
 
 def get_resources(
@@ -157,6 +143,7 @@ def get_resources(
             csv_output=csv_output,
             delimiter=delimiter,
             verify=client.verify,
+            transport=client.transport,
         )
 
 
@@ -256,6 +243,28 @@ def asset_list(
         raise Exception("Unexpected content type: {}.".format(type(content)))
 
 
+@exception_handler
+def asset_list_page(
+        client: "APIClient",
+        collection: str,
+        latest: bool = True,
+        page: int = 1,
+        limit: int = 100,
+) -> Optional[Dict]:
+    endpoint = (
+        f"/{{tenant}}/{collection}/assets?latest={str(latest).lower()}"
+        f"&page={page}&limit={limit}"
+    )
+    response = client.get_request(endpoint=endpoint)
+    content = get_content(response=response)
+
+    if isinstance(content, dict):
+        logger.debug(f"Page {page}: {content['count']} of {content['total']} {collection}.")
+        return content
+    else:
+        raise Exception("Unexpected content type: {}.".format(type(content)))
+
+
 @exception_handler
 def asset_versions(
         client: "APIClient", collection: str, asset_id: str
@@ -400,30 +409,109 @@ def asset_export(
 
 
 @exception_handler
-@retry(times=10)
 def asset_import(
         client: "APIClient", collection: str, path: str, wait: bool = True, verify=True
 ) -> Optional[str]:
-    endpoint = f"/{{tenant}}/{collection}/assets/import"
-    response = client.post_request(endpoint=endpoint)
+    tracer = client.transport.tracer
+    with tracer.span("asset.import", collection=collection, wait=wait) as span:
+        endpoint = f"/{{tenant}}/{collection}/assets/import"
+        response = client.post_request(endpoint=endpoint)
+        location_header = response.headers.get("Location", None)
+
+        content = get_content(response=response, get_from_location=False)
+        span.set(import_id=content.get("id"))
+
+        with open(path) as file:
+            data = file.read().encode("utf-8").strip()
+        with tracer.span("asset.upload", bytes=len(data)):
+            client.transport.put(url=location_header, data=data, verify=verify)
+
+        logger.info("Import request started.")
+
+        if wait:
+            with tracer.span("asset.wait"):
+                return import_polling(
+                    client=client, collection=collection, copy_id=content["id"]
+                )["ids"]
+        return content
+
+
+def _open_data_stream(
+        client: "APIClient",
+        collection: str,
+        asset_id: str,
+        get_from_location: bool = False,
+) -> Response:
+    url_mode = "presigned" if get_from_location else "auto"
+    endpoint = f"/{{tenant}}/{collection}/assets/{asset_id}/payload?assetPayloadMode={url_mode}"
+    response = client.get_request(endpoint=endpoint, stream=True)
+    if response.status_code not in (HTTPStatus.OK, HTTPStatus.NO_CONTENT):
+        response.close()
+        raise AriumAPACResponseException(response)
+
     location_header = response.headers.get("Location", None)
+    if location_header is None:
+        logger.info(f"Streaming DIRECT data payload {collection}/{asset_id}.")
+        return response
 
-    content = get_content(response=response, get_from_location=False)
+    response.close()
+    response = client.transport.get(url=location_header, stream=True, verify=client.verify)
+    if response.status_code != HTTPStatus.OK:
+        response.close()
+        raise AriumAPACResponseException(response)
 
-    with open(path) as file:
-        requests.put(
-            url=location_header,
-            data=file.read().encode("utf-8").strip(),
-            verify=verify,
-        )
+    logger.info(f"Streaming PRESIGNED data payload {collection}/{asset_id}.")
+    return response
 
-    logger.info("Import request started.")
 
-    if wait:
-        return import_polling(
-            client=client, collection=collection, copy_id=content["id"]
-        )["ids"]
-    return content
+def spool_response(
+        response: Response,
+        spill_size: int,
+        size: int = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> BinaryIO:
+    """
+    Reads a streamed response in chunks into a BytesIO when it is not larger than
+    'spill_size' bytes, otherwise into a temporary file (removed when closed).
+    The size is taken from 'Content-Length', else from 'size'; when neither is known
+    the content is spooled, in memory until it exceeds 'spill_size'.
+    Returns the file at position 0.
+    """
+    length = response.headers.get("Content-Length", size)
+    if length is None:
+        file = tempfile.SpooledTemporaryFile(max_size=spill_size)
+    elif int(length) <= spill_size:
+        file = BytesIO()
+    else:
+        file = tempfile.TemporaryFile()
+
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            file.write(chunk)
+    except BaseException:
+        file.close()
+        raise
+    file.seek(0)
+    return file
+
+
+def asset_iter_data(
+        client: "APIClient",
+        collection: str,
+        asset_id: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        get_from_location: bool = False,
+) -> Generator[bytes, None, None]:
+    """
+    Yields the data payload in chunks of at most 'chunk_size' bytes.
+    """
+    with _open_data_stream(
+            client=client,
+            collection=collection,
+            asset_id=asset_id,
+            get_from_location=get_from_location,
+    ) as response:
+        yield from response.iter_content(chunk_size=chunk_size)
 
 
 @exception_handler
@@ -432,7 +520,31 @@ def asset_get_data(
         collection: str,
         asset_id: str,
         get_from_location: bool = False,
-) -> Optional[bytes]:
+        path: str = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Optional[Union[bytes, str]]:
+    if path is not None:
+        # an existing file is replaced only by the complete payload
+        part = f"{path}.part"
+        try:
+            with open(part, "wb") as file:
+                for chunk in asset_iter_data(
+                        client=client,
+                        collection=collection,
+                        asset_id=asset_id,
+                        chunk_size=chunk_size,
+                        get_from_location=get_from_location,
+                ):
+                    file.write(chunk)
+            os.replace(part, path)
+        except BaseException:
+            if os.path.exists(part):
+                os.remove(part)
+            raise
+
+        logger.info(f"Saved data payload {collection}/{asset_id} to {path}.")
+        return path
+
     url_mode = "presigned" if get_from_location else "auto"
     endpoint = f"/{{tenant}}/{collection}/assets/{asset_id}/payload?assetPayloadMode={url_mode}"
     response = client.get_request(endpoint=endpoint)
@@ -443,6 +555,7 @@ def asset_get_data(
         load=False,
         get_from_location=get_from_location,
         verify=client.verify,
+        transport=client.transport,
     )
 
     if not get_from_location:
@@ -453,18 +566,41 @@ def asset_get_data(
     return content
 
 
+def file_digest(file: BinaryIO, algorithm: str = "sha1") -> str:
+    """
+    Computes the hex digest of the file in a single chunked pass.
+    The file position is restored, so the file can be uploaded afterwards.
+    """
+    position = file.tell()
+    digest = hashlib.file_digest(file, algorithm).hexdigest()
+    file.seek(position)
+    return digest
+
+
+def encode_payload(data: Union[str, Dict]) -> bytes:
+    payload = json.dumps(data) if isinstance(data, dict) else data
+    return payload.encode("utf-8").strip()
+
+
 @exception_handler
-@retry(times=10)
 def asset_post(
         client: "APIClient",
         collection,
         asset_name,
-        data: Union[str, Dict],
+        data: Union[str, Dict] = None,
         params: Dict = None,
         presigned: bool = False,
         wait=True,
         verify=True,
+        file: Union[str, BinaryIO] = None,
 ) -> Optional[Dict]:
+    """
+    Creates the asset from 'data' or, with presigned upload, streams it from 'file'
+    (path or binary file object). As 'data', the file is read with universal newlines
+    and stripped (NormalizedTextFile).
+    """
+    if file is not None and not presigned:
+        raise ValueError("'file' upload is supported only with presigned upload.")
 
     url_params = {
         "assetName": asset_name,
@@ -474,120 +610,190 @@ def asset_post(
     if params is None:
         params = {}
 
+    tracer = client.transport.tracer
+    with tracer.span(
+            "asset.post", collection=collection, asset_name=asset_name, presigned=presigned
+    ) as span:
+        with ExitStack() as stack:
+            if isinstance(file, (str, os.PathLike)):
+                file = stack.enter_context(open(file, "rb"))
+            if file is not None:
+                file = NormalizedTextFile(file)
+
+            encoded_payload = None
+            if file is None:
+                encoded_payload = encode_payload(data)
+
+            if 'digest' not in params:
+                if file is not None:
+                    digest = file_digest(file)
+                else:
+                    digest = hashlib.sha1(encoded_payload).hexdigest()
+                params['digest'] = digest
+                params['digest_algorithm'] = 'sha1'
 
+            url_params.update(params)
+            url_params = urlencode(url_params)
 
-    if 'digest' not in params:
-        if isinstance(data, dict):
-            payload = json.dumps(data)
-        else:
-            payload = data
-
-        encoded_payload = payload.encode("utf-8").strip()
-        digest = hashlib.sha1(encoded_payload).hexdigest()
-        params['digest'] = digest
-        params['digest_algorithm'] = 'sha1'
-
-    if params is not None:
-        url_params.update(params)
-    url_params = urlencode(url_params)
-
-    logger.info(f"Posting {collection}/{asset_name} with params {url_params}.")
+            logger.info(f"Posting {collection}/{asset_name} with params {url_params}.")
 
-    endpoint = f"/{{tenant}}/{collection}/assets?{url_params}"
+            endpoint = f"/{{tenant}}/{collection}/assets?{url_params}"
 
-    if presigned:
-        json_data = None
-    else:
-        json_data = data
+            if presigned:
+                json_data = None
+            else:
+                json_data = data
 
-    response = client.post_request(endpoint=endpoint, json=json_data)
+            response = client.post_request(endpoint=endpoint, json=json_data)
 
-    location_header = response.headers.get("Location", None)
-    content = get_content(response, get_from_location=False)
+            location_header = response.headers.get("Location", None)
+            content = get_content(response, get_from_location=False)
+            span.set(asset_id=content["id"])
 
-    if location_header is None:
-        logger.info(f"Created {content['id']} ({collection}).")
-        return content
+            if location_header is None:
+                logger.info(f"Created {content['id']} ({collection}).")
+                return content
 
-    logger.info(f"Uploading {collection}/{asset_name}.")
-    with BytesIO(data.encode("utf-8").strip()) as stream:
-        requests.put(url=location_header, data=stream, verify=verify)
+            logger.info(f"Uploading {collection}/{asset_name}.")
+            with tracer.span("asset.upload"):
+                if file is not None:
+                    client.transport.put(url=location_header, data=file, verify=verify)
+                else:
+                    client.transport.put(url=location_header, data=encoded_payload, verify=verify)
 
-    if wait:
-        logger.info(f"Waiting for response ... {collection}/{asset_name}.")
-        asset_polling(client=client, collection=collection, asset_id=content["id"])
-    return asset_get(
-        client=client,
-        collection=collection,
-        asset_id=content["id"],
-        status=False,
-    )
+        if wait:
+            logger.info(f"Waiting for response ... {collection}/{asset_name}.")
+            with tracer.span("asset.wait"):
+                asset_polling(client=client, collection=collection, asset_id=content["id"])
+        return asset_get(
+            client=client,
+            collection=collection,
+            asset_id=content["id"],
+            status=False,
+        )
 
 
-def asset_polling(client: "APIClient", collection: str, asset_id: str):
+def asset_poll_status(client: "APIClient", collection: str, asset_id: str) -> PollStatus:
     asset = asset_get(
         client=client,
         collection=collection,
         asset_id=asset_id,
         status=False,
     )
+    logger.debug(f"Polling {collection} {asset_id}...")
+    return PollStatus(asset["status"] not in ASSET_PENDING_STATUSES, asset)
 
-    while asset["status"] in ("uploading", "processing"):
-        asset = asset_get(
-            client=client,
-            collection=collection,
-            asset_id=asset_id,
-            status=False,
-        )
-        sleep(1.0)
-        logger.debug(f"Polling {collection} {asset_id}...")
+
+def asset_polling(
+        client: "APIClient",
+        collection: str,
+        asset_id: str,
+        policy: PollingPolicy = ASSET_POLLING,
+        timeout: float = None,
+):
+    check = partial(asset_poll_status, client, collection, asset_id)
+    asset = poll(
+        check,
+        policy=policy,
+        timeout=timeout,
+        key=f"{collection}/{asset_id}",
+        on_poll=client.transport.hooks.poll_tick,
+    )
 
     logger.info("Upload finished.")
     return asset["status"]
 
 
-def calc_asset_polling(client: "APIClient", asset: Dict, endpoint: str, url=None):
+def calc_asset_polling(
+        client: "APIClient",
+        asset: Dict,
+        endpoint: str,
+        url=None,
+        policy: PollingPolicy = CALCULATION_POLLING,
+        timeout: float = None,
+):
     logger.info(f"Processing {endpoint}...")
 
-    while asset["stats"] == "processing":
-        sleep(5.0)
+    def check() -> PollStatus:
         logger.debug(f"Polling... {endpoint}")
         response = client.get_request(endpoint=endpoint, url=url)
-        asset = get_content(response)
+        content = get_content(response)
+        return PollStatus(content["status"] != "processing", content, parse_retry_after(response))
+
+    if asset["status"] == "processing":
+        asset = poll(
+            check,
+            policy=policy,
+            timeout=timeout,
+            key=endpoint,
+            on_poll=client.transport.hooks.poll_tick,
+        )
 
     logger.info(f"Got response {asset['status']}")
     return asset
 
 
-def calc_polling(client: "APIClient", endpoint: str, url=None):
+def calc_polling(
+        client: "APIClient",
+        endpoint: str,
+        url=None,
+        policy: PollingPolicy = CALCULATION_POLLING,
+        timeout: float = None,
+):
     logger.info(f"Processing {endpoint}...")
-    response = client.get_request(endpoint=endpoint, url=url)
 
-    while response.status_code == HTTPStatus.ACCEPTED:
-        sleep(1.0)
-        logger.debug(f"Polling... {endpoint}")
+    def check() -> PollStatus:
         response = client.get_request(endpoint=endpoint, url=url)
+        logger.debug(f"Polling... {endpoint}")
+        return PollStatus(
+            response.status_code != HTTPStatus.ACCEPTED,
+            response,
+            parse_retry_after(response),
+        )
+
+    response = poll(
+        check,
+        policy=policy,
+        timeout=timeout,
+        key=endpoint,
+        on_poll=client.transport.hooks.poll_tick,
+    )
 
     logger.info(f"Got response {response.status_code}.")
     return response
 
 
-def _assets_db_polling(client: "APIClient", db: str, collection: str, copy_id: str):
+def _assets_db_polling(
+        client: "APIClient",
+        db: str,
+        collection: str,
+        copy_id: str,
+        policy: PollingPolicy = ASSET_POLLING,
+        timeout: float = None,
+):
     logger.info(f"Polling copy {collection} {copy_id}...")
 
     accept = [HTTPStatus.OK, HTTPStatus.ACCEPTED, HTTPStatus.PROCESSING]
-    response = client.get_request(
-        endpoint=f"/{{tenant}}/{collection}/assets/{db}/{copy_id}"
-    )
-    content = get_content(response=response, accept=accept)
 
-    while content["state"] in ("uploading", "processing"):
+    def check() -> PollStatus:
         response = client.get_request(
             endpoint=f"/{{tenant}}/{collection}/assets/{db}/{copy_id}"
         )
         content = get_content(response=response, accept=accept)
-        sleep(1.0)
         logger.debug("Polling...")
+        return PollStatus(
+            content["state"] not in ("uploading", "processing"),
+            content,
+            parse_retry_after(response),
+        )
+
+    content = poll(
+        check,
+        policy=policy,
+        timeout=timeout,
+        key=f"{collection}/{db}/{copy_id}",
+        on_poll=client.transport.hooks.poll_tick,
+    )
 
     logger.info("Finished.")
     return content
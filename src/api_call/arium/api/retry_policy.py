@@ -0,0 +1,212 @@
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Tuple, Type
+
+import requests
+import urllib3
+from requests import Response
+
+from api_call.arium.api.hooks import RetryEvent
+from api_call.arium.api.poller import parse_retry_after
+from config.get_logger import get_logger
+
+logger = get_logger(__name__)
+
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# statuses meaning the request was rejected before it was processed
+REJECTED_STATUSES = (429, 503)
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+RETRY_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+def is_not_sent(exception: Exception) -> bool:
+    """
+    Whether the request failed before it was sent: the connection could not be established
+    (connect timeout, refused connection, failed name resolution).
+    """
+    if isinstance(exception, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(exception, requests.exceptions.ConnectionError) or not exception.args:
+        return False
+    reason = getattr(exception.args[0], "reason", exception.args[0])
+    return isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+
+class RetryBudget:
+    """
+    Client wide limit of the retries, so retries cannot multiply the load of an overloaded server.
+
+    Every request deposits 'ratio' of a retry token, every retry withdraws a whole one.
+    The budget is also refilled with 'min_per_second' tokens per second, so a few retries
+    are always possible at low traffic.
+
+    :param ratio: The number of retries allowed per request.
+    :param min_per_second: The number of retries allowed per second regardless of the traffic.
+    :param capacity: The maximum number of saved tokens.
+    """
+
+    def __init__(
+            self,
+            ratio: float = 0.2,
+            min_per_second: float = 1.0,
+            capacity: float = 50.0,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"RetryBudget(ratio={self.ratio}, min_per_second={self.min_per_second}, "
+            f"capacity={self.capacity})"
+        )
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def deposit(self):
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retries of the HTTP calls of a client.
+
+    Transient errors (connection errors, timeouts and the 'retry_statuses') are retried
+    with full jitter exponential backoff, or after the 'Retry-After' delay requested by
+    the server. Non idempotent requests (POST) are retried only when the server rejected
+    them (429, 503) or the connection was never established (connect timeout, refused
+    connection, failed name resolution).
+
+    :param max_attempts: The maximum number of attempts of one request.
+    :param backoff_base: The backoff of the first retry in seconds.
+    :param backoff_max: The maximum backoff in seconds.
+    :param max_retry_after: The maximum honored 'Retry-After' delay in seconds.
+    :param retry_statuses: The response statuses which are retried.
+    :param retry_exceptions: The exceptions which are retried.
+    :param budget: The retry budget shared by all requests using the policy, None for no limit.
+    """
+
+    max_attempts: int = 4
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    max_retry_after: float = 120.0
+    retry_statuses: Tuple[int, ...] = RETRY_STATUSES
+    retry_exceptions: Tuple[Type[Exception], ...] = RETRY_EXCEPTIONS
+    budget: Optional[RetryBudget] = field(default_factory=RetryBudget)
+    sleep: Callable[[float], None] = field(default=time.sleep, repr=False)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Full jitter backoff before the retry following the 'attempt' (counted from 0).
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def delay(self, attempt: int, response: Response = None) -> float:
+        retry_after = parse_retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        return self.backoff(attempt)
+
+    def is_retryable(
+            self, method: str, response: Response = None, exception: Exception = None
+    ) -> bool:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        if exception is not None:
+            if not isinstance(exception, self.retry_exceptions):
+                return False
+            return idempotent or is_not_sent(exception)
+
+        if response is None or response.status_code not in self.retry_statuses:
+            return False
+        return idempotent or response.status_code in REJECTED_STATUSES
+
+    def call(
+            self,
+            send: Callable[[], Response],
+            method: str,
+            max_attempts: int = None,
+            description: str = "",
+            on_retry: Callable[[RetryEvent], None] = None,
+    ) -> Response:
+        """
+        Sends the request until it succeeds, fails permanently or runs out of attempts or budget.
+        Returns the last response or raises the last error.
+        """
+        max_attempts = max(1, max_attempts if max_attempts is not None else self.max_attempts)
+        if self.budget is not None:
+            self.budget.deposit()
+
+        attempt = 0
+        while True:
+            response, exception = None, None
+            try:
+                response = send()
+            except Exception as e:
+                exception = e
+
+            attempt += 1
+            if (
+                    attempt >= max_attempts
+                    or not self.is_retryable(method, response, exception)
+            ):
+                break
+            if self.budget is not None and not self.budget.withdraw():
+                logger.warning(f"Retry budget exhausted, not retrying {method} {description}.")
+                break
+
+            delay = self.delay(attempt - 1, response)
+            reason = exception if exception is not None else f"status {response.status_code}"
+            logger.warning(
+                f"{method} {description} failed ({reason}), attempt {attempt} of "
+                f"{max_attempts}, retrying in {delay:.2f}s."
+            )
+            if on_retry is not None:
+                on_retry(RetryEvent(
+                    method=method,
+                    url=description,
+                    attempt=attempt,
+                    delay=delay,
+                    reason=str(reason),
+                    status=response.status_code if response is not None else None,
+                ))
+            if response is not None:
+                response.close()
+            self.sleep(delay)
+
+        if exception is not None:
+            raise exception
+        return response
@@ -0,0 +1,107 @@
+import io
+from typing import BinaryIO
+
+# the whitespace removed by 'bytes.strip'
+WHITESPACE = b" \t\n\r\x0b\x0c"
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class NormalizedTextFile(io.RawIOBase):
+    """
+    Read-only view of a text file with universal newlines ('\\r\\n' and '\\r' read as
+    '\\n') and without its leading and trailing whitespace, the same bytes as
+    'open(path).read().encode("utf-8").strip()'. The file is read in chunks, only a run
+    of whitespace which may end the file is held back.
+    Seeking backwards reads the file again from its start, 'len' reads the whole file
+    once if it was not read to its end before.
+    :param file: The binary file, read from its current position
+    :param chunk_size: The size of the reads of the file
+    """
+
+    def __init__(self, file: BinaryIO, chunk_size: int = CHUNK_SIZE):
+        super().__init__()
+        self._file = file
+        self._start = file.tell()
+        self._chunk_size = chunk_size
+        self._size = None
+        self._reset()
+
+    def _reset(self):
+        self._position = 0
+        self._buffer = memoryview(b"")
+        # the whitespace held back until more content follows
+        self._pending = b""
+        # the last chunk ended with '\r', already read as '\n'
+        self._carriage_return = False
+        self._started = False
+        self._eof = False
+
+    def __len__(self) -> int:
+        if self._size is None:
+            position = self._position
+            self.seek(0, io.SEEK_END)
+            self.seek(position)
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            if self._size is None:
+                while self.read(self._chunk_size):
+                    pass
+            offset += self._size
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"Invalid whence ({whence})")
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+
+        if offset < self._position:
+            self._file.seek(self._start)
+            self._reset()
+        while self._position < offset and self.read(min(self._chunk_size, offset - self._position)):
+            pass
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        if not self._buffer:
+            self._fill()
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        self._position += size
+        return size
+
+    def _fill(self):
+        while not self._buffer and not self._eof:
+            chunk = self._file.read(self._chunk_size)
+            if not chunk:
+                # the trailing whitespace is dropped
+                self._eof = True
+                self._size = self._position
+                return
+
+            if self._carriage_return and chunk.startswith(b"\n"):
+                chunk = chunk[1:]
+            if chunk:
+                self._carriage_return = chunk.endswith(b"\r")
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+            if not self._started:
+                chunk = chunk.lstrip(WHITESPACE)
+                self._started = bool(chunk)
+
+            data = self._pending + chunk
+            content = data.rstrip(WHITESPACE)
+            self._pending = data[len(content):]
+            self._buffer = memoryview(content)
@@ -0,0 +1,236 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from api_call.arium.api.hooks import ON_POLL, ON_RETRY, Hooks, PollEvent, RetryEvent
+from config.get_logger import get_logger
+
+logger = get_logger(__name__)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("arium_current_span", default=None)
+
+
+def _new_id(size: int = 8) -> str:
+    return os.urandom(size).hex()
+
+
+class Span:
+    """
+    Timed operation of a trace. Besides the wall time ('duration'), a span ended in the thread
+    which started it records the CPU time of that thread ('cpu'), so the time spent by the client
+    can be told apart from the time spent waiting for the server (the HTTP child spans) or
+    sleeping between the polls ('poll_wait_seconds').
+    """
+
+    def __init__(self, tracer: "Tracer", name: str, parent: "Span" = None, **attributes):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else _new_id(16)
+        self.span_id = _new_id()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        self.cpu: Optional[float] = None
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._thread = threading.get_ident()
+        self._cpu_start = time.thread_time()
+
+    def __repr__(self) -> str:
+        return f"Span({self.name}, span_id={self.span_id}, parent_id={self.parent_id})"
+
+    def set(self, **attributes):
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def add(self, name: str, value: float = 1):
+        """
+        Adds 'value' to the numeric attribute 'name' (e.g. bytes, polls).
+        """
+        with self._lock:
+            self.attributes[name] = self.attributes.get(name, 0) + value
+
+    def fail(self, error: BaseException):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._start
+        if threading.get_ident() == self._thread:
+            self.cpu = time.thread_time() - self._cpu_start
+        self._tracer.export(self)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            attributes = dict(self.attributes)
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration": self.duration,
+            "cpu": self.cpu,
+            "status": self.status,
+            "error": self.error,
+            "attributes": attributes,
+        }
+
+
+class _NoopSpan(Span):
+    # returned while tracing is disabled, so the instrumented code needs no checks
+    def __init__(self):
+        self.name = "noop"
+        self.trace_id = self.span_id = self.parent_id = None
+        self.attributes = {}
+
+    def __repr__(self) -> str:
+        return "Span(noop)"
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, name: str, value: float = 1):
+        pass
+
+    def fail(self, error: BaseException):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter:
+    """
+    Receives every ended span. Subclasses must be thread safe.
+    """
+
+    def export(self, span: Span):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonLinesExporter(SpanExporter):
+    """
+    Appends every ended span as one JSON line to the file.
+
+    :param path: Path of the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"JsonLinesExporter({self.path})"
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+
+
+def current_span() -> Span:
+    span = _current_span.get()
+    return span if span is not None else NOOP_SPAN
+
+
+class Tracer:
+    """
+    Creates the spans of the client operations and passes the ended spans to the exporter.
+    Spans started in a span (in the same thread or asyncio task) become its children.
+    Without an exporter tracing is disabled and the spans are no-ops.
+
+    :param exporter: The exporter of the ended spans.
+    """
+
+    def __init__(self, exporter: SpanExporter = None):
+        self.exporter = exporter
+
+    def __repr__(self) -> str:
+        return f"Tracer({self.exporter})"
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def install(self, hooks: Hooks) -> "Tracer":
+        """
+        Counts the retries and the polls (and the time waited between them) on the current span.
+        """
+        hooks.add(ON_RETRY, self.on_retry)
+        hooks.add(ON_POLL, self.on_poll)
+        return self
+
+    def on_retry(self, event: RetryEvent):
+        current_span().add("retries")
+
+    def on_poll(self, event: PollEvent):
+        span = current_span()
+        span.add("polls")
+        span.add("poll_wait_seconds", event.delay)
+
+    def start_span(self, name: str, parent: Span = None, **attributes) -> Span:
+        """
+        Starts a span, a child of 'parent' or of the current span. The span is not made current,
+        see 'use', and must be ended with 'end'.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = parent if parent is not None else _current_span.get()
+        if parent is NOOP_SPAN:
+            parent = None
+        return Span(self, name, parent=parent, **attributes)
+
+    @contextmanager
+    def use(self, span: Span) -> Iterator[Span]:
+        """
+        Makes the span current, without ending it.
+        """
+        if span is NOOP_SPAN:
+            yield span
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """
+        Runs the block in a new child span of the current span.
+        """
+        span = self.start_span(name, **attributes)
+        with self.use(span):
+            try:
+                yield span
+            except BaseException as e:
+                span.fail(e)
+                raise
+            finally:
+                span.end()
+
+    def export(self, span: Span):
+        exporter = self.exporter
+        if exporter is None:
+            return
+        try:
+            exporter.export(span)
+        except Exception as e:
+            logger.warning(f"Failed to export span {span.name}: {e}")
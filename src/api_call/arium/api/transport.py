@@ -0,0 +1,331 @@
+import os
+import threading
+import time
+import weakref
+from functools import partial
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from api_call.arium.api.hooks import AFTER_RESPONSE, BEFORE_REQUEST, ON_RETRY, Hooks, RequestEvent
+from api_call.arium.api.rate_limiter import FAMILY_STORAGE, RateLimiter, endpoint_family
+from api_call.arium.api.retry_policy import RetryPolicy
+from api_call.arium.api.tracing import Span, Tracer
+from config.get_logger import get_logger
+
+logger = get_logger(__name__)
+
+Timeout = Union[None, float, Tuple[float, float]]
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 32
+DEFAULT_TIMEOUT = (10.0, 300.0)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter applying a default (connect, read) timeout to every request
+    which does not define its own one.
+    """
+
+    def __init__(self, timeout: Timeout = DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+class Transport:
+    """
+    Pooled, keep-alive HTTP transport.
+
+    One transport is owned by each APIClient and is used both for the Arium API
+    calls (the adapters are mounted on the OAuth2 session) and for the presigned
+    storage traffic (uploads, downloads and 'Location' redirects).
+
+    :param pool_connections: The number of host pools to cache.
+    :param pool_maxsize: The maximum number of connections kept per host.
+    :param pool_block: Whether to block when a host pool has no free connection.
+    :param timeout: Default timeout in seconds, number or (connect, read) tuple.
+    :param keep_alive: Whether connections are reused between requests.
+    :param retry_policy: Retries of the requests, shared by the clients using the transport.
+    :param rate_limiter: Rate and concurrency limits of the requests, no limits if not given.
+    :param hooks: Instrumentation callbacks of the requests, retries and polls.
+    :param tracer: Tracer of the operations of the clients using the transport, every
+        request attempt is a child span of the current operation.
+    """
+
+    def __init__(
+            self,
+            pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+            pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+            pool_block: bool = False,
+            timeout: Timeout = DEFAULT_TIMEOUT,
+            keep_alive: bool = True,
+            retry_policy: RetryPolicy = None,
+            rate_limiter: RateLimiter = None,
+            hooks: Hooks = None,
+            tracer: Tracer = None,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.hooks = hooks if hooks is not None else Hooks()
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.tracer.install(self.hooks)
+
+        self.adapter = TimeoutHTTPAdapter(
+            timeout=timeout,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session = requests.Session()
+        self.mount(self.session)
+        _transports.add(self)
+
+    def __repr__(self) -> str:
+        return (
+            f"Transport(pool_connections={self.pool_connections}, "
+            f"pool_maxsize={self.pool_maxsize}, pool_block={self.pool_block}, "
+            f"timeout={self.timeout}, keep_alive={self.keep_alive})"
+        )
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def mount(self, session: requests.Session) -> requests.Session:
+        """
+        Mounts the pooled adapter on the session, so the session shares the connections.
+        """
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def send(
+            self,
+            fun,
+            method: str,
+            url: str,
+            max_attempts: int = None,
+            family: str = None,
+            **kwargs,
+    ) -> Response:
+        """
+        Calls 'fun' (a session request method) with the retry policy and the rate limiter
+        of the transport. Every attempt is limited as a request of the endpoint 'family'
+        (detected from the url if not given). A file object body is rewound before every attempt.
+        """
+        data = kwargs.get("data", None)
+        position = data.tell() if hasattr(data, "seek") and hasattr(data, "tell") else None
+        family = family if family is not None else endpoint_family(url)
+        # the query of the presigned urls holds credentials, it is not passed to the hooks
+        description = url.split("?")[0]
+        attempts = 0
+
+        def attempt() -> Response:
+            nonlocal attempts
+            attempts += 1
+            if position is not None:
+                data.seek(position)
+
+            instrumented = self.hooks.has(BEFORE_REQUEST) or self.hooks.has(AFTER_RESPONSE)
+            traced = self.tracer.enabled
+            if instrumented or traced:
+                event = RequestEvent(
+                    method, description, family, attempts, bytes_sent=_body_size(kwargs, position)
+                )
+            if instrumented:
+                self.hooks.emit(BEFORE_REQUEST, event)
+
+            span = self.tracer.start_span(
+                f"HTTP {method}", url=description, family=family, attempt=attempts
+            )
+            start = time.perf_counter()
+            try:
+                with self.tracer.use(span):
+                    if self.rate_limiter is None:
+                        response = fun(url=url, **kwargs)
+                    elif kwargs.get("stream", False):
+                        response = self._send_streamed(fun, url, family, **kwargs)
+                    else:
+                        with self.rate_limiter.limit(family):
+                            response = fun(url=url, **kwargs)
+                        self.rate_limiter.record(family, response.status_code)
+            except Exception as e:
+                if instrumented or traced:
+                    event.elapsed = time.perf_counter() - start
+                    event.error = e
+                    event.bytes_sent = _sent_size(getattr(e, "request", None), event.bytes_sent)
+                    self._emit_response(event, span)
+                raise
+
+            if instrumented or traced:
+                event.elapsed = time.perf_counter() - start
+                event.status = response.status_code
+                event.bytes_received = _response_size(response, kwargs.get("stream", False))
+                event.bytes_sent = _sent_size(getattr(response, "request", None), event.bytes_sent)
+                self._emit_response(event, span)
+            return response
+
+        on_retry = partial(self.hooks.emit, ON_RETRY) if self.hooks.has(ON_RETRY) else None
+        return self.retry_policy.call(
+            attempt,
+            method,
+            max_attempts=max_attempts,
+            description=description,
+            on_retry=on_retry,
+        )
+
+    def _send_streamed(self, fun, url: str, family: str, **kwargs) -> Response:
+        """
+        Sends a streamed request holding a slot of the family until the response is closed
+        (or garbage collected), so the downloads in progress are limited, not only the requests
+        waiting for the headers.
+        """
+        release = self.rate_limiter.acquire(family)
+        try:
+            response = fun(url=url, **kwargs)
+        except BaseException:
+            release()
+            raise
+
+        close = response.close
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                release()
+
+        response.close = close_and_release
+        weakref.finalize(response, release)
+        self.rate_limiter.record(family, response.status_code)
+        return response
+
+    def _emit_response(self, event: RequestEvent, span: Span):
+        if event.error is not None:
+            span.fail(event.error)
+        span.set(
+            status=event.status,
+            bytes_sent=event.bytes_sent,
+            bytes_received=event.bytes_received,
+        )
+        span.end()
+        self.hooks.emit(AFTER_RESPONSE, event)
+
+    def request(self, method: str, url: str, **kwargs) -> Response:
+        logger.debug(f"Transport: {method} {url.split('?')[0]}")
+        return self.send(
+            partial(self.session.request, method=method), method, url, family=FAMILY_STORAGE, **kwargs
+        )
+
+    def get(self, url: str, **kwargs) -> Response:
+        return self.request("GET", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> Response:
+        return self.request("PUT", url, **kwargs)
+
+    def reset_after_fork(self):
+        """
+        Drops the pooled connections inherited from the parent process, without closing
+        them, so the child process never shares a connection (and its TLS state) with the parent.
+        """
+        self.adapter.init_poolmanager(
+            self.pool_connections, self.pool_maxsize, block=self.pool_block
+        )
+
+    def close(self):
+        self.session.close()
+        self.adapter.close()
+
+
+def _body_size(kwargs: Dict, position: Optional[int]) -> int:
+    """
+    Size of the 'data' body before the request is sent. A 'json' body is counted from
+    the prepared request ('_sent_size'), it is not encoded again.
+    """
+    data = kwargs.get("data", None)
+    if data is None:
+        return 0
+    if isinstance(data, (bytes, bytearray, str)):
+        return len(data)
+    if position is not None:
+        try:
+            return os.fstat(data.fileno()).st_size - position
+        except (AttributeError, OSError, ValueError):
+            return len(data.getbuffer()) - position if hasattr(data, "getbuffer") else 0
+    return 0
+
+
+def _sent_size(request, default: int) -> int:
+    """
+    Size of the body of the sent (prepared) request, 'default' if it is not known.
+    """
+    if not isinstance(request, requests.PreparedRequest):
+        return default
+    body = request.body
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    try:
+        return int(request.headers.get("Content-Length", default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _response_size(response: Response, stream: bool) -> int:
+    """
+    Size of the response body, from 'Content-Length' for the streamed responses (not read yet).
+    """
+    try:
+        if stream:
+            return int(response.headers.get("Content-Length", 0))
+        return len(response.content or b"")
+    except (TypeError, ValueError, AttributeError):
+        return 0
+
+
+_transports = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    for transport in list(_transports):
+        transport.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+_default_transport: Optional[Transport] = None
+_default_transport_lock = threading.Lock()
+
+
+def default_transport() -> Transport:
+    """
+    Returns the process wide transport, used when no client transport is available.
+    """
+    global _default_transport
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = Transport()
+    return _default_transport
@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from config.get_logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".arium", "upload_index.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    workspace TEXT NOT NULL,
+    collection TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    asset_name TEXT NOT NULL,
+    asset_id TEXT NOT NULL,
+    uploaded_at TEXT NOT NULL,
+    PRIMARY KEY (workspace, collection, digest, asset_name)
+);
+CREATE INDEX IF NOT EXISTS uploads_asset_id ON uploads (workspace, collection, asset_id);
+"""
+
+
+class UploadIndex:
+    """
+    Local, content addressed index of uploaded assets (SQLite).
+
+    Maps the sha1 digest of the payload and the asset name to the id of the asset
+    created from it, per workspace and collection. Only the last upload of a name is
+    kept. The assets clients use it to
+    return the existing asset instead of uploading identical content again.
+
+    :param path: Path of the SQLite database file (':memory:' for a process local index).
+    :param verify: Whether an indexed asset read from the server is checked (not in error,
+        same name) before it is reused.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, verify: bool = True):
+        self.path = path
+        self.verify = verify
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def __repr__(self) -> str:
+        return f"UploadIndex(path={self.path}, verify={self.verify})"
+
+    def lookup(
+            self, workspace: str, collection: str, digest: str, asset_name: str
+    ) -> Optional[Dict]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT asset_id, uploaded_at FROM uploads "
+                "WHERE workspace = ? AND collection = ? AND digest = ? AND asset_name = ?",
+                (workspace, collection, digest, asset_name),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "id": row[0],
+            "name": asset_name,
+            "digest": digest,
+            "uploadedAt": row[1],
+        }
+
+    def add(
+            self,
+            workspace: str,
+            collection: str,
+            digest: str,
+            asset_name: str,
+            asset_id: str,
+    ):
+        uploaded_at = datetime.now(timezone.utc).isoformat()
+        with self._lock, self._connection:
+            # the asset replaces the previous content uploaded with the same name
+            self._connection.execute(
+                "DELETE FROM uploads WHERE workspace = ? AND collection = ? AND asset_name = ?",
+                (workspace, collection, asset_name),
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?)",
+                (workspace, collection, digest, asset_name, asset_id, uploaded_at),
+            )
+        logger.debug(f"Indexed {collection}/{asset_id} ({digest}).")
+
+    def remove(self, workspace: str, collection: str, asset_id: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM uploads WHERE workspace = ? AND collection = ? AND asset_id = ?",
+                (workspace, collection, asset_id),
+            )
+        logger.debug(f"Removed {collection}/{asset_id} from upload index.")
+
+    def clear(self, workspace: str = None, collection: str = None):
+        query = "DELETE FROM uploads WHERE (? IS NULL OR workspace = ?) AND (? IS NULL OR collection = ?)"
+        with self._lock, self._connection:
+            self._connection.execute(query, (workspace, workspace, collection, collection))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
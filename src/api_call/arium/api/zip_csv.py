@@ -0,0 +1,111 @@
+import csv
+import fnmatch
+import io
+import itertools
+import os
+import zipfile
+from contextlib import ExitStack
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+
+ZipSource = Union[str, os.PathLike, bytes, BinaryIO, zipfile.ZipFile]
+Members = Union[None, str, Iterable[str]]
+
+DELIMITERS = (",", "|")
+
+_GLOB_CHARS = set("*?[")
+
+
+def select_members(zip_file: zipfile.ZipFile, members: Members = None) -> List[zipfile.ZipInfo]:
+    """
+    Returns the files of the archive (directories are skipped) selected by 'members',
+    in the order of the archive.
+    :param zip_file: The archive
+    :param members: None for all the files, a name or a glob pattern ('*.csv', 'ylt/*'),
+        or a list of them. A name without a match raises KeyError.
+    """
+    files = [info for info in zip_file.infolist() if not info.is_dir()]
+    if members is None:
+        return files
+
+    patterns = [members] if isinstance(members, str) else list(members)
+    for pattern in patterns:
+        if not _GLOB_CHARS & set(pattern) and all(info.filename != pattern for info in files):
+            raise KeyError(f"There is no item named {pattern!r} in the archive")
+
+    return [
+        info for info in files
+        if any(info.filename == pattern or fnmatch.fnmatchcase(info.filename, pattern) for pattern in patterns)
+    ]
+
+
+def _open_zip(stack: ExitStack, source: ZipSource) -> zipfile.ZipFile:
+    if isinstance(source, zipfile.ZipFile):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    return stack.enter_context(zipfile.ZipFile(source))
+
+
+def iter_zip_members(source: ZipSource, members: Members = None) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    Yields the name and a stream of each selected file of the archive. The file is
+    decompressed as it is read, the stream is closed when the next file is yielded.
+    :param source: The archive: a path, bytes, a seekable binary file or an open ZipFile
+    :param members: The selected files, see 'select_members'
+    """
+    with ExitStack() as stack:
+        zip_file = _open_zip(stack, source)
+        for info in select_members(zip_file, members):
+            with zip_file.open(info) as member:
+                yield info.filename, member
+
+
+def detect_delimiter(header: str) -> str:
+    """
+    The delimiter (',' or '|') appearing the most in the header line.
+    """
+    return max(DELIMITERS, key=header.count)
+
+
+def read_csv_stream(
+        stream: BinaryIO, delimiter: Optional[str] = ",", encoding: str = "utf-8"
+) -> Iterator[List[str]]:
+    """
+    Yields the CSV rows of a binary stream, decoded incrementally.
+    :param stream: The binary stream
+    :param delimiter: The delimiter, None to detect ',' or '|' from the header line
+    :param encoding: The encoding of the stream
+    """
+    text = io.TextIOWrapper(stream, encoding=encoding, newline="")
+    try:
+        lines = iter(text)
+        if delimiter is None:
+            header = next(lines, "")
+            delimiter = detect_delimiter(header)
+            lines = itertools.chain([header], lines)
+        yield from csv.reader(lines, delimiter=delimiter)
+    finally:
+        # the stream is owned by the caller
+        text.detach()
+
+
+def iter_zip_csv(
+        source: ZipSource,
+        members: Members = None,
+        delimiter: Optional[str] = ",",
+        encoding: str = "utf-8",
+        with_member: bool = False,
+) -> Iterator[Union[List[str], Tuple[str, List[str]]]]:
+    """
+    Yields the CSV rows of the selected files of the archive (the header row of each
+    file included), decoded incrementally from the compressed stream. Only the rows being
+    read are kept in memory, not the decompressed files.
+    :param source: The archive: a path, bytes, a seekable binary file or an open ZipFile
+    :param members: The selected files, see 'select_members'
+    :param delimiter: The delimiter, None to detect ',' or '|' from the header of each file
+    :param encoding: The encoding of the files
+    :param with_member: Yield (file name, row) instead of the row
+    """
+    for name, member in iter_zip_members(source, members):
+        for row in read_csv_stream(member, delimiter=delimiter, encoding=encoding):
+            yield (name, row) if with_member else row
@@ -1,13 +1,18 @@
+import shutil
 from dataclasses import dataclass, field
 from enum import Enum
 from io import BytesIO
-from typing import List, Optional, Any, Generator
+from typing import BinaryIO, List, Optional, Any, Generator, Iterator
 from zipfile import ZipFile
 
 from dataclasses_json import dataclass_json, DataClassJsonMixin, Undefined, config
 
+from api_call.arium.api.remote_file import is_remote
+from api_call.arium.api.zip_csv import Members, iter_zip_csv, select_members
 from api_call.arium.model.simulation import SimulationModel
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 class ReportType(Enum):
     ZIP = "zip"
@@ -33,7 +38,7 @@ class Report(DataClassJsonMixin):
             decoder=lambda x: ReportType(x)
         )
     )
-    _content: Optional[BytesIO] = field(
+    _content: Optional[BinaryIO] = field(
         init=False,
         default=None,
         metadata=config(
@@ -43,31 +48,92 @@ class Report(DataClassJsonMixin):
         )
     )
 
-    def _fetch(self) -> Optional[BytesIO]:
+    def _fetch(self) -> Optional[BinaryIO]:
         # is replaced in the place in activity client by method injection
         raise Exception("No content found!")
 
-    def bytes(self) -> BytesIO:
+    def _open(self) -> BinaryIO:
+        # is replaced in the place in activity client by the remote file of the report
+        return self.archive()
+
+    def _source(self, members: Members) -> BinaryIO:
+        """
+        The archive to read the selected files from. When only some files are selected from
+        a report not fetched yet, the remote report: only its central directory and the
+        selected files are downloaded.
+        """
+        if members is None or self._content is not None:
+            return self.archive()
+        source = self._open()
+        if not is_remote(source):
+            # the storage does not support Range requests, the report was downloaded
+            self._content = source
+        return source
+
+    def archive(self) -> BinaryIO:
+        """
+        The report file, fetched once. Large reports are kept in a temporary file instead
+        of memory (see ReportsClient 'spill_size').
+        """
         if self._content is None:
             self._content = self._fetch()
+        self._content.seek(0)
         return self._content
 
-    def download(self, file_name):
-        with open(file_name, "wb") as f:
-            f.write(self.bytes().getbuffer())
+    def bytes(self) -> BytesIO:
+        """
+        The report in memory, also when it was fetched into a temporary file.
+        """
+        content = self.archive()
+        if isinstance(content, BytesIO):
+            return content
+        return BytesIO(content.read())
+
+    def _download(self, path: str, size: int = None, resume: bool = True):
+        # is replaced in the place in activity client by the chunked download of the report
+        self._save(path)
+
+    def _save(self, path: str):
+        with open(path, "wb") as f:
+            shutil.copyfileobj(self.archive(), f, DOWNLOAD_CHUNK_SIZE)
+
+    def download(self, path: str, resume: bool = True):
+        """
+        Saves the report to a file. A report not fetched yet is streamed in chunks to
+        '<path>.part' and renamed when complete and of the size of the report.
+        :param path: The file
+        :param resume: Continue an interrupted download, from the '.part' file of a previous
+            call or with a Range request when the connection drops
+        """
+        if self._content is not None:
+            self._save(path)
+        else:
+            self._download(path, size=self.size, resume=resume)
 
     def zip(self) -> ZipFile:
-        return ZipFile(self.bytes())
-
-    def files(self) -> Generator[tuple[str, BytesIO], Any, None]:
-        with self.zip() as zip_file:
-            for file_info in zip_file.filelist:
-                filename = file_info.filename
-                # Skip directories
-                if not filename.endswith('/'):
-                    content = BytesIO(zip_file.read(filename))
-                    content.seek(0)
-                    yield filename, content
+        return ZipFile(self.archive())
+
+    def files(self, members: Members = None) -> Generator[tuple[str, BinaryIO], Any, None]:
+        """
+        Yields the name and a file object of each file of the report (directories are
+        skipped). The files are opened when they are yielded and decompressed as they are
+        read, they can be read after the iteration too.
+        :param members: None for all the files, a name or a glob pattern, or a list of them.
+            The selected files only are downloaded if the report was not fetched yet.
+        """
+        with ZipFile(self._source(members)) as zip_file:
+            for file_info in select_members(zip_file, members):
+                yield file_info.filename, zip_file.open(file_info)
+
+    def rows(self, members: Members = None, delimiter: Optional[str] = ",", with_member: bool = False) -> Iterator:
+        """
+        Streams the CSV rows of the report files, decoded from the compressed report.
+        :param members: None for all the files, a name or a glob pattern, or a list of them.
+            The selected files only are downloaded if the report was not fetched yet.
+        :param delimiter: The delimiter, None to detect ',' or '|' from the header of each file
+        :param with_member: Yield (file name, row) instead of the row
+        """
+        return iter_zip_csv(self._source(members), members=members, delimiter=delimiter, with_member=with_member)
 
 
 class ActivityType(Enum):
@@ -5,10 +5,11 @@ import os
 from collections import defaultdict
 from enum import Enum
 from http import HTTPStatus
-from time import sleep
 from typing import Dict
 
+from api_call.arium.api.poller import PDCA_POLLING, PollingPolicy, PollStatus, poll
 from api_call.arium.api.request import get_content
+from api_call.arium.api.tracing import NOOP_SPAN
 from api_call.arium.pdca_data_processing.constants import PROPERTIES, FOLDER_MATCH
 from config.constants import BASE_URI_PDCA
 from config.get_logger import get_logger
@@ -80,14 +81,27 @@ class PDCAStage(Enum):
 
 
 class PDCACalcScheduler:
-    def __init__(self, client, batch_size, number_of_batches, simultaneous_batches):
+    def __init__(
+        self,
+        client,
+        batch_size,
+        number_of_batches,
+        simultaneous_batches,
+        policy: PollingPolicy = PDCA_POLLING,
+    ):
         self.client = client
         self.number_of_batches = number_of_batches
         self.batch_size = batch_size
         self.simultaneous_batches = simultaneous_batches
+        self.policy = policy
 
         self.jobs = []
         self._last_status = None
+        self._span = None
+
+    @property
+    def tracer(self):
+        return self.client.transport.tracer
 
     def initialized(self):
         return sum(
@@ -137,11 +151,20 @@ class PDCACalcScheduler:
     def push(self, status):
         self.jobs.append(status)
 
+    def processing(self):
+        return any(s.processing for s in self.jobs)
+
     def stop(self):
+        """
+        Saves the results of the finished jobs, returns whether any job finished.
+        """
+        changed = False
         for status in self.jobs:
             if status.processing:
                 if status.stage == PDCAStage.MATCH:
-                    response = get_result(self.client, status.location_match)
+                    with self.tracer.use(status.span):
+                        response = get_result(self.client, status.location_match)
+                    status.span.add("polls")
                     if is_ready(response):
                         # Save match result
                         status.result = get_content(response)
@@ -149,9 +172,13 @@ class PDCACalcScheduler:
                             json.dump(status.result, output_file)
                         status.stage = PDCAStage.AUGMENT
                         status.processing = False
+                        status.span.end()
+                        changed = True
                         logger.debug(f"Job {status.batch_number} finished match.")
                 elif status.stage == PDCAStage.AUGMENT:
-                    response = get_result(self.client, status.location_augment)
+                    with self.tracer.use(status.span):
+                        response = get_result(self.client, status.location_augment)
+                    status.span.add("polls")
                     if is_ready(response):
                         # Save augment result
                         result = get_content(response)
@@ -159,7 +186,26 @@ class PDCACalcScheduler:
                             json.dump(result, output_file)
                         status.stage = PDCAStage.FINISHED
                         status.processing = False
+                        status.span.end()
+                        changed = True
                         logger.debug(f"Job {status.batch_number} finished augment.")
+        return changed
+
+    def _poll_status(self):
+        return PollStatus(self.stop() or not self.processing())
+
+    def wait(self):
+        """
+        Polls the running jobs with the polling policy until any of them finishes.
+        """
+        if not self.processing():
+            return
+        poll(
+            self._poll_status,
+            policy=self.policy,
+            key="pdca",
+            on_poll=self.client.transport.hooks.poll_tick,
+        )
 
     def run(self, match_schema, augment_schema, match_params):
         for status in self.jobs:
@@ -168,17 +214,21 @@ class PDCACalcScheduler:
 
             if status.stage == PDCAStage.MATCH and self.can_start_match():
                 match_inputs = get_match_inputs(status.result, match_params)
-                status.location_match = self.client.get_pdca().submit_match(
-                    match_inputs, schema=match_schema
-                )
+                status.span = self._start_job_span("pdca.match", status, match_inputs["matchInputs"])
+                with self.tracer.use(status.span):
+                    status.location_match = self.client.get_pdca().submit_match(
+                        match_inputs, schema=match_schema
+                    )
                 status.processing = True
                 logger.debug(f"Job {status.batch_number} started match.")
             elif status.stage == PDCAStage.AUGMENT and self.can_start_augment():
                 augment_inputs = get_augment_inputs(status.result)
                 status.result = {}
-                status.location_augment = self.client.get_pdca().submit_augment(
-                    augment_inputs, schema=augment_schema
-                )
+                status.span = self._start_job_span("pdca.augment", status, augment_inputs["augmentInputs"])
+                with self.tracer.use(status.span):
+                    status.location_augment = self.client.get_pdca().submit_augment(
+                        augment_inputs, schema=augment_schema
+                    )
                 status.processing = True
                 logger.debug(f"Job {status.batch_number} started augment.")
 
@@ -190,15 +240,29 @@ class PDCACalcScheduler:
                 return
             self.next(gen, match_schema, augment_schema, output_folder)
 
+    def _start_job_span(self, name, status, inputs):
+        # a job is polled across the iterations of 'process', its span is ended by 'stop'
+        return self.tracer.start_span(
+            name, parent=self._span, batch=status.batch_number, records=len(inputs)
+        )
+
     def process(self, gen, match_schema, augment_schema, output_folder, match_params):
-        while not self.done():
-            yield self.get_progress()
-            self.start(gen, match_schema, augment_schema, output_folder)
-            # Stop all jobs, which are finished (save results, update status)
-            self.stop()
-            # Run as many jobs as possible (either match or augment state)
-            self.run(match_schema, augment_schema, match_params)
-            sleep(5)
+        self._span = self.tracer.start_span(
+            "pdca.process", batches=self.number_of_batches, batch_size=self.batch_size
+        )
+        try:
+            while not self.done():
+                yield self.get_progress()
+                self.start(gen, match_schema, augment_schema, output_folder)
+                # Run as many jobs as possible (either match or augment state)
+                self.run(match_schema, augment_schema, match_params)
+                # Wait until a job finishes (save results, update status)
+                self.wait()
+        except Exception as e:
+            self._span.fail(e)
+            raise
+        finally:
+            self._span.end()
 
     def next(self, gen, match_schema, augment_schema, output_folder):
         batch_number, batch = next(gen)
@@ -280,6 +344,7 @@ class PDCAJobStatus:
         self.result = {}
         self.stage = PDCAStage.INITIALIZED
         self.processing = False
+        self.span = NOOP_SPAN
 
 
 class PDCACalculations:
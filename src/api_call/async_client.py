@@ -0,0 +1,266 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import BinaryIO, Dict, List, Optional, TYPE_CHECKING, Union
+
+from api_call.arium.api.client_activity import (
+    ActivityClient,
+    ReportsClient,
+    Order,
+    Sort,
+    FINAL_STATUSES,
+)
+from api_call.arium.api.client_assets import AssetsClient
+from api_call.arium.api.poller import (
+    ACTIVITY_POLLING,
+    ASSET_POLLING,
+    PollStatus,
+    PollTimeoutError,
+    poll_async,
+)
+from api_call.arium.api.transport import Transport
+from api_call.arium.model.activity import (
+    Activity,
+    ActivityList,
+    ActivitySubmitRequest,
+    Report,
+)
+from api_call.client import APIClient
+from config.constants import *
+from config.get_logger import get_logger
+
+if TYPE_CHECKING:
+    from auth.okta_auth import Auth
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_WORKERS = 32
+
+
+class AsyncAPIClient:
+    """
+    asyncio front end of the APIClient.
+
+    The blocking HTTP calls run in a bounded worker pool sharing the client transport,
+    while waiting (polling sleeps) is done with 'asyncio.sleep', so one event loop can
+    keep hundreds of uploads, polls and downloads in flight without a thread for each.
+    It reuses the auth settings, the models and the clients of the wrapped APIClient.
+
+    :param auth: Auth used to create the APIClient (if 'client' is not given).
+    :param client: Existing APIClient to wrap.
+    :param max_workers: The maximum number of HTTP calls executed at the same time.
+    :param transport: Transport used to create the APIClient (if 'client' is not given).
+    """
+
+    def __init__(
+            self,
+            auth: "Auth" = None,
+            client: APIClient = None,
+            max_workers: int = DEFAULT_MAX_WORKERS,
+            transport: Transport = None,
+    ):
+        if client is None:
+            if auth is None:
+                raise ValueError("'auth' or 'client' parameter is required.")
+            if transport is None:
+                transport = Transport(pool_maxsize=max_workers)
+            client = APIClient(auth=auth, transport=transport)
+
+        self.client = client
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="arium-async"
+        )
+
+    def __repr__(self) -> str:
+        return self.client.__repr__()
+
+    async def __aenter__(self) -> "AsyncAPIClient":
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fun, *args, **kwargs):
+        """
+        Runs the blocking function in the worker pool and awaits its result.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fun, *args, **kwargs))
+
+    def get_workspace(self):
+        return self.client.get_workspace()
+
+    def activity(self) -> "AsyncActivityClient":
+        return AsyncActivityClient(self, self.client.activity())
+
+    def assets(self, collection: str) -> "AsyncAssetsClient":
+        return AsyncAssetsClient(self, self.client.assets(collection))
+
+    def portfolios(self) -> "AsyncAssetsClient":
+        return self.assets(COLLECTION_PORTFOLIOS)
+
+    def events(self) -> "AsyncAssetsClient":
+        return self.assets(COLLECTION_EVENTS)
+
+    def analysis(self) -> "AsyncAssetsClient":
+        return self.assets(COLLECTION_ANALYSES)
+
+    def currency_tables(self) -> "AsyncAssetsClient":
+        return self.assets(COLLECTION_CURRENCY_TABLES)
+
+    def programmes(self) -> "AsyncAssetsClient":
+        return self.assets(COLLECTION_PROGRAMMES)
+
+    def sizes(self) -> "AsyncAssetsClient":
+        return self.assets(COLLECTION_SIZES)
+
+
+class AsyncAssetsClient:
+    polling_policy = ASSET_POLLING
+
+    def __init__(self, client: AsyncAPIClient, assets_client: AssetsClient):
+        self._client = client
+        self._assets = assets_client
+        self.collection = assets_client.collection
+
+    async def list(self, latest: bool = True) -> Optional[List]:
+        return await self._client.run(self._assets.list, latest=latest)
+
+    async def get(self, asset_id: str) -> Optional[Dict]:
+        return await self._client.run(self._assets.get, asset_id)
+
+    async def get_by_name(self, asset_name: str, exact=True, refresh=False):
+        return await self._client.run(
+            self._assets.get_by_name, asset_name, exact=exact, refresh=refresh
+        )
+
+    async def create(self, asset_name: str, *args, wait: bool = True, **kwargs) -> Optional[Dict]:
+        """
+        Creates the asset, the arguments are the same as in 'create' of the collection client.
+        """
+        asset = await self._client.run(
+            self._assets.create, asset_name, *args, wait=False, **kwargs
+        )
+        if wait:
+            return await self.wait(asset["id"])
+        return asset
+
+    async def wait(self, asset_id: str, timeout: float = None) -> Optional[Dict]:
+        async def check() -> PollStatus:
+            asset = await self.get(asset_id)
+            logger.debug(f"Polling {self.collection} {asset_id}...")
+            return PollStatus(asset["status"] not in ("uploading", "processing"), asset)
+
+        return await poll_async(
+            check,
+            policy=self.polling_policy,
+            timeout=timeout,
+            key=f"{self.collection}/{asset_id}",
+            on_poll=self._client.client.transport.hooks.poll_tick,
+        )
+
+    async def get_data(self, asset_id: str, path: str = None) -> Optional[Union[bytes, str]]:
+        return await self._client.run(self._assets.get_data, asset_id, path=path)
+
+    async def delete(self, asset_id: str) -> Optional[Dict]:
+        return await self._client.run(self._assets.delete, asset_id)
+
+    async def rename(self, asset_id: str, asset_name: str):
+        return await self._client.run(self._assets.rename, asset_id, asset_name)
+
+    async def copy(self, asset_id: str, asset_name: str) -> Optional[Dict]:
+        return await self._client.run(self._assets.copy, asset_id, asset_name)
+
+
+class AsyncReportsClient:
+    def __init__(self, client: AsyncAPIClient, activity_id: str):
+        self._client = client
+        self._reports = ReportsClient(client.client, activity_id)
+
+    async def list(self) -> List[Report]:
+        return await self._client.run(self._reports.list)
+
+    async def fetch(self, file_name: str, size: int = None) -> BinaryIO:
+        return await self._client.run(self._reports.fetch, file_name, size)
+
+    async def open(self, file_name: str, size: int = None) -> BinaryIO:
+        return await self._client.run(self._reports.open, file_name, size)
+
+    async def download(self, file_name: str, path: str, size: int = None, resume: bool = True) -> int:
+        return await self._client.run(self._reports.download, file_name, path, size, resume)
+
+
+class AsyncActivityClient:
+    polling_policy = ACTIVITY_POLLING
+
+    def __init__(self, client: AsyncAPIClient, activity_client: ActivityClient):
+        self._client = client
+        self._activity = activity_client
+
+    async def list(
+            self,
+            limit: int = 100,
+            page: int = 1,
+            order: Order = Order.Descending,
+            sort: Sort = Sort.StartTime,
+    ) -> ActivityList:
+        return await self._client.run(
+            self._activity.list, limit=limit, page=page, order=order, sort=sort
+        )
+
+    async def get(self, activity_id: str) -> Activity:
+        return await self._client.run(self._activity.get, activity_id=activity_id)
+
+    async def submit(
+            self,
+            activity_submit_request: ActivitySubmitRequest,
+            wait: bool = False,
+            timeout_minutes: int = 60,
+    ) -> Activity:
+        activity = await self._client.run(
+            self._activity.submit, activity_submit_request, wait=False
+        )
+        if not wait:
+            return activity
+        return await self.wait(activity.activityId, timeout_minutes=timeout_minutes)
+
+    async def wait(self, activity_id: str, timeout_minutes: int = 60) -> Activity:
+        async def check() -> PollStatus:
+            activity = await self.get(activity_id)
+            logger.debug(f"Activity {activity_id} status: {activity.status}.")
+            return PollStatus(activity.status in FINAL_STATUSES, activity)
+
+        try:
+            return await poll_async(
+                check,
+                policy=self.polling_policy,
+                timeout=timeout_minutes * 60,
+                key=activity_id,
+                on_poll=self._client.client.transport.hooks.poll_tick,
+            )
+        except PollTimeoutError:
+            raise TimeoutError(f"Activity polling timed out after {timeout_minutes} minutes") from None
+
+    async def cancel(self, activity_id: str):
+        return await self._client.run(self._activity.cancel, activity_id)
+
+    async def resubmit(self, activity_id: str) -> str:
+        return await self._client.run(self._activity.resubmit, activity_id)
+
+    def reports_client(self, activity_id: str) -> AsyncReportsClient:
+        return AsyncReportsClient(self._client, activity_id)
+
+    async def reports(self, activity_id: str) -> List[Report]:
+        return await self.reports_client(activity_id).list()
+
+    async def report(self, activity_id: str) -> Report | None:
+        reports = await self.reports(activity_id)
+        if len(reports) > 0:
+            return reports[0]
+        return None
+
+    async def fetch(self, activity_id: str, file_name: str) -> BinaryIO:
+        return await self.reports_client(activity_id).fetch(file_name)
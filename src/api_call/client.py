@@ -1,4 +1,5 @@
-from typing import Dict, Tuple
+import threading
+from typing import Dict, Tuple, TYPE_CHECKING
 
 from requests import Response
 from typing_extensions import deprecated
@@ -16,18 +17,62 @@ from api_call.arium.api.client_assets import (
 from api_call.arium.api.client_calculations import CalculationsClient
 from api_call.arium.api.client_calculations_asset import CalculationsAssetClient
 from api_call.arium.api.client_refdata import RefDataClient
+from api_call.arium.api.futures import BackgroundPoller
+from api_call.arium.api.hooks import Hooks
+from api_call.arium.api.metrics import MetricsCollector
 from api_call.arium.api.pdca_client import PDCAClient
-from api_call.arium.api.request import retry
+from api_call.arium.api.rate_limiter import RateLimiter
+from api_call.arium.api.retry_policy import RetryPolicy
+from api_call.arium.api.tracing import SpanExporter, Tracer
+from api_call.arium.api.transport import Transport
+from api_call.arium.api.upload_index import UploadIndex
 from auth.okta_auth import Auth
 from config.constants import *
 from config.get_logger import get_logger
 
+if TYPE_CHECKING:
+    from api_call.client_descriptor import ClientDescriptor
+
 logger = get_logger(__name__)
 
 
 class APIClient:
-    def __init__(self, auth: Auth):
+    """
+    Client of the Arium and PDCA APIs.
+
+    A single client can be shared by the threads of a worker pool: requests share the
+    connection pool of the transport, an expiring token is refreshed once for all threads
+    and the name caches and the upload index are synchronized.
+    """
+
+    def __init__(
+            self,
+            auth: Auth,
+            transport: Transport = None,
+            upload_index: UploadIndex = None,
+            retry_policy: RetryPolicy = None,
+            rate_limiter: RateLimiter = None,
+    ):
         self._auth = auth
+        if transport is None:
+            transport = Transport(retry_policy=retry_policy, rate_limiter=rate_limiter)
+        else:
+            # the retries and the limits belong to the transport, shared by its clients
+            if retry_policy is not None and retry_policy is not transport.retry_policy:
+                raise ValueError(
+                    "'retry_policy' conflicts with the retry policy of the given transport, "
+                    "set it on the transport instead."
+                )
+            if rate_limiter is not None and rate_limiter is not transport.rate_limiter:
+                raise ValueError(
+                    "'rate_limiter' conflicts with the rate limiter of the given transport, "
+                    "set it on the transport instead."
+                )
+        self.transport = transport
+        self.transport.mount(self._auth.client)
+        self.upload_index = upload_index
+        self._background = None
+        self._background_lock = threading.Lock()
 
         self._assets_clients = None
         self._calculations_client = None
@@ -44,6 +89,8 @@ class APIClient:
                 COLLECTION_PROGRAMMES: ProgrammesClient(self),
                 COLLECTION_SIZES: SizesClient(self),
             }
+            for assets_client in self._assets_clients.values():
+                assets_client.upload_index = upload_index
             self._calculations_client = CalculationsClient(self)
             self._activity_client = ActivityClient(self)
             self._calculations_asset_client = CalculationsAssetClient(self)
@@ -65,10 +112,67 @@ class APIClient:
     def __str__(self) -> str:
         return self._auth.__repr__()
 
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        return self.transport.retry_policy
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self.transport.rate_limiter
+
+    @property
+    def hooks(self) -> Hooks:
+        return self.transport.hooks
+
+    def enable_metrics(self, collector: MetricsCollector = None) -> MetricsCollector:
+        """
+        Collects the latency, status, bytes and retries of the requests and the polls of the client
+        (and of the clients sharing its transport).
+
+        :param collector: The collector to install, a new one if not given.
+        """
+        collector = collector if collector is not None else MetricsCollector()
+        return collector.install(self.hooks)
+
+    @property
+    def tracer(self) -> Tracer:
+        return self.transport.tracer
+
+    def enable_tracing(self, exporter: SpanExporter) -> Tracer:
+        """
+        Traces the operations of the client (and of the clients sharing its transport):
+        activities, reports, asset uploads and imports, with a child span per HTTP request.
+
+        :param exporter: The exporter of the ended spans, e.g. JsonLinesExporter.
+        """
+        self.transport.tracer.exporter = exporter
+        return self.transport.tracer
+
     @property
     def verify(self):
         return self._auth.verify
 
+    def background(self) -> BackgroundPoller:
+        """
+        Returns the background poller completing the futures of the non blocking calls
+        ('submit_async', 'create_async'), started on first use.
+        """
+        if self._background is None:
+            with self._background_lock:
+                if self._background is None:
+                    self._background = BackgroundPoller(
+                        on_poll=self.transport.hooks.poll_tick
+                    )
+        return self._background
+
+    def descriptor(self, include_token: bool = True) -> "ClientDescriptor":
+        """
+        Returns a picklable descriptor rebuilding this client in other processes.
+        """
+        from api_call.client_descriptor import ClientDescriptor
+
+        return ClientDescriptor.from_client(self, include_token=include_token)
+
     def get_pdca(self):
         if self._pdca_client:
             return self._pdca_client
@@ -154,23 +258,30 @@ class APIClient:
             )
         return url, headers
 
-    @retry(times=3)
     def _request(
             self,
             method: str,
             endpoint: str,
             url: str = None,
             headers: Dict = None,
+            retry: int = None,
             **kwargs,
     ) -> Response:
         url, headers = self._get_default(url, headers, "data" in kwargs)
         endpoint = self._format_endpoint(endpoint)
         url += endpoint
         logger.debug(f"method: {method} url: {url} headers: {headers}")
-        response = self.method_fun[method](
-            url=url, headers=headers, verify=self._auth.verify, **kwargs
+        response = self.transport.send(
+            self.method_fun[method],
+            method,
+            url=url,
+            max_attempts=retry,
+            headers=headers,
+            verify=self._auth.verify,
+            **kwargs,
         )
-        response.close()
+        if not kwargs.get("stream", False):
+            response.close()
         return response
 
     def get_request(
@@ -0,0 +1,91 @@
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from api_call.arium.api.transport import Transport
+from api_call.client import APIClient
+from auth.okta_auth import Auth
+from auth.token_cache import TokenCache
+from config.constants import CLIENT_ID
+from config.get_logger import get_logger
+
+logger = get_logger(__name__)
+
+_clients: Dict[Tuple, APIClient] = {}
+_clients_lock = threading.Lock()
+
+
+@dataclass
+class ClientDescriptor:
+    """
+    Picklable description of an APIClient, used to rebuild the client in worker processes
+    ('multiprocessing', 'ProcessPoolExecutor') without a new interactive authentication.
+
+    The descriptor carries the token (or the token cache which holds it) and the client
+    credentials of the settings, so it has to be handled as a secret. The rebuilt clients never
+    start the interactive (web) login: when the token can not be used or refreshed, creating
+    them raises InteractiveLoginRequired.
+
+    :param tenant: The tenant of the client.
+    :param role: The role of the client.
+    :param settings: The resolved auth settings.
+    :param authorization_code: Whether the authorization code (web) flow is used.
+    :param verify: Whether SSL certificates are verified.
+    :param token: The OAuth token reused by the rebuilt clients.
+    :param token_cache: The token cache used by the rebuilt clients instead of the token.
+    :param transport: Keyword arguments of the Transport of the rebuilt clients.
+    """
+
+    tenant: str
+    role: str
+    settings: Dict = field(repr=False)
+    authorization_code: bool = True
+    verify: bool = True
+    token: Optional[Dict] = field(default=None, repr=False)
+    token_cache: Optional[TokenCache] = None
+    transport: Dict = field(default_factory=dict)
+
+    @classmethod
+    def from_client(cls, client: APIClient, include_token: bool = True) -> "ClientDescriptor":
+        transport = client.transport
+        return cls(
+            **client._auth.init_kwargs(include_token=include_token),
+            transport={
+                "pool_connections": transport.pool_connections,
+                "pool_maxsize": transport.pool_maxsize,
+                "pool_block": transport.pool_block,
+                "timeout": transport.timeout,
+                "keep_alive": transport.keep_alive,
+            },
+        )
+
+    def auth(self) -> Auth:
+        return Auth(
+            tenant=self.tenant,
+            role=self.role,
+            settings=dict(self.settings),
+            authorization_code=self.authorization_code,
+            verify=self.verify,
+            token_cache=self.token_cache,
+            token=self.token,
+            interactive=False,
+        )
+
+    def connect(self) -> APIClient:
+        """
+        Creates a new client.
+        """
+        return APIClient(auth=self.auth(), transport=Transport(**self.transport))
+
+    def client(self) -> APIClient:
+        """
+        Returns the client of the current process, created on first use.
+        Tasks executed by the same worker process share one client.
+        """
+        key = (os.getpid(), self.tenant, self.role, self.settings.get(CLIENT_ID))
+        with _clients_lock:
+            if key not in _clients:
+                logger.debug(f"Creating client of {self.tenant}, {self.role} in process {key[0]}.")
+                _clients[key] = self.connect()
+            return _clients[key]
@@ -1,23 +1,180 @@
-from typing import Union, TYPE_CHECKING
+import threading
+from typing import Dict, List, Optional, Tuple, Union
 
-if TYPE_CHECKING:
-    from api_call.client import APIClient
+from api_call.arium.api.transport import Transport
+from api_call.client import APIClient
+from auth.okta_auth import Auth
+from config.get_logger import get_logger
 
+logger = get_logger(__name__)
 
-def set_client(client: "APIClient", workspace):
-    global global_client
-    if global_client is None:
-        global_client = {}
-    global_client[workspace] = client
 
-
-def get_client(workspace) -> Union[None, "APIClient"]:
-    global global_client
-    if isinstance(global_client, dict):
-        return global_client.get(
-            workspace, global_client[list(global_client.keys())[-1]]
+class UnknownWorkspaceError(KeyError):
+    def __init__(self, workspace: str, role: str = None, known: List[str] = None):
+        self.workspace = workspace
+        self.role = role
+        target = workspace if role is None else f"{workspace} (role {role})"
+        super().__init__(
+            f"No client registered for workspace {target}. Registered: {', '.join(known or []) or 'none'}."
         )
-    return None
 
 
-global_client = None
+class ClientRegistry:
+    """
+    Clients of many workspaces (tenants) and roles sharing one transport, so switching
+    workspaces reuses the connection pool, the retry budget and the rate limits.
+
+    Each tenant and role is authenticated once, 'add' returns the existing client
+    afterward. Looking up a workspace which was not registered raises UnknownWorkspaceError.
+    Clients created elsewhere and added with 'register' (or 'set_client') keep their own
+    transport; the shared one is created when the first client is added.
+
+    :param settings: Default auth settings of the added clients.
+    :param transport: The transport shared by the clients, created when needed if not given.
+    :param auth_kwargs: Default keyword arguments of the Auth of the added clients.
+    """
+
+    def __init__(
+            self,
+            settings: Union[Dict, str] = None,
+            transport: Transport = None,
+            **auth_kwargs,
+    ):
+        self.settings = settings
+        self._transport = transport
+        self.auth_kwargs = auth_kwargs
+        self._clients: Dict[Tuple[str, str], APIClient] = {}
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"ClientRegistry(workspaces={self.workspaces()})"
+
+    def __contains__(self, workspace: str) -> bool:
+        return workspace in self.workspaces()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    @property
+    def transport(self) -> Transport:
+        if self._transport is None:
+            with self._lock:
+                if self._transport is None:
+                    self._transport = Transport()
+        return self._transport
+
+    def workspaces(self) -> List[str]:
+        with self._lock:
+            return list(dict.fromkeys(tenant for tenant, _ in self._clients))
+
+    def add(
+            self,
+            tenant: str,
+            role: str,
+            settings: Union[Dict, str] = None,
+            **auth_kwargs,
+    ) -> APIClient:
+        """
+        Authenticates the tenant and role on the shared transport, once.
+        """
+        key = (tenant, role)
+        with self._lock:
+            if key in self._clients:
+                return self._clients[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._clients:
+                    return self._clients[key]
+
+            settings = settings if settings is not None else self.settings
+            if settings is None:
+                raise ValueError("'settings' parameter is required.")
+            if isinstance(settings, dict):
+                settings = dict(settings)
+            auth = Auth(tenant=tenant, role=role, settings=settings, **{**self.auth_kwargs, **auth_kwargs})
+            client = APIClient(auth=auth, transport=self.transport)
+
+            with self._lock:
+                self._clients[key] = client
+        logger.info(f"Registered client of {tenant}, {role}.")
+        return client
+
+    def register(self, client: APIClient, workspace: str = None) -> APIClient:
+        """
+        Registers an existing client, under its tenant unless 'workspace' is given.
+        The client keeps its own transport.
+        """
+        workspace = workspace if workspace is not None else client.get_workspace()
+        with self._lock:
+            self._clients[(workspace, client._auth.role)] = client
+        return client
+
+    def get(self, workspace: str, role: str = None) -> APIClient:
+        """
+        Returns the client of the workspace. 'role' is required when the workspace
+        is registered with several roles.
+        """
+        with self._lock:
+            if role is not None:
+                client = self._clients.get((workspace, role), None)
+                candidates = [client] if client is not None else []
+            else:
+                candidates = [
+                    client for (tenant, _), client in self._clients.items() if tenant == workspace
+                ]
+            known = list(dict.fromkeys(tenant for tenant, _ in self._clients))
+
+        if not candidates:
+            raise UnknownWorkspaceError(workspace, role, known)
+        if len(candidates) > 1:
+            raise ValueError(f"Workspace {workspace} is registered with several roles, specify 'role'.")
+        return candidates[0]
+
+    def remove(self, workspace: str, role: str = None):
+        with self._lock:
+            for key in [key for key in self._clients if key[0] == workspace and role in (None, key[1])]:
+                del self._clients[key]
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client._auth.close()
+        if self._transport is not None:
+            self._transport.close()
+
+
+registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ClientRegistry:
+    """
+    Returns the process wide registry used by 'set_client' and 'get_client'.
+    """
+    global registry
+    if registry is None:
+        with _registry_lock:
+            if registry is None:
+                registry = ClientRegistry()
+    return registry
+
+
+def set_client(client: APIClient, workspace):
+    """
+    Registers the client for the workspace, the client keeps its own transport.
+    """
+    get_registry().register(client, workspace)
+
+
+def get_client(workspace) -> APIClient:
+    """
+    Returns the client registered for the workspace, raises UnknownWorkspaceError
+    if there is none (instead of returning the client of another workspace).
+    """
+    return get_registry().get(workspace)
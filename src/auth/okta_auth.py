@@ -1,15 +1,18 @@
 import json
 import socket
 import sys
+import threading
 import webbrowser
 import urllib3
 
 from os import environ, path
-from typing import List, Dict, Union, Any, Tuple
+from typing import List, Dict, Union, Any, Tuple, Optional
 
 from oauthlib.oauth2 import BackendApplicationClient
 from requests_oauthlib import OAuth2Session
 
+from auth.token_cache import TokenCache, is_expired
+from auth.token_refresher import TokenRefresher
 from config.constants import *
 from config.get_logger import get_logger
 
@@ -43,6 +46,42 @@ def _create_settings(settings: Dict):
         settings[BASE_URI] = uri
 
 
+class InteractiveLoginRequired(Exception):
+    """
+    The token can not be used or refreshed and the web (authorization code) flow is disabled.
+    """
+
+
+# expired tokens are renewed before the requests this number of seconds before the expiry
+REFRESH_MARGIN = 10
+
+
+class AuthSession(OAuth2Session):
+    """
+    OAuth2Session renewing an expiring token through its Auth before sending a request.
+    The renewal is locked and double checked in 'Auth.refresh', so the threads sharing
+    the session refresh the token once instead of racing on the token endpoint.
+    """
+
+    def __init__(self, auth: "Auth", *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # not 'auth', which is the requests authentication of the session
+        self.token_owner = auth
+
+    def request(self, method, url, *args, withhold_token=False, **kwargs):
+        token = self.token
+        if (
+            not withhold_token
+            and token.get("expires_at") is not None
+            and is_expired(token, margin=REFRESH_MARGIN)
+        ):
+            try:
+                self.token_owner.refresh(lead_time=REFRESH_MARGIN)
+            except Exception as e:
+                logger.warning(f"Failed to refresh the token: {e}")
+        return super().request(method, url, *args, withhold_token=withhold_token, **kwargs)
+
+
 class Auth:
     DEFAULT_SETTINGS = {
         PORT: 1410,
@@ -62,12 +101,24 @@ class Auth:
         authorization_code: bool = True,
         prefix="",
         verify: bool | None = None,
+        token_cache: TokenCache = None,
+        refresh_lead_time: Optional[float] = None,
+        token: Optional[Dict] = None,
+        interactive: bool = True,
     ):
         logger.debug(f"Init Auth: {tenant}, {role}.")
         self.role = role
         self.tenant = tenant
         self._config_path = path.dirname(path.abspath(__file__))
         self.client = None
+        self.token_cache = token_cache
+        self.refresher = None
+        self._scope = None
+        self._authorization_code = authorization_code
+        self._token_lock = threading.RLock()
+        self._initial_token = token
+        # without it, the web flow raises InteractiveLoginRequired (e.g. in worker processes)
+        self._interactive = interactive
 
         self._settings, authorization_code = self._get_settings(
             settings, prefix, authorization_code
@@ -94,6 +145,10 @@ class Auth:
         self._auth_user(authorization_code)
         logger.debug(f"Auth: {self.get_dict()}")
 
+        if refresh_lead_time is not None:
+            self.refresher = TokenRefresher(self, lead_time=refresh_lead_time)
+            self.refresher.start()
+
     def __repr__(self) -> str:
         return self.get_dict().__repr__()
 
@@ -186,13 +241,182 @@ class Auth:
             scope = ["tenant/" + self.tenant, "role/" + self.role]
             if authorization_code:
                 scope.append("offline_access")
+        self._scope = scope
+        self._authorization_code = authorization_code
+
+        if self._initial_token is not None:
+            token = self._usable_token(self._initial_token)
+            self._initial_token = None
+            if token is not None:
+                logger.info("Using the given token.")
+                self.client = self._session(token)
+                return
+
+        if self.token_cache is None:
+            self.client = self._fetch_session(scope, authorization_code)
+            return
 
-        self.client = (
+        with self.token_cache.lock(*self._cache_key()):
+            token = self._cached_token()
+            if token is not None:
+                logger.info("Using cached token.")
+                self.client = self._session(token)
+                return
+
+            self.client = self._fetch_session(scope, authorization_code)
+            self.token_cache.save(*self._cache_key(), self.client.token)
+
+    def _fetch_session(self, scope: List, authorization_code: bool) -> OAuth2Session:
+        if authorization_code and not self._interactive:
+            raise InteractiveLoginRequired(
+                f"No usable token for {self.tenant}, {self.role} and the interactive login is "
+                f"disabled. Authenticate again in the main process (or use a token cache)."
+            )
+        return (
             self._auth_user_web(scope)
             if authorization_code
             else self._auth_user_backend(scope)
         )
 
+    def _cache_key(self) -> Tuple[str, str, str]:
+        return self.tenant, self.role, self._settings[CLIENT_ID]
+
+    def _cached_token(self) -> Optional[Dict]:
+        """
+        Returns the cached token, refreshed with its refresh token if it is expired.
+        """
+        token = self.token_cache.load(*self._cache_key())
+        if token is None:
+            return None
+
+        usable = self._usable_token(token)
+        if usable is not None and usable is not token:
+            self.token_cache.save(*self._cache_key(), usable)
+        return usable
+
+    def _usable_token(self, token: Dict) -> Optional[Dict]:
+        """
+        Returns the token, refreshed with its refresh token if it is expired,
+        or None if it can not be used.
+        """
+        if not is_expired(token):
+            return token
+
+        if not token.get("refresh_token"):
+            return None
+
+        logger.info("Token expired, refreshing.")
+        try:
+            return self._refresh_token(token)
+        except Exception as e:
+            logger.warning(f"Failed to refresh the token: {e}")
+            return None
+
+    def _refresh_token(self, token: Dict) -> Dict:
+        return OAuth2Session(self._settings[CLIENT_ID], token=token).refresh_token(
+            self._settings[TOKEN_URL],
+            refresh_token=token["refresh_token"],
+            client_id=self._settings[CLIENT_ID],
+            client_secret=self._settings[CLIENT_SECRET],
+            verify=self.verify,
+        )
+
+    def refresh(self, lead_time: float = 0, force: bool = False) -> Dict:
+        """
+        Renews the access token if it expires within 'lead_time' seconds (or if 'force').
+        The new token is fetched without blocking the requests, which keep using
+        the current token until it is swapped. With a token cache, the renewal holds the
+        cache lock and a newer token cached by another process is used instead, so the
+        processes sharing the cache renew the token (and rotate its refresh token) once.
+        """
+        with self._token_lock:
+            token = self.client.token
+            if not force and not is_expired(token, margin=lead_time):
+                return token
+
+            if self.token_cache is None:
+                token = self._renew_token(token)
+                cached = False
+            else:
+                with self.token_cache.lock(*self._cache_key()):
+                    token, cached = self._renew_cached_token(token, lead_time)
+            self.client.token = token
+
+        if cached:
+            logger.info("Using the token refreshed by another process.")
+        else:
+            logger.info("Refreshed token.")
+            if self.token_cache is None:
+                self._token_updated(token)
+        return token
+
+    def _renew_cached_token(self, token: Dict, lead_time: float) -> Tuple[Dict, bool]:
+        """
+        Returns the cached token if it is newer than 'token' and does not expire within
+        'lead_time' seconds, else the renewed token, saved to the cache. To be called
+        with the cache lock.
+        """
+        latest = self.token_cache.load(*self._cache_key())
+        expires_at = float(token.get("expires_at") or 0)
+        if latest is not None and float(latest.get("expires_at") or 0) > expires_at:
+            if not is_expired(latest, margin=lead_time):
+                return latest, True
+            # renewed with the latest refresh token, the previous one may be rotated
+            token = latest
+
+        token = self._renew_token(token)
+        self.token_cache.save(*self._cache_key(), token)
+        return token, False
+
+    def _renew_token(self, token: Dict) -> Dict:
+        if token.get("refresh_token"):
+            return self._refresh_token(token)
+        if not self._authorization_code:
+            return self._auth_user_backend(self._scope).token
+        raise Exception("The token can not be refreshed, it has no refresh token.")
+
+    def init_kwargs(self, include_token: bool = True) -> Dict:
+        """
+        Keyword arguments creating an equivalent Auth, used by the client descriptors.
+        The token is included only if 'include_token' and no token cache is used.
+        """
+        settings = {k: v for k, v in self._settings.items() if v is not None}
+        kwargs = {
+            "tenant": self.tenant,
+            "role": self.role,
+            "settings": settings,
+            "authorization_code": self._authorization_code,
+            "verify": self.verify,
+        }
+        if self.token_cache is not None:
+            kwargs["token_cache"] = self.token_cache
+        elif include_token and self.client is not None:
+            kwargs["token"] = dict(self.client.token)
+        return kwargs
+
+    def close(self):
+        if self.refresher is not None:
+            self.refresher.stop()
+
+    def _token_updated(self, token: Dict):
+        logger.debug("Updated token.")
+        if self.token_cache is not None:
+            with self.token_cache.lock(*self._cache_key()):
+                self.token_cache.save(*self._cache_key(), token)
+
+    def _session(self, token: Dict) -> OAuth2Session:
+        return AuthSession(
+            self,
+            self._settings[CLIENT_ID],
+            token=token,
+            auto_refresh_url=self._settings[TOKEN_URL],
+            auto_refresh_kwargs={
+                "client_id": self._settings[CLIENT_ID],
+                "client_secret": self._settings[CLIENT_SECRET],
+            },
+            token_updater=self._token_updated,
+        )
+
     def _auth_user_backend(self, scope: List) -> OAuth2Session:
         logger.debug("Backend flow")
 
@@ -208,18 +432,7 @@ class Auth:
             scope=scope,
             verify=self.verify,
         )
-        client = OAuth2Session(
-            self._settings[CLIENT_ID],
-            token=token,
-            auto_refresh_url=self._settings[TOKEN_URL],
-            auto_refresh_kwargs={
-                "client_id": self._settings[CLIENT_ID],
-                "client_secret": self._settings[CLIENT_SECRET],
-            },
-            token_updater=lambda _: logger.debug("Updated token."),
-        )
-
-        return client
+        return self._session(token)
 
     def _auth_user_web(self, scope: List) -> OAuth2Session:
         logger.debug("Web flow (authorization code)")
@@ -241,18 +454,7 @@ class Auth:
             client_secret=self._settings[CLIENT_SECRET],
             verify=self.verify,
         )
-        client = OAuth2Session(
-            self._settings[CLIENT_ID],
-            token=token,
-            auto_refresh_url=self._settings[TOKEN_URL],
-            auto_refresh_kwargs={
-                "client_id": self._settings[CLIENT_ID],
-                "client_secret": self._settings[CLIENT_SECRET],
-            },
-            token_updater=lambda _: logger.debug("Updated token."),
-        )
-
-        return client
+        return self._session(token)
 
     def _wait_for_response(self, uri: str) -> bytes:
         webbrowser.open(uri)
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from config.get_logger import get_logger
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+logger = get_logger(__name__)
+
+DEFAULT_TOKEN_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".arium", "tokens")
+
+# tokens expiring within this number of seconds are not reused
+EXPIRY_MARGIN = 60
+
+
+def _lock_file(f):
+    if os.name == "nt":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(f):
+    if os.name == "nt":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def is_expired(token: Dict, margin: float = EXPIRY_MARGIN) -> bool:
+    """
+    Whether the access token expires within 'margin' seconds.
+    """
+    expires_at = token.get("expires_at", None)
+    if expires_at is None:
+        return True
+    return float(expires_at) - margin <= time.time()
+
+
+class TokenCache:
+    """
+    On disk cache of OAuth tokens, keyed by tenant, role and client id.
+
+    The token files are readable by the owner only (0600, in a 0700 directory) and are
+    replaced atomically. 'lock' holds an exclusive file lock of a key, so processes
+    starting at the same time authenticate once and share the cached token.
+
+    :param path: Directory of the token files.
+    """
+
+    def __init__(self, path: str = DEFAULT_TOKEN_CACHE_PATH):
+        self.path = path
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"TokenCache(path={self.path})"
+
+    def __getstate__(self) -> Dict:
+        return {"path": self.path}
+
+    def __setstate__(self, state: Dict):
+        self.__init__(state["path"])
+
+    @staticmethod
+    def key(tenant: str, role: str, client_id: str) -> str:
+        return hashlib.sha256(f"{tenant}\0{role}\0{client_id}".encode("utf-8")).hexdigest()
+
+    def _file(self, key: str, extension: str = "json") -> str:
+        return os.path.join(self.path, f"{key}.{extension}")
+
+    @contextmanager
+    def lock(self, tenant: str, role: str, client_id: str) -> Iterator[None]:
+        """
+        Exclusive lock of the key, across the threads and the processes.
+        """
+        key = self.key(tenant, role, client_id)
+        with self._locks_lock:
+            thread_lock = self._locks.setdefault(key, threading.Lock())
+
+        with thread_lock:
+            fd = os.open(self._file(key, "lock"), os.O_RDWR | os.O_CREAT, 0o600)
+            with os.fdopen(fd, "r+b") as f:
+                _lock_file(f)
+                try:
+                    yield
+                finally:
+                    _unlock_file(f)
+
+    def load(self, tenant: str, role: str, client_id: str) -> Optional[Dict]:
+        file = self._file(self.key(tenant, role, client_id))
+        try:
+            with open(file) as f:
+                token = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable token cache file {file}: {e}")
+            return None
+
+        logger.debug(f"Loaded cached token of {tenant}, {role}.")
+        return token
+
+    def save(self, tenant: str, role: str, client_id: str, token: Dict):
+        file = self._file(self.key(tenant, role, client_id))
+        temp = f"{file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(dict(token), f)
+            os.replace(temp, file)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        logger.debug(f"Cached token of {tenant}, {role}.")
+
+    def remove(self, tenant: str, role: str, client_id: str):
+        try:
+            os.remove(self._file(self.key(tenant, role, client_id)))
+        except FileNotFoundError:
+            pass
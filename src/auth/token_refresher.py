@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Callable, Optional, TYPE_CHECKING
+
+from auth.token_cache import EXPIRY_MARGIN
+from config.get_logger import get_logger
+
+if TYPE_CHECKING:
+    from auth.okta_auth import Auth
+
+logger = get_logger(__name__)
+
+DEFAULT_LEAD_TIME = 300.0
+DEFAULT_RETRY_INTERVAL = 30.0
+
+
+class TokenRefresher:
+    """
+    Daemon thread renewing the access token of an Auth 'lead_time' seconds before it expires,
+    so the requests never wait for the token endpoint. For short lived tokens the lead time
+    is limited to half of the token lifetime. Failed refreshes are retried every
+    'retry_interval' seconds while the current token is valid.
+
+    :param auth: The Auth whose token is refreshed.
+    :param lead_time: Number of seconds before the expiry when the token is renewed.
+    :param retry_interval: Number of seconds between the attempts after a failed refresh.
+    """
+
+    def __init__(
+            self,
+            auth: "Auth",
+            lead_time: float = DEFAULT_LEAD_TIME,
+            retry_interval: float = DEFAULT_RETRY_INTERVAL,
+            clock: Callable[[], float] = time.time,
+    ):
+        self.auth = auth
+        self.lead_time = lead_time
+        self.retry_interval = retry_interval
+        self._clock = clock
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __repr__(self) -> str:
+        return f"TokenRefresher(lead_time={self.lead_time}, retry_interval={self.retry_interval})"
+
+    def effective_lead_time(self) -> float:
+        expires_in = self.auth.client.token.get("expires_in", None)
+        if expires_in is None:
+            return max(self.lead_time, EXPIRY_MARGIN)
+        return min(max(self.lead_time, EXPIRY_MARGIN), float(expires_in) / 2)
+
+    def next_refresh_in(self) -> Optional[float]:
+        """
+        Number of seconds until the token has to be renewed, None if it does not expire.
+        """
+        expires_at = self.auth.client.token.get("expires_at", None)
+        if expires_at is None:
+            return None
+        return max(0.0, float(expires_at) - self.effective_lead_time() - self._clock())
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="arium-token-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.next_refresh_in()):
+            try:
+                self.auth.refresh(lead_time=self.effective_lead_time())
+            except Exception as e:
+                logger.warning(
+                    f"Failed to refresh the token: {e}, retrying in {self.retry_interval} seconds."
+                )
+                if self._stop.wait(self.retry_interval):
+                    return
@@ -0,0 +1,310 @@
+"""
+The benchmarks of the client hot paths. The decoding benchmarks use recorded
+responses, the upload and report benchmarks run against the fake server and the
+PDCA benchmarks run the map and merge steps on synthetic submissions.
+"""
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+
+import requests
+
+from fake_server import FakeAriumServer, report_zip
+from harness import Workload, benchmark
+import pdca_data
+
+from api_call.arium.api import request
+from api_call.arium.api.client_activity import REPORT_SPILL_SIZE, ReportsClient
+from api_call.arium.api.request import get_content, read_csv
+from api_call.arium.api.zip_csv import iter_zip_csv
+from api_call.arium.model.activity import Activity, ActivityList
+
+MATCH_SCHEMA = 1
+AUGMENT_SCHEMA = 2
+
+
+def recorded_response(content: bytes, status_code: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers["Content-Length"] = str(len(content))
+    return response
+
+
+def report_csv(rows: int) -> bytes:
+    return zipfile.ZipFile(io.BytesIO(report_zip("a1", rows))).read("report.csv")
+
+
+def activity_record(n: int) -> dict:
+    return {
+        "activityId": f"00000000-0000-0000-0000-{n:012d}",
+        "workspace": "ws1",
+        "name": f"calculation {n}",
+        "activityType": ("calculation", "lossExport")[n % 2],
+        "mode": ("deterministic", "stochastic")[n % 2],
+        "status": ("queued", "running", "completed", "failed")[n % 4],
+        "payload": {
+            "references": [f"portfolio-{n}", f"scenario-{n % 7}"],
+            "output": [{
+                "exportType": "ylt",
+                "parameters": {"projections": ["portfolio", "lob"], "perspectives": ["grossLoss"]},
+            }],
+        },
+        "lastUpdate": "2024-05-01T10:00:00Z",
+        "createdAt": "2024-05-01T09:00:00Z",
+        "initiatedBy": "user@example.com",
+        "startTime": "2024-05-01T09:00:05Z",
+        "progress": 100,
+        "endTime": "2024-05-01T09:59:00Z",
+    }
+
+
+# get_content and read_csv: recorded responses
+
+
+@benchmark("get_content.json", unit="records", size=50_000)
+def get_content_json(size):
+    content = json.dumps({"count": size, "list": [activity_record(n) for n in range(size)]}).encode()
+    response = recorded_response(content)
+    yield Workload(
+        lambda: get_content(response, get_from_location=False), items=size, bytes=len(content)
+    )
+
+
+@benchmark("get_content.csv", unit="rows", size=200_000)
+def get_content_csv(size):
+    content = report_csv(size)
+    response = recorded_response(content)
+    yield Workload(
+        lambda: get_content(response, get_from_location=False, csv_content=True, unzip=False),
+        items=size,
+        bytes=len(content),
+    )
+
+
+@benchmark("get_content.zip", unit="rows", size=200_000)
+def get_content_zip(size):
+    content = report_zip("a1", size)
+    response = recorded_response(content)
+    yield Workload(
+        lambda: get_content(response, get_from_location=False, csv_content=True),
+        items=size,
+        bytes=len(content),
+    )
+
+
+@benchmark("read_csv", unit="rows", size=200_000)
+def read_csv_lines(size):
+    content = report_csv(size)
+    lines = content.splitlines()
+    yield Workload(lambda: list(read_csv(lines)), items=size, bytes=len(content))
+
+
+@benchmark("iter_zip_csv", unit="rows", size=200_000)
+def zip_csv_rows(size):
+    """
+    Streams the rows of a zipped report without keeping them.
+    """
+    content = report_zip("a1", size)
+    yield Workload(lambda: sum(1 for _ in iter_zip_csv(content)), items=size, bytes=len(content))
+
+
+# models
+
+
+@benchmark("model.activity_list", unit="records", size=2_000, repeat=3)
+def activity_list(size):
+    content = {"count": size, "list": [activity_record(n) for n in range(size)]}
+    yield Workload(lambda: ActivityList.from_dict(content), items=size)
+
+
+@benchmark("model.activity", unit="records", size=2_000, repeat=3)
+def activity(size):
+    records = [activity_record(n) for n in range(size)]
+    yield Workload(lambda: [Activity.from_dict(record) for record in records], items=size)
+
+
+# fake server
+
+
+def _read(file, chunk_size=1024 * 1024) -> int:
+    return sum(len(chunk) for chunk in iter(lambda: file.read(chunk_size), b""))
+
+
+def _report_files(size, spill_size):
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        rows = report_csv(size // 4)
+        for part in range(4):
+            zip_file.writestr(f"part-{part}/report.csv", rows)
+
+    with FakeAriumServer() as server:
+        server.blobs["reports/a1/report.zip"] = data.getvalue()
+        client = server.client()
+
+        def run():
+            report = ReportsClient(client, "a1", spill_size=spill_size).list()[0]
+            return [(name, _read(content)) for name, content in report.files()]
+
+        yield Workload(run, items=size, bytes=len(data.getvalue()))
+        client.transport.close()
+
+
+@benchmark("report.files", unit="rows", size=200_000)
+def report_files(size):
+    """
+    Lists the reports of an activity, downloads the report and reads its four files.
+    """
+    yield from _report_files(size, REPORT_SPILL_SIZE)
+
+
+@benchmark("report.files.spilled", unit="rows", size=200_000)
+def report_files_spilled(size):
+    """
+    As 'report.files', with the report downloaded into a temporary file.
+    """
+    yield from _report_files(size, 0)
+
+
+def _report_summary(size, ranges):
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w") as zip_file:
+        zip_file.writestr("summary.csv", report_csv(100))
+        # a loss export is not compressible much
+        zip_file.writestr("ylt/report.csv", os.urandom(size))
+
+    # 200 MB/s, the reads from the storage are measured, not the fake server copies
+    with FakeAriumServer(bandwidth=200 * 1024 * 1024, ranges=ranges) as server:
+        server.blobs["reports/a1/report.zip"] = data.getvalue()
+        client = server.client()
+
+        def run():
+            report = ReportsClient(client, "a1").list()[0]
+            return list(report.rows("summary.csv"))
+
+        yield Workload(run, items=len(data.getvalue()), bytes=len(data.getvalue()))
+        client.transport.close()
+
+
+@benchmark("report.summary", unit="bytes", size=256 * 1024 * 1024, repeat=3)
+def report_summary(size):
+    """
+    Reads the summary file of a large loss export, fetched with Range requests.
+    """
+    yield from _report_summary(size, ranges=True)
+
+
+@benchmark("report.summary.download", unit="bytes", size=256 * 1024 * 1024, repeat=3)
+def report_summary_download(size):
+    """
+    As 'report.summary', from a storage without Range requests: the report is downloaded.
+    """
+    yield from _report_summary(size, ranges=False)
+
+
+@benchmark("report.download", unit="bytes", size=128 * 1024 * 1024, repeat=3)
+def report_download(size):
+    """
+    Downloads a report to a file, in chunks through the '.part' file.
+    """
+    folder = tempfile.mkdtemp()
+    with FakeAriumServer() as server:
+        server.blobs["reports/a1/report.zip"] = os.urandom(size)
+        client = server.client()
+
+        def run():
+            report = ReportsClient(client, "a1").list()[0]
+            report.download(os.path.join(folder, "report.zip"))
+
+        yield Workload(run, items=size, bytes=size)
+        client.transport.close()
+    shutil.rmtree(folder)
+
+
+@benchmark("asset_post.digest", unit="bytes", size=64 * 1024 * 1024)
+def asset_post_digest(size):
+    file = io.BytesIO(os.urandom(1024 * 1024) * (size // (1024 * 1024)))
+    yield Workload(lambda: request.file_digest(file), items=size, bytes=size)
+
+
+@benchmark("asset_post.upload", unit="bytes", size=16 * 1024 * 1024)
+def asset_post_upload(size):
+    """
+    Digest, create and presigned upload of a file, without waiting for the processing.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "portfolio.csv")
+        with open(path, "wb") as f:
+            f.write(os.urandom(1024 * 1024) * (size // (1024 * 1024)))
+
+        with FakeAriumServer() as server:
+            client = server.client()
+
+            def run():
+                server.blobs.clear()
+                return request.asset_post(
+                    client, "portfolios", "portfolio", file=path, presigned=True, wait=False
+                )
+
+            yield Workload(run, items=size, bytes=size)
+            client.transport.close()
+
+
+# PDCA
+
+
+@contextlib.contextmanager
+def _pdca_workspace(size):
+    folder = tempfile.mkdtemp(prefix="pdca-benchmark-")
+    cwd = os.getcwd()
+    # the reference data is unlocked by data/secret.json of the working directory
+    os.chdir(folder)
+    try:
+        yield pdca_data.create_workspace(folder, size)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def _no_exit(fun, *args, **kwargs):
+    # the steps exit on validation errors, a benchmark must fail instead
+    try:
+        return fun(*args, **kwargs)
+    except SystemExit:
+        raise RuntimeError(f"{fun.__name__} found validation errors in the synthetic data.")
+
+
+@benchmark("pdca.map_data", unit="rows", size=100_000, repeat=1, group="pdca")
+def pdca_map(size):
+    from api_call.arium.pdca_data_processing.map import map_data
+
+    with _pdca_workspace(size) as arguments:
+        yield Workload(lambda: _no_exit(map_data, **arguments), items=size)
+
+
+@benchmark("pdca.merge_data", unit="rows", size=100_000, repeat=1, group="pdca")
+def pdca_merge(size):
+    from api_call.arium.pdca_data_processing.map import map_data, modify_api_input
+    from api_call.arium.pdca_data_processing.merge import merge_data
+
+    with _pdca_workspace(size) as arguments:
+        output_folder = arguments["output_folder"]
+        _no_exit(map_data, **arguments)
+        modify_api_input(output_folder=output_folder)
+        pdca_data.write_pdca_results(output_folder, MATCH_SCHEMA, AUGMENT_SCHEMA)
+
+        yield Workload(
+            lambda: _no_exit(
+                merge_data,
+                match_schema=MATCH_SCHEMA,
+                augment_schema=AUGMENT_SCHEMA,
+                confidence=5,
+                output_folder=output_folder,
+                ref_data_folder=arguments["ref_data_folder"],
+            ),
+            items=size,
+        )
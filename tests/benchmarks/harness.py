@@ -0,0 +1,244 @@
+"""
+Measurement and baseline comparison of the benchmarks.
+
+A benchmark is a generator function registered with 'benchmark'. It prepares its
+data, yields a 'Workload' and cleans up after the measurement:
+
+    @benchmark("read_csv", unit="rows", size=200_000)
+    def read_csv_benchmark(size):
+        lines = ...
+        yield Workload(lambda: list(read_csv(lines)), items=size, bytes=...)
+"""
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+# time varies between runs more than memory does
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.10
+
+
+@dataclass
+class Workload:
+    """
+    :param run: The measured operation.
+    :param items: The number of items (rows, records, files) processed by one run.
+    :param bytes: The number of bytes processed by one run, if it makes sense.
+    """
+    run: Callable[[], object]
+    items: int
+    bytes: Optional[int] = None
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[int], Iterator[Workload]]
+    unit: str
+    size: int
+    repeat: int = 5
+    group: str = "client"
+
+    def workload(self, size: int = None):
+        return contextlib.contextmanager(self.setup)(self.size if size is None else size)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, unit: str, size: int, repeat: int = 5, group: str = "client"):
+    """
+    Registers a benchmark.
+
+    :param name: The name of the benchmark, also its key in the baselines.
+    :param unit: The unit of the throughput (items per second).
+    :param size: The default size passed to the benchmark (rows, records, bytes).
+    :param repeat: The number of timed runs, a warm-up run is done before them when more than one.
+    :param group: The group of the benchmark, for selecting them from the command line.
+    """
+
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, unit, size, repeat, group)
+        return setup
+
+    return register
+
+
+def _peak_rss() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (MB if sys.platform == "darwin" else 1024), 1)
+
+
+def measure(bench: Benchmark, size: int = None, allocations: bool = True) -> Dict:
+    """
+    Runs the benchmark: the median and best time of 'repeat' runs, the peak RSS of the
+    process after the setup and after the runs and, with 'allocations', the peak and the
+    retained memory allocated by a run, traced in a separate run.
+    The peak RSS is the peak of the whole process, run one benchmark per process.
+    """
+    size = bench.size if size is None else size
+    with bench.workload(size) as workload:
+        setup_rss = _peak_rss()
+        if bench.repeat > 1:
+            workload.run()
+
+        times = []
+        for _ in range(bench.repeat):
+            gc.collect()
+            start = time.perf_counter()
+            workload.run()
+            times.append(time.perf_counter() - start)
+        peak_rss = _peak_rss()
+
+        alloc_peak = alloc_retained = None
+        if allocations:
+            gc.collect()
+            tracemalloc.start()
+            result = workload.run()
+            alloc_retained, alloc_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del result
+
+    seconds = statistics.median(times)
+    result = {
+        "size": size,
+        "unit": bench.unit,
+        "runs": len(times),
+        "seconds": round(seconds, 6),
+        "best_seconds": round(min(times), 6),
+        "throughput": round(workload.items / seconds, 1),
+        "mb_per_s": round(workload.bytes / MB / seconds, 1) if workload.bytes else None,
+        "setup_rss_mb": setup_rss,
+        "peak_rss_mb": peak_rss,
+        "alloc_peak_mb": None if alloc_peak is None else round(alloc_peak / MB, 2),
+        "alloc_retained_mb": None if alloc_retained is None else round(alloc_retained / MB, 2),
+    }
+    return result
+
+
+def machine() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+@dataclass
+class Comparison:
+    name: str
+    result: Dict
+    baseline: Optional[Dict]
+    changes: Dict[str, float] = field(default_factory=dict)
+    regressions: List[str] = field(default_factory=list)
+    note: str = ""
+
+
+def _change(value, baseline_value) -> Optional[float]:
+    if value is None or not baseline_value:
+        return None
+    return value / baseline_value - 1
+
+
+def compare(
+        results: Dict[str, Dict],
+        baselines: Dict[str, Dict],
+        time_tolerance: float = TIME_TOLERANCE,
+        memory_tolerance: float = MEMORY_TOLERANCE,
+) -> List[Comparison]:
+    """
+    Compares the results with the baselines of the same size. The time is compared by the
+    median, the memory by the peak RSS and the peak of the traced allocations. A change
+    over the tolerance (a fraction of the baseline) is a regression.
+    """
+    comparisons = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        comparison = Comparison(name, result, baseline)
+        comparisons.append(comparison)
+        if baseline is None:
+            comparison.note = "no baseline"
+            continue
+        if baseline["size"] != result["size"]:
+            comparison.note = f"baseline size {baseline['size']}"
+            continue
+
+        for key, tolerance in (
+                ("seconds", time_tolerance),
+                ("peak_rss_mb", memory_tolerance),
+                ("alloc_peak_mb", memory_tolerance),
+        ):
+            change = _change(result.get(key), baseline.get(key))
+            if change is None:
+                continue
+            comparison.changes[key] = change
+            if change > tolerance:
+                comparison.regressions.append(key)
+    return comparisons
+
+
+def load_baselines(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {"machine": None, "benchmarks": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(path: str, results: Dict[str, Dict]):
+    """
+    Updates the baselines of the benchmarks in 'results', keeps the others.
+    """
+    baselines = load_baselines(path)
+    baselines["machine"] = machine()
+    baselines["benchmarks"] = dict(sorted({**baselines["benchmarks"], **results}.items()))
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2)
+        f.write("\n")
+
+
+def _format_change(change: Optional[float]) -> str:
+    return "" if change is None else f"{change:+.0%}"
+
+
+def report(comparisons: List[Comparison]) -> str:
+    """
+    A table of the results and their changes against the baselines.
+    """
+    header = (
+        f"{'benchmark':<28}{'size':>9}{'median s':>11}{'change':>8}{'throughput':>21}"
+        f"{'MB/s':>8}{'rss MB':>9}{'change':>8}{'alloc MB':>10}{'change':>8}  note"
+    )
+    lines = [header, "-" * len(header)]
+    for c in comparisons:
+        r = c.result
+        note = ", ".join(f"{key} regressed" for key in c.regressions) or c.note
+        lines.append(
+            f"{c.name:<28}{r['size']:>9}{r['seconds']:>11.4f}"
+            f"{_format_change(c.changes.get('seconds')):>8}"
+            f"{r['throughput']:>13.0f} {r['unit']:<7}"
+            f"{r['mb_per_s'] or '':>8}{r['peak_rss_mb'] or '':>9}"
+            f"{_format_change(c.changes.get('peak_rss_mb')):>8}"
+            f"{'' if r['alloc_peak_mb'] is None else r['alloc_peak_mb']:>10}"
+            f"{_format_change(c.changes.get('alloc_peak_mb')):>8}  {note}"
+        )
+    return "\n".join(lines)
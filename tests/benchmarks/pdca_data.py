@@ -0,0 +1,242 @@
+"""
+Synthetic PDCA submissions, reference data and match/augment results for the
+map and merge benchmarks. Everything is derived from the row number, so a
+workspace with the same number of rows is always the same.
+"""
+import base64
+import csv
+import json
+import os
+import random
+
+SECRET_PURPOSE = "benchmark"
+
+DATE_FORMAT = "%m/%d/%Y"
+
+# country, state codes, currency, jurisdiction
+COUNTRIES = [
+    ("US", ["NY", "CA", "TX", "IL", "WA"], "USD", "US"),
+    ("GB", ["NA"], "GBP", "UK"),
+    ("DE", ["NA"], "EUR", "EU"),
+    ("CA", ["ON", "QC", "BC"], "CAD", "CA"),
+]
+
+COUNTRY_NAMES = {"US": "United States", "GB": "United Kingdom", "DE": "Germany", "CA": "Canada"}
+
+# 2017 codes, some of them mapped to a different 2012 code
+NAICS = [111110, 221111, 236115, 311111, 325412, 423110, 522110, 541511, 621111, 722511]
+NAICS_2017_TO_2012 = {541511: 541512, 722511: 722513}
+
+SUBMISSION_COLUMNS = [
+    "Insured", "StreetName", "StreetNumber", "City", "PostalCode", "County", "State",
+    "Country", "PolicyCurrency", "LookupYear", "CoverageType", "InceptionDate",
+    "ExpirationDate", "OccurrenceLimit", "AggLimit", "AttachmentPoint", "LineShare",
+    "EmployeeNumber", "Turnover",
+]
+
+TEMPLATE_COLUMNS = [
+    "__company_id", "AccountName", "AccountNumber", "Country", "Jurisdiction",
+    "IndustryCode", "IndustryCodeSystem", "IndustryCodeView", "Turnover",
+    "EmployeeNumber", "SizeMetricFactor", "SizeMetricCurrency", "CoverageType",
+    "OccurrenceLimit", "AggLimit", "AttachmentPoint", "LineShare",
+]
+
+
+def _write_encoded(path: str, header: list, rows: list):
+    lines = [",".join(header)] + [",".join(str(value) for value in row) for row in rows]
+    with open(path, "w") as f:
+        f.write(base64.b64encode("\n".join(lines).encode()).decode())
+
+
+def write_secret(folder: str):
+    """
+    Writes 'data/secret.json' (read from the working directory) which unlocks the reference data.
+    """
+    os.makedirs(os.path.join(folder, "data"), exist_ok=True)
+    code = base64.b64encode(SECRET_PURPOSE[::-1].encode()).decode()
+    with open(os.path.join(folder, "data", "secret.json"), "w") as f:
+        json.dump({"purpose": SECRET_PURPOSE, "secret_code": code}, f)
+
+
+def write_ref_data(folder: str):
+    """
+    Writes the encoded reference data files used by the map and merge steps.
+    """
+    os.makedirs(folder, exist_ok=True)
+    countries, states, currencies, jurisdiction = [], [], [], []
+    for code, state_codes, currency, maps_to in COUNTRIES:
+        countries += [(code, code), (COUNTRY_NAMES[code], code)]
+        states += [(code, state, state) for state in state_codes]
+        currencies.append((currency, code))
+        jurisdiction.append((code, maps_to))
+
+    _write_encoded(folder + "countries.txt", ["input", "country_standard_value"], countries)
+    _write_encoded(folder + "states.txt", ["country_standard_value", "input", "state_standard_value"], states)
+    _write_encoded(folder + "currencies.txt", ["AlphabeticCode", "country_standard_value"], currencies)
+    _write_encoded(folder + "corporate_ext.txt", ["Extension", "Country"], [(" GmbH", "DE"), (" Ltd", "GB")])
+    _write_encoded(folder + "jurisdiction.txt", ["country_standard_value", "MapsToJurisdiction"], jurisdiction)
+    _write_encoded(
+        folder + "naics_mappings_v4.txt",
+        ["NAICS", "CodeSource", "Arium_NAICS"],
+        [(k, "2017to2012", v) for k, v in NAICS_2017_TO_2012.items()],
+    )
+    # the sector ranges make the code columns text, as in the delivered reference data
+    codes_2012 = [NAICS_2017_TO_2012.get(code, code) for code in NAICS]
+    _write_encoded(folder + "naics_2012.txt", ["NAICS2012"], [("31-33",)] + [(c,) for c in codes_2012])
+    _write_encoded(folder + "naics_2017.txt", ["NAICS2017"], [("31-33",)] + [(c,) for c in NAICS])
+    _write_encoded(
+        folder + "industry_sizes_naics2012_completed.txt",
+        ["NAICS2012", "jurisdiction", "AnnualSalesUSDollars_Millions"],
+        [("31-33", "US", 1)] + [
+            (code, maps_to, 10 + i)
+            for i, code in enumerate(codes_2012)
+            for _, _, _, maps_to in COUNTRIES
+        ],
+    )
+    _write_encoded(folder + "AriumTemplate.txt", TEMPLATE_COLUMNS, [])
+
+
+def write_template(path: str):
+    """
+    Writes the portfolio template, the customer calls the account name 'Insured'.
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Name", "CustomerName", "Required", "Default"])
+        writer.writerow(["AccountName", "Insured", 1, ""])
+        for column in SUBMISSION_COLUMNS[1:]:
+            writer.writerow([column, "", 1 if column != "County" else 0, ""])
+        writer.writerow(["SubmissionDate", "", 0, ""])
+
+
+def write_config_replace(path: str) -> dict:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["InputValue", "ValueToBeReplaced"])
+        writer.writerows([("GL", "GeneralLiability"), ("PL", "ProductsLiability"), ("X", "DELETE")])
+    return {"CoverageType": path}
+
+
+def _company(n: int):
+    country, state_codes, currency, _ = COUNTRIES[n % len(COUNTRIES)]
+    return country, state_codes[n % len(state_codes)], currency
+
+
+def write_submission(path: str, rows: int, seed: int = 0):
+    """
+    Writes a customer submission with 'rows' policies of about rows / 2 companies.
+    About 1% of the rows are duplicated, 1% are deleted by the coverage mapping and
+    0.25% have no country (it is determined from the currency).
+    """
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SUBMISSION_COLUMNS)
+        written = 0
+        while written < rows:
+            company = written // 2
+            country, state, currency = _company(company)
+            row = [
+                f"Company {company}",
+                f"Main Street {company % 500}",
+                company % 200 + 1,
+                f"City {company % 300}",
+                10000 + company % 90000,
+                "",
+                state,
+                "" if written % 100 == 50 and country == "US" else country,
+                currency,
+                2024,
+                "X" if written % 100 == 99 else ("GL", "PL")[written % 2],
+                f"01/{written % 28 + 1:02d}/2024",
+                f"12/{written % 28 + 1:02d}/2024",
+                rng.randint(1, 100) * 100_000,
+                rng.randint(1, 100) * 200_000,
+                rng.randint(0, 10) * 50_000,
+                rng.randint(1, 99),
+                rng.randint(10, 10_000),
+                rng.randint(1, 1_000) * 100_000,
+            ]
+            writer.writerow(row)
+            written += 1
+            if written % 100 == 98 and written < rows:
+                # an exact duplicate, removed by the map step
+                writer.writerow(row)
+                written += 1
+
+
+def _augment(duns: int, original_duns: int, name: str, country: str, n: int) -> dict:
+    codes = [NAICS[(n + i) % len(NAICS)] for i in range(n % 3 + 1)]
+    record = {
+        "original_duns": original_duns,
+        "dunsnumber": duns,
+        "businessname": name,
+        "streetaddress": f"Main Street {n % 500}",
+        "city": f"City {n % 300}",
+        "stateprovince": "",
+        "postal": str(10000 + n % 90000),
+        "country": country,
+        "annualsalesusdollars": 1_000_000 + n * 10,
+        "employeestotal": 10 + n % 5000,
+    }
+    record.update({f"naic{i + 1}": codes[i] if i < len(codes) else "" for i in range(6)})
+    return record
+
+
+def _write_batches(folder: str, prefix: str, records: list, batch_size: int):
+    os.makedirs(folder, exist_ok=True)
+    for batch, start in enumerate(range(0, len(records), batch_size)):
+        with open(os.path.join(folder, f"{prefix}-{batch}.json"), "w") as f:
+            json.dump({"masterData": records[start:start + batch_size]}, f)
+
+
+def write_pdca_results(output_folder: str, match_schema: int, augment_schema: int, batch_size: int = 1000):
+    """
+    Writes the match and augment results for the api input of the map step, as the match
+    step leaves them. 1% of the records are not matched, 1% are matched with a low
+    confidence and every 10th company has a subsidiary.
+    """
+    with open(output_folder + "api_input.csv", newline="") as f:
+        api_input = list(csv.DictReader(f))
+
+    match, augment = [], []
+    for record_id, row in enumerate(api_input, start=1):
+        if record_id % 100 == 0:
+            continue
+        duns = 100_000_000 + record_id
+        match.append({
+            "record_id": record_id,
+            "dunsnumber": duns,
+            "businessname": row["companyName"],
+            "confidence": 3 if record_id % 100 == 1 else 8,
+            "matchgrade": "AZZZZZZ",
+        })
+        augment.append(_augment(duns, duns, row["companyName"], row["country"], record_id))
+        if record_id % 10 == 0:
+            sub_duns = 500_000_000 + record_id
+            augment.append(_augment(sub_duns, duns, "Sub " + row["companyName"], row["country"], record_id + 1))
+
+    match_folder = f"{output_folder}match//match_{match_schema}/"
+    _write_batches(match_folder, f"match_{match_schema}", match, batch_size)
+    _write_batches(match_folder + f"augment_{augment_schema}/", f"augment_{augment_schema}", augment, batch_size)
+
+
+def create_workspace(folder: str, rows: int) -> dict:
+    """
+    Creates the secret, the reference data, the template and the submission in 'folder'
+    and returns the arguments of 'map_data'. The map and merge steps must run with
+    'folder' as the working directory.
+    """
+    write_secret(folder)
+    ref_data_folder = os.path.join(folder, "ref_data") + os.sep
+    write_ref_data(ref_data_folder)
+    write_template(os.path.join(folder, "template.csv"))
+    write_submission(os.path.join(folder, "submission.csv"), rows)
+    return {
+        "filepath": os.path.join(folder, "submission.csv"),
+        "filepath_template": os.path.join(folder, "template.csv"),
+        "config_replace": write_config_replace(os.path.join(folder, "coverage.csv")),
+        "ref_data_folder": ref_data_folder,
+        "output_folder": os.path.join(folder, "output") + os.sep,
+        "date_format": DATE_FORMAT,
+    }
@@ -0,0 +1,107 @@
+"""
+Runs the benchmarks and compares them with the baselines.
+
+    python tests/benchmarks/run.py                       # all benchmarks, compared with baselines.json
+    python tests/benchmarks/run.py -k get_content -k read_csv
+    python tests/benchmarks/run.py --group pdca --pdca-rows 1000000
+    python tests/benchmarks/run.py --save                # records the results as the new baselines
+
+Every benchmark runs in its own process, so that the peak RSS is its own. The exit code
+is 1 when a benchmark regressed over the tolerance.
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import warnings
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(HERE, '../../src')))
+sys.path.insert(0, os.path.abspath(os.path.join(HERE, '..')))
+sys.path.insert(0, HERE)
+
+import harness
+import cases  # registers the benchmarks
+
+BASELINES = os.path.join(HERE, "baselines.json")
+
+
+def _worker(name: str, size: int, allocations: bool):
+    # the client and the PDCA steps log every request and file, only the results are printed
+    logging.disable(logging.CRITICAL)
+    warnings.simplefilter("ignore")
+    result = harness.measure(harness.BENCHMARKS[name], size=size, allocations=allocations)
+    print(json.dumps(result))
+
+
+def _run(name: str, size: int, allocations: bool) -> dict:
+    command = [sys.executable, __file__, "--worker", name, "--size", str(size)]
+    if not allocations:
+        command.append("--no-allocations")
+    process = subprocess.run(command, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Benchmark {name} failed:\n{process.stderr}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def _selected(args) -> list:
+    selected = []
+    for bench in harness.BENCHMARKS.values():
+        if args.group and bench.group not in args.group:
+            continue
+        if args.keyword and not any(keyword in bench.name for keyword in args.keyword):
+            continue
+        selected.append(bench)
+    return selected
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--keyword", action="append", help="run the benchmarks with the keyword in the name")
+    parser.add_argument("--group", action="append", choices=["client", "pdca"], help="run a group of benchmarks")
+    parser.add_argument("--pdca-rows", type=int, help="rows of the synthetic PDCA submissions (default 100000)")
+    parser.add_argument("--no-allocations", action="store_true", help="skip the traced run measuring allocations")
+    parser.add_argument("--baselines", default=BASELINES, help="baselines file")
+    parser.add_argument("--save", action="store_true", help="save the results as the baselines")
+    parser.add_argument("--time-tolerance", type=float, default=harness.TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=harness.MEMORY_TOLERANCE)
+    parser.add_argument("--json", help="write the results to a file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        _worker(args.worker, args.size, not args.no_allocations)
+        return 0
+
+    results = {}
+    for bench in _selected(args):
+        size = args.pdca_rows if bench.group == "pdca" and args.pdca_rows else bench.size
+        print(f"Running {bench.name} ({size} {bench.unit})...", file=sys.stderr)
+        results[bench.name] = _run(bench.name, size, not args.no_allocations)
+
+    baselines = harness.load_baselines(args.baselines)
+    comparisons = harness.compare(
+        results,
+        baselines["benchmarks"],
+        time_tolerance=args.time_tolerance,
+        memory_tolerance=args.memory_tolerance,
+    )
+    print(harness.report(comparisons))
+    if baselines["machine"] is not None and baselines["machine"] != harness.machine():
+        print(f"\nThe baselines were recorded on another machine: {baselines['machine']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"machine": harness.machine(), "benchmarks": results}, f, indent=2)
+    if args.save:
+        harness.save_baselines(args.baselines, results)
+        print(f"\nSaved the baselines to {args.baselines}")
+        return 0
+    return 1 if any(c.regressions for c in comparisons) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,634 @@
+"""
+Local stand-in of the Arium and PDCA APIs for the offline tests and the benchmarks.
+
+The server keeps the assets, activities and PDCA jobs in memory and implements the endpoints
+used by the client: assets CRUD, presigned uploads and downloads through 'Location', import,
+export and copy polling, activities with status transitions and zipped reports, and the PDCA
+match and augment jobs (201 on submit, 202 while processing). Latency, bandwidth, error
+injection and report sizes are configurable and the error injection is seeded, so the runs
+are reproducible.
+
+    with FakeAriumServer(latency=0.01, error_rate=0.05) as server:
+        client = server.client()
+        client.portfolios().list()
+"""
+import csv
+import io
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+import zipfile
+import zlib
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+SIGNATURE = "X-Amz-Signature=fake"
+FINISHED_STATES = ("finished",)
+
+
+def report_zip(activity_id: str, rows: int, file_name: str = "report.csv") -> bytes:
+    """
+    Zip of one CSV report with 'rows' rows.
+    """
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(["event_id", "portfolio", "loss", "activity_id"])
+    for row in range(rows):
+        writer.writerow([row, f"portfolio-{row % 10}", f"{row * 1.5:.2f}", activity_id])
+
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr(file_name, text.getvalue())
+    return data.getvalue()
+
+
+def _parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Returns the (first, last) byte positions of a single 'bytes=' range, None if unsatisfiable.
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", value.strip())
+    if match is None or match.group(1) == match.group(2) == "":
+        return None
+    if match.group(1) == "":
+        first, last = max(0, size - int(match.group(2))), size - 1
+    else:
+        first = int(match.group(1))
+        last = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+    if first >= size or first > last:
+        return None
+    return first, last
+
+
+class Reply:
+    def __init__(self, status: int = HTTPStatus.OK, body=None, headers: Dict = None):
+        self.status = status
+        self.headers = headers or {}
+        # the number of storage bytes transferred, slowed down to the server bandwidth
+        self.transferred = 0
+        # the number of bytes of the body sent before the connection is closed, all if None
+        self.cut: Optional[int] = None
+        if body is None:
+            self.body = b""
+        elif isinstance(body, bytes):
+            self.body = body
+        elif isinstance(body, str):
+            self.body = body.encode("utf-8")
+        else:
+            self.body = json.dumps(body).encode("utf-8")
+            self.headers.setdefault("Content-Type", "application/json")
+
+
+class FakeAriumServer:
+    """
+    In-memory Arium and PDCA API on a local port.
+
+    :param tenant: The workspace of the client returned by 'client'.
+    :param latency: Delay of every response in seconds.
+    :param bandwidth: Transfer rate of the storage uploads and downloads in bytes per second,
+        unlimited if not given.
+    :param error_rate: Fraction of the requests (except the token requests) failing with 'error_status'.
+    :param error_status: The status of the injected errors, sent with 'Retry-After: 0'.
+    :param processing_polls: The number of polls an asset, import, copy or activity stays in
+        each of its intermediate states.
+    :param pdca_polls: The number of polls a PDCA job answers 202.
+    :param report_rows: The number of rows of the CSV report of an activity.
+    :param seed: Seed of the error injection.
+    :param ranges: Whether the storage answers the Range requests, the whole blob is sent if not.
+    """
+
+    def __init__(
+            self,
+            tenant: str = "ws1",
+            latency: float = 0.0,
+            bandwidth: float = None,
+            error_rate: float = 0.0,
+            error_status: int = HTTPStatus.SERVICE_UNAVAILABLE,
+            processing_polls: int = 1,
+            pdca_polls: int = 1,
+            report_rows: int = 1000,
+            seed: int = 0,
+            ranges: bool = True,
+    ):
+        self.tenant = tenant
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.processing_polls = processing_polls
+        self.pdca_polls = pdca_polls
+        self.report_rows = report_rows
+        self.ranges = ranges
+
+        self.requests: List[Tuple[str, str, int]] = []
+        self.assets: Dict[str, Dict[str, Dict]] = {}
+        self.blobs: Dict[str, bytes] = {}
+        self.activities: Dict[str, Dict] = {}
+        self.jobs: Dict[str, Dict] = {}
+
+        self._random = random.Random(seed)
+        self._forced_errors: List[int] = []
+        self._cuts: List[int] = []
+        self._polls: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._routes = [
+            ("POST", r"/oauth/token", self._token),
+            ("PUT", r"/storage/(?P<key>.+)", self._storage_put),
+            ("GET", r"/storage/(?P<key>.+)", self._storage_get),
+            ("HEAD", r"/storage/(?P<key>.+)", self._storage_get),
+            ("GET", r"/pdca/credits", lambda request: Reply(body={"credits": 1000})),
+            ("GET", r"/pdca/management/health", lambda request: Reply(body={"status": "UP"})),
+            ("POST", r"/pdca/(?P<stage>match|augment)", self._pdca_submit),
+            ("GET", r"/pdca/result/(?P<job_id>[^/]+)", self._pdca_result),
+            ("POST", r"/api/(?P<t>[^/]+)/activity", self._activity_submit),
+            ("GET", r"/api/(?P<t>[^/]+)/activity", self._activity_list),
+            ("GET", r"/api/(?P<t>[^/]+)/activity/(?P<id>[^/]+)", self._activity_get),
+            ("POST", r"/api/(?P<t>[^/]+)/activity/(?P<id>[^/]+)/cancel", self._activity_cancel),
+            ("POST", r"/api/(?P<t>[^/]+)/activity/(?P<id>[^/]+)/resubmit", self._activity_resubmit),
+            ("GET", r"/api/(?P<t>[^/]+)/calculations/assets/(?P<id>[^/]+)/reports", self._reports),
+            ("GET", r"/api/(?P<t>[^/]+)/calculations/assets/(?P<id>[^/]+)/reports/(?P<file>[^/]+)",
+             self._report_link),
+            ("GET", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/empty", self._assets_empty),
+            ("POST", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/copy", self._db_submit("copy")),
+            ("POST", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/import", self._db_submit("import")),
+            ("GET", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/(?P<db>copy|import)/(?P<id>[^/]+)",
+             self._db_status),
+            ("POST", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/export", self._assets_export),
+            ("GET", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets", self._assets_list),
+            ("POST", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets", self._asset_create),
+            ("GET", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/(?P<id>[^/]+)", self._asset_get),
+            ("DELETE", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/(?P<id>[^/]+)", self._asset_delete),
+            ("GET", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/(?P<id>[^/]+)/versions",
+             lambda request: Reply(body=[self._asset(request)])),
+            ("GET", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/(?P<id>[^/]+)/payload", self._payload_get),
+            ("GET", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/(?P<id>[^/]+)/payload/description",
+             lambda request: Reply(body=self._asset(request).get("payloadDescription", ""))),
+            ("PUT", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/(?P<id>[^/]+)/payload/description",
+             self._asset_update("payloadDescription")),
+            ("PUT", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/(?P<id>[^/]+)/description",
+             self._asset_update("description")),
+            ("PUT", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/(?P<id>[^/]+)/move", self._asset_move),
+            ("PUT", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/(?P<id>[^/]+)/(?P<lock>lock|unlock)",
+             self._asset_lock),
+            ("POST", r"/api/(?P<t>[^/]+)/(?P<c>[^/]+)/assets/(?P<id>[^/]+)/copy", self._asset_copy),
+        ]
+        self._routes = [
+            (method, re.compile(pattern + "$"), handler) for method, pattern, handler in self._routes
+        ]
+
+    def __repr__(self) -> str:
+        return f"FakeAriumServer({self.url if self._httpd is not None else 'stopped'})"
+
+    def __enter__(self) -> "FakeAriumServer":
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    # server
+
+    def start(self) -> "FakeAriumServer":
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="fake-arium-server",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def settings(self) -> Dict:
+        return {
+            "client_id": "fake-client",
+            "client_secret": "fake-secret",
+            "token_url": f"{self.url}/oauth/token",
+            "base_uri": f"{self.url}/api",
+            "base_uri_pdca": f"{self.url}/pdca",
+            "authorization_code": False,
+        }
+
+    def client(self, role: str = "basic", **kwargs) -> "APIClient":
+        """
+        APIClient of the server workspace, authenticated with the backend flow.
+        """
+        from api_call.client import APIClient
+        from auth.okta_auth import Auth
+
+        # the fake server is plain http
+        os.environ.setdefault("OAUTHLIB_INSECURE_TRANSPORT", "1")
+        auth = Auth(self.tenant, role, self.settings(), authorization_code=False)
+        return APIClient(auth, **kwargs)
+
+    def fail_next(self, count: int = 1, status: int = None):
+        """
+        Fails the next 'count' requests with 'status' (default 'error_status').
+        """
+        with self._lock:
+            self._forced_errors.extend([status or self.error_status] * count)
+
+    def cut_next(self, after: int, count: int = 1):
+        """
+        Closes the connection of the next 'count' storage downloads after 'after' bytes of the body.
+        """
+        with self._lock:
+            self._cuts.extend([after] * count)
+
+    def count(self, method: str, pattern: str = "") -> int:
+        """
+        The number of the received requests with the method and a path matching the pattern.
+        """
+        with self._lock:
+            return sum(
+                1 for m, path, _ in self.requests if m == method and re.search(pattern, path)
+            )
+
+    # dispatch
+
+    def handle(self, method: str, path: str, query: Dict, headers, body: bytes) -> Reply:
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            injected = None
+            if not path.startswith("/oauth/"):
+                if self._forced_errors:
+                    injected = self._forced_errors.pop(0)
+                elif self.error_rate and self._random.random() < self.error_rate:
+                    injected = self.error_status
+        if injected is not None:
+            reply = Reply(injected, {"error": "injected"}, {"Retry-After": "0"})
+        else:
+            reply = self._route(method, path, query, headers, body)
+
+        if self.bandwidth and reply.transferred:
+            time.sleep(reply.transferred / self.bandwidth)
+
+        with self._lock:
+            self.requests.append((method, path, int(reply.status)))
+        return reply
+
+    def _route(self, method: str, path: str, query: Dict, headers, body: bytes) -> Reply:
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match is not None and route_method == method:
+                request = _Request(method, path, match.groupdict(), query, headers, body)
+                try:
+                    with self._lock:
+                        return handler(request)
+                except KeyError as e:
+                    return Reply(HTTPStatus.NOT_FOUND, {"error": f"Not found: {e}"})
+        return Reply(HTTPStatus.NOT_FOUND, {"error": f"No route {method} {path}"})
+
+    def _poll(self, key: str, polls: int) -> bool:
+        """
+        Counts a poll of the key, True once it was polled more than 'polls' times.
+        """
+        self._polls[key] = self._polls.get(key, 0) + 1
+        return self._polls[key] > polls
+
+    def _storage_url(self, key: str) -> str:
+        return f"{self.url}/storage/{key}?{SIGNATURE}"
+
+    # handlers: auth and storage
+
+    def _token(self, request: "_Request") -> Reply:
+        return Reply(body={
+            "access_token": uuid.uuid4().hex,
+            "token_type": "Bearer",
+            "expires_in": 3600,
+        })
+
+    def _storage_put(self, request: "_Request") -> Reply:
+        key = request.params["key"]
+        self.blobs[key] = request.body
+        if key.startswith("assets/"):
+            _, collection, asset_id = key.split("/")
+            self.assets[collection][asset_id]["status"] = "processing"
+        elif key.startswith("import/"):
+            self.jobs[key]["state"] = "processing"
+        reply = Reply()
+        reply.transferred = len(request.body)
+        return reply
+
+    def _storage_get(self, request: "_Request") -> Reply:
+        data = self.blobs[request.params["key"]]
+        headers = {"Content-Type": "application/octet-stream"}
+        if self.ranges:
+            headers["Accept-Ranges"] = "bytes"
+        range_header = request.headers.get("Range")
+        if range_header is None or not self.ranges:
+            status = HTTPStatus.OK
+        else:
+            positions = _parse_range(range_header, len(data))
+            if positions is None:
+                return Reply(
+                    HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE,
+                    headers={"Content-Range": f"bytes */{len(data)}"},
+                )
+            first, last = positions
+            status = HTTPStatus.PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {first}-{last}/{len(data)}"
+            data = data[first:last + 1]
+        reply = Reply(status, data, headers)
+        if request.method == "GET":
+            reply.transferred = len(data)
+            if self._cuts:
+                reply.cut = self._cuts.pop(0)
+        return reply
+
+    # handlers: assets
+
+    def _collection(self, request: "_Request") -> Dict[str, Dict]:
+        return self.assets.setdefault(request.params["c"], {})
+
+    def _asset(self, request: "_Request") -> Dict:
+        return self._collection(request)[request.params["id"]]
+
+    def _new_asset(self, collection: str, name: str, status: str) -> Dict:
+        asset = {
+            "id": str(uuid.uuid4()),
+            "name": name,
+            "status": status,
+            "description": "",
+            "locked": False,
+            "collection": collection,
+        }
+        self.assets.setdefault(collection, {})[asset["id"]] = asset
+        return asset
+
+    def _assets_list(self, request: "_Request") -> Reply:
+        assets = list(self._collection(request).values())
+        page = int(request.query.get("page", 1))
+        limit = int(request.query.get("limit", len(assets) or 1))
+        content = assets[(page - 1) * limit:page * limit]
+        return Reply(body={"content": content, "count": len(content), "total": len(assets)})
+
+    def _assets_empty(self, request: "_Request") -> Reply:
+        return Reply(body={"empty": not self._collection(request)})
+
+    def _asset_create(self, request: "_Request") -> Reply:
+        collection = request.params["c"]
+        name = request.query["assetName"]
+        if request.query.get("assetPayloadMode", "").lower() == "true":
+            asset = self._new_asset(collection, name, "uploading")
+            key = f"assets/{collection}/{asset['id']}"
+            return Reply(body=asset, headers={"Location": self._storage_url(key)})
+
+        asset = self._new_asset(collection, name, "processed")
+        self.blobs[f"assets/{collection}/{asset['id']}"] = request.body
+        return Reply(body=asset)
+
+    def _asset_get(self, request: "_Request") -> Reply:
+        asset = self._asset(request)
+        if asset["status"] == "processing" and self._poll(asset["id"], self.processing_polls):
+            asset["status"] = "processed"
+        return Reply(body=asset)
+
+    def _asset_delete(self, request: "_Request") -> Reply:
+        asset = self._collection(request).pop(request.params["id"])
+        self.blobs.pop(f"assets/{request.params['c']}/{asset['id']}", None)
+        return Reply(body=asset)
+
+    def _asset_update(self, field: str):
+        def update(request: "_Request") -> Reply:
+            asset = self._asset(request)
+            asset[field] = request.body.decode("utf-8")
+            return Reply(body=asset)
+
+        return update
+
+    def _asset_move(self, request: "_Request") -> Reply:
+        asset = self._asset(request)
+        asset["name"] = request.query["assetName"]
+        return Reply(body=[asset])
+
+    def _asset_lock(self, request: "_Request") -> Reply:
+        asset = self._asset(request)
+        asset["locked"] = request.params["lock"] == "lock"
+        return Reply(body=asset)
+
+    def _asset_copy(self, request: "_Request") -> Reply:
+        source = self._asset(request)
+        collection = request.params["c"]
+        asset = self._new_asset(collection, request.query["assetName"], source["status"])
+        source_key = f"assets/{collection}/{source['id']}"
+        if source_key in self.blobs:
+            self.blobs[f"assets/{collection}/{asset['id']}"] = self.blobs[source_key]
+        return Reply(body=asset)
+
+    def _payload_get(self, request: "_Request") -> Reply:
+        asset = self._asset(request)
+        key = f"assets/{request.params['c']}/{asset['id']}"
+        if key not in self.blobs:
+            return Reply(HTTPStatus.NO_CONTENT)
+        if request.query.get("assetPayloadMode") == "presigned":
+            return Reply(headers={"Location": self._storage_url(key)})
+        return Reply(body=self.blobs[key])
+
+    def _assets_export(self, request: "_Request") -> Reply:
+        collection = self._collection(request)
+        return Reply(body=[collection[asset_id] for asset_id in json.loads(request.body)])
+
+    def _db_submit(self, db: str):
+        def submit(request: "_Request") -> Reply:
+            job_id = str(uuid.uuid4())
+            key = f"{db}/{job_id}"
+            self.jobs[key] = {"id": job_id, "state": "processing", "collection": request.params["c"]}
+            if db == "import":
+                self.jobs[key]["state"] = "uploading"
+                return Reply(body={"id": job_id}, headers={"Location": self._storage_url(key)})
+            return Reply(body={"id": job_id})
+
+        return submit
+
+    def _db_status(self, request: "_Request") -> Reply:
+        key = f"{request.params['db']}/{request.params['id']}"
+        job = self.jobs[key]
+        if job["state"] == "processing" and self._poll(key, self.processing_polls):
+            job["state"] = "finished"
+            if request.params["db"] == "import":
+                asset = self._new_asset(job["collection"], f"import-{job['id']}", "processed")
+                self.blobs[f"assets/{job['collection']}/{asset['id']}"] = self.blobs[key]
+                job["ids"] = [asset["id"]]
+        if job["state"] in FINISHED_STATES:
+            return Reply(body=job)
+        return Reply(HTTPStatus.ACCEPTED, job, {"Retry-After": "0"})
+
+    # handlers: activities and reports
+
+    def _activity_submit(self, request: "_Request") -> Reply:
+        submitted = json.loads(request.body or b"{}")
+        activity_id = str(uuid.uuid4())
+        self.activities[activity_id] = {
+            "activityId": activity_id,
+            "workspace": request.params["t"],
+            "name": submitted.get("name") or "activity",
+            "activityType": submitted.get("activityType", "calculation"),
+            "mode": submitted.get("mode", "deterministic"),
+            "status": "queued",
+            "createdAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        return Reply(body={"data": {"activityId": activity_id}})
+
+    def _activity_list(self, request: "_Request") -> Reply:
+        activities = [self._advance(a) for a in reversed(list(self.activities.values()))]
+        page = int(request.query.get("page", 1))
+        limit = int(request.query.get("limit", 100))
+        content = activities[(page - 1) * limit:page * limit]
+        return Reply(body={"count": len(activities), "list": content})
+
+    def _activity_get(self, request: "_Request") -> Reply:
+        return Reply(body=self._advance(self.activities[request.params["id"]]))
+
+    def _advance(self, activity: Dict) -> Dict:
+        """
+        Moves the activity through queued and running, 'processing_polls' polls each.
+        """
+        if activity["status"] not in ("queued", "running"):
+            return activity
+        key = f"activity/{activity['activityId']}"
+        if self._poll(key, self.processing_polls):
+            self._polls[key] = 0
+            if activity["status"] == "queued":
+                activity["status"] = "running"
+            else:
+                activity["status"] = "completed"
+                self.blobs[f"reports/{activity['activityId']}/report.zip"] = report_zip(
+                    activity["activityId"], self.report_rows
+                )
+        return activity
+
+    def _activity_cancel(self, request: "_Request") -> Reply:
+        activity = self.activities[request.params["id"]]
+        activity["status"] = "canceled"
+        return Reply(body=activity)
+
+    def _activity_resubmit(self, request: "_Request") -> Reply:
+        source = self.activities[request.params["id"]]
+        activity_id = str(uuid.uuid4())
+        self.activities[activity_id] = {**source, "activityId": activity_id, "status": "queued"}
+        return Reply(body={"data": {"activityId": activity_id}})
+
+    def _reports(self, request: "_Request") -> Reply:
+        activity_id = request.params["id"]
+        prefix = f"reports/{activity_id}/"
+        return Reply(body=[
+            {
+                "file": key[len(prefix):],
+                "size": len(data),
+                "compressed": True,
+                "calculationId": activity_id,
+                "type": "zip",
+            }
+            for key, data in self.blobs.items()
+            if key.startswith(prefix)
+        ])
+
+    def _report_link(self, request: "_Request") -> Reply:
+        key = f"reports/{request.params['id']}/{request.params['file']}"
+        if key not in self.blobs:
+            raise KeyError(key)
+        return Reply(body={"link": self._storage_url(key)})
+
+    # handlers: PDCA
+
+    def _pdca_submit(self, request: "_Request") -> Reply:
+        inputs = json.loads(request.body)
+        stage = request.params["stage"]
+        job_id = str(uuid.uuid4())
+        records = inputs.get("matchInputs" if stage == "match" else "augmentInputs", [])
+        self.jobs[f"pdca/{job_id}"] = {"stage": stage, "records": records}
+        return Reply(HTTPStatus.CREATED, {"id": job_id}, {"location": f"/result/{job_id}"})
+
+    def _pdca_result(self, request: "_Request") -> Reply:
+        key = f"pdca/{request.params['job_id']}"
+        job = self.jobs[key]
+        if not self._poll(key, self.pdca_polls):
+            return Reply(HTTPStatus.ACCEPTED, headers={"Retry-After": "0"})
+
+        master_data = []
+        for n, record in enumerate(job["records"]):
+            duns = record.get("duns") or f"{zlib.crc32(json.dumps(record, sort_keys=True).encode()):09d}"
+            data = {"dunsnumber": duns, "matchConfidence": 9, "inputIndex": n}
+            if job["stage"] == "augment":
+                data.update({"employees": 10 + n, "naics": "524126"})
+            else:
+                data["name"] = record.get("name", "")
+            master_data.append(data)
+        return Reply(body={"masterData": master_data})
+
+
+class _Request:
+    def __init__(self, method: str, path: str, params: Dict, query: Dict, headers, body: bytes):
+        self.method = method
+        self.path = path
+        self.params = params
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, without it every response waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return b"".join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def _dispatch(self):
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        body = self._read_body()
+        reply = self.server.fake.handle(self.command, parts.path, query, self.headers, body)
+
+        self.send_response(reply.status)
+        for name, value in reply.headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(reply.body)))
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+        if reply.cut is None:
+            self.wfile.write(reply.body)
+        else:
+            self.wfile.write(reply.body[:reply.cut])
+            self.close_connection = True
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _dispatch
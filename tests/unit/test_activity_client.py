@@ -7,7 +7,8 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
 
 from api_call.arium.api.client_activity import ActivityClient
-from api_call.arium.model.activity import Activity, ActivityStatus, ActivitySubmitRequest
+from api_call.arium.api.poller import PollingPolicy
+from api_call.arium.model.activity import Activity, ActivityList, ActivityStatus, ActivitySubmitRequest
 
 class TestActivityClient(unittest.TestCase):
     def setUp(self):
@@ -75,5 +76,49 @@ class TestActivityClient(unittest.TestCase):
             endpoint=f"/{{tenant}}/activity/{activity_id}/cancel"
         )
 
+    def _activity(self, activity_id, status):
+        return Activity.from_dict(
+            {"activityId": activity_id, "workspace": "ws", "name": "a", "status": status}
+        )
+
+    def test_wait_many_polls_all_ids_together(self):
+        statuses = {"a": ["running", "completed"], "b": ["completed"], "c": ["queued", "running", "failed"]}
+
+        def get(activity_id):
+            return self._activity(activity_id, statuses[activity_id].pop(0))
+
+        policy = PollingPolicy(initial=0, max_interval=0)
+        with patch.object(ActivityClient, 'get', side_effect=get) as mock_get:
+            finished = [a.activityId for a in self.client.as_completed(["a", "b", "c"], policy=policy)]
+            self.assertEqual(finished, ["b", "a", "c"])
+            self.assertEqual(mock_get.call_count, 6)
+
+    def test_wait_many_reads_statuses_from_list_pages(self):
+        ids = [f"id-{i}" for i in range(12)]
+        rounds = {"count": 0}
+
+        def list_page(limit, page):
+            rounds["count"] += 1
+            status = "running" if rounds["count"] == 1 else "completed"
+            # the last id is not on the list
+            items = [self._activity(i, status) for i in ids[:-1]][(page - 1) * limit: page * limit]
+            return ActivityList(count=len(items), list=items)
+
+        policy = PollingPolicy(initial=0, max_interval=0)
+        with patch.object(ActivityClient, 'list', side_effect=list_page) as mock_list, \
+                patch.object(ActivityClient, 'get', side_effect=lambda activity_id: self._activity(activity_id, "completed")) as mock_get:
+            activities = self.client.wait_many(ids, policy=policy, page_size=100, list_threshold=10)
+
+        self.assertEqual([a.activityId for a in activities], ids)
+        self.assertEqual(mock_list.call_count, 2)
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_wait_many_timeout(self):
+        policy = PollingPolicy(initial=0, max_interval=0)
+        with patch.object(ActivityClient, 'get', side_effect=lambda activity_id: self._activity(activity_id, "running")):
+            with self.assertRaises(TimeoutError):
+                self.client.wait_many(["a"], timeout_minutes=0, policy=policy)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -42,5 +42,64 @@ class TestAssetsClient(unittest.TestCase):
             self.client.delete(asset_id)
             mock_del.assert_called_once_with(client=self.mock_api_client, collection=self.collection, asset_id=asset_id)
 
+    def test_iter_walks_pages_lazily(self):
+        assets = [{"id": str(i), "name": f"A{i}"} for i in range(5)]
+
+        def page(client, collection, latest, page, limit):
+            items = assets[(page - 1) * limit: page * limit]
+            return {"content": items, "count": len(items), "total": len(assets)}
+
+        for prefetch in (True, False):
+            with patch('api_call.arium.api.client_assets.request.asset_list_page', side_effect=page) as mock_page:
+                iterator = self.client.iter(page_size=2, prefetch=prefetch)
+                self.assertEqual(next(iterator), assets[0])
+                self.assertEqual(list(iterator), assets[1:])
+                self.assertEqual(mock_page.call_count, 3)
+                self.assertEqual([c.kwargs["page"] for c in mock_page.call_args_list], [1, 2, 3])
+
+    def test_iter_stops_on_short_page(self):
+        with patch('api_call.arium.api.client_assets.request.asset_list_page',
+                   return_value={"content": [{"id": "1"}], "count": 1, "total": 10}) as mock_page:
+            self.assertEqual(list(self.client.iter(page_size=2)), [{"id": "1"}])
+            mock_page.assert_called_once()
+
+    def test_get_by_name_uses_cached_listing(self):
+        mock_assets = [
+            {"id": "1", "name": "portfolio 2023"},
+            {"id": "2", "name": "portfolio 2024"},
+            {"id": "3", "name": "events"},
+            {"id": "4", "name": "portfolio 2024"},
+        ]
+        with patch('api_call.arium.api.client_assets.request.asset_list', return_value=mock_assets) as mock_list:
+            self.assertEqual(self.client.get_by_name("portfolio 2024"), [mock_assets[1], mock_assets[3]])
+            self.assertEqual(self.client.get_by_name("missing"), [])
+            self.assertEqual(self.client.get_by_name("folio 20", exact=False), [mock_assets[0], mock_assets[1], mock_assets[3]])
+            self.assertEqual(self.client.get_by_name("ev", exact=False), [mock_assets[2]])
+            mock_list.assert_called_once()
+
+            self.client.get_by_name("events", refresh=True)
+            self.assertEqual(mock_list.call_count, 2)
+
+    def test_get_by_name_cache_is_invalidated(self):
+        with patch('api_call.arium.api.client_assets.request.asset_list', return_value=[]) as mock_list, \
+                patch('api_call.arium.api.client_assets.request.asset_post'), \
+                patch('api_call.arium.api.client_assets.request.asset_rename'), \
+                patch('api_call.arium.api.client_assets.request.asset_copy'):
+            self.client.get_by_name("A")
+            self.client.create("A", {})
+            self.client.get_by_name("A")
+            self.client.rename("1", "B")
+            self.client.get_by_name("A")
+            self.client.copy("1", "C")
+            self.client.get_by_name("A")
+            self.assertEqual(mock_list.call_count, 4)
+
+        self.client.name_cache_ttl = 0
+        with patch('api_call.arium.api.client_assets.request.asset_list', return_value=[]) as mock_list:
+            self.client.get_by_name("A")
+            self.client.get_by_name("A")
+            self.assertEqual(mock_list.call_count, 2)
+
+
 if __name__ == '__main__':
     unittest.main()
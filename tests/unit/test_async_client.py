@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.async_client import AsyncAPIClient, AsyncAssetsClient, AsyncActivityClient
+from api_call.arium.api.poller import PollingPolicy
+from api_call.arium.model.activity import Activity
+
+
+def activity(status):
+    return Activity.from_dict(
+        {"activityId": "act-1", "workspace": "ws", "name": "a", "status": status}
+    )
+
+
+class TestAsyncAPIClient(unittest.TestCase):
+    def setUp(self):
+        self.mock_api_client = MagicMock()
+        self.client = AsyncAPIClient(client=self.mock_api_client, max_workers=4)
+
+    def tearDown(self):
+        asyncio.run(self.client.close())
+
+    def test_requires_auth_or_client(self):
+        with self.assertRaises(ValueError):
+            AsyncAPIClient()
+
+    def test_asset_create_waits_without_blocking(self):
+        assets = MagicMock()
+        assets.collection = "portfolios"
+        assets.create.return_value = {"id": "1", "status": "uploading"}
+        assets.get.side_effect = [
+            {"id": "1", "status": "processing"},
+            {"id": "1", "status": "active"},
+        ]
+        client = AsyncAssetsClient(self.client, assets)
+        client.polling_policy = PollingPolicy(initial=0, max_interval=0)
+
+        asset = asyncio.run(client.create("p1", data="a,b"))
+
+        assets.create.assert_called_once_with("p1", data="a,b", wait=False)
+        self.assertEqual(asset["status"], "active")
+        self.assertEqual(assets.get.call_count, 2)
+
+    def test_activities_run_concurrently(self):
+        activity_client = MagicMock()
+        activity_client.get.side_effect = lambda activity_id: activity("completed")
+        client = AsyncActivityClient(self.client, activity_client)
+
+        async def run():
+            return await asyncio.gather(*[client.wait(f"act-{i}") for i in range(20)])
+
+        activities = asyncio.run(run())
+        self.assertEqual(len(activities), 20)
+        self.assertEqual(activity_client.get.call_count, 20)
+
+    def test_activity_submit_and_wait(self):
+        activity_client = MagicMock()
+        activity_client.submit.return_value = activity("queued")
+        activity_client.get.side_effect = [activity("running"), activity("completed")]
+        client = AsyncActivityClient(self.client, activity_client)
+        client.polling_policy = PollingPolicy(initial=0, max_interval=0)
+
+        result = asyncio.run(client.submit(MagicMock(), wait=True))
+
+        self.assertEqual(result.status.value, "completed")
+        self.assertEqual(activity_client.submit.call_args.kwargs["wait"], False)
+
+
+if __name__ == '__main__':
+    unittest.main()
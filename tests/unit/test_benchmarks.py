@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+import sys
+
+# Ensure src, the fake server and the benchmarks are in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../benchmarks')))
+
+import harness
+import cases  # registers the benchmarks
+
+
+def _result(seconds=1.0, rss=100.0, alloc=10.0, size=1000):
+    return {"size": size, "seconds": seconds, "peak_rss_mb": rss, "alloc_peak_mb": alloc}
+
+
+class TestCompare(unittest.TestCase):
+    def test_regressions(self):
+        baselines = {"a": _result(), "b": _result(), "c": _result()}
+        results = {"a": _result(seconds=1.2, alloc=10.5), "b": _result(seconds=1.5), "c": _result(rss=120.0)}
+
+        comparisons = {c.name: c for c in harness.compare(results, baselines)}
+
+        self.assertEqual(comparisons["a"].regressions, [])
+        self.assertAlmostEqual(comparisons["a"].changes["seconds"], 0.2)
+        self.assertEqual(comparisons["b"].regressions, ["seconds"])
+        self.assertEqual(comparisons["c"].regressions, ["peak_rss_mb"])
+
+    def test_no_comparable_baseline(self):
+        comparisons = harness.compare(
+            {"a": _result(), "b": _result(size=5)}, {"b": _result(seconds=0.1)}
+        )
+
+        self.assertEqual([c.note for c in comparisons], ["no baseline", "baseline size 1000"])
+        self.assertFalse(any(c.regressions for c in comparisons))
+
+    def test_save_keeps_other_baselines(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "baselines.json")
+            harness.save_baselines(path, {"a": _result(), "b": _result()})
+            harness.save_baselines(path, {"b": _result(seconds=2.0)})
+
+            with open(path) as f:
+                baselines = json.load(f)
+
+        self.assertEqual(baselines["benchmarks"]["a"]["seconds"], 1.0)
+        self.assertEqual(baselines["benchmarks"]["b"]["seconds"], 2.0)
+        self.assertEqual(baselines["machine"], harness.machine())
+
+
+class TestMeasure(unittest.TestCase):
+    def test_measure(self):
+        cleaned = []
+
+        def setup(size):
+            yield harness.Workload(lambda: bytearray(size), items=size, bytes=size)
+            cleaned.append(size)
+
+        result = harness.measure(harness.Benchmark("alloc", setup, "bytes", 1024 * 1024, repeat=2))
+
+        self.assertEqual(cleaned, [1024 * 1024])
+        self.assertEqual(result["runs"], 2)
+        self.assertGreater(result["throughput"], 0)
+        self.assertGreaterEqual(result["alloc_peak_mb"], 1.0)
+
+    def test_benchmarks_run(self):
+        for name, size in (
+                ("get_content.zip", 100),
+                ("report.files", 100),
+                ("model.activity_list", 10),
+                ("pdca.merge_data", 400),
+        ):
+            with self.subTest(name):
+                bench = harness.BENCHMARKS[name]
+                result = harness.measure(bench, size=size, allocations=False)
+                self.assertEqual(result["size"], size)
+                self.assertIsNone(result["alloc_peak_mb"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,9 @@ import os
 # Ensure src is in sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
 
+from api_call.arium.api.rate_limiter import RateLimiter
+from api_call.arium.api.retry_policy import RetryPolicy
+from api_call.arium.api.transport import Transport
 from api_call.client import APIClient
 from auth.okta_auth import Auth
 from config.constants import BASE_URI, BASE_URI_PDCA
@@ -29,6 +32,21 @@ class TestAPIClient(unittest.TestCase):
         self.assertIsNotNone(client.activity())
         self.assertIsNotNone(client.refdata())
 
+    def test_retry_policy_and_rate_limiter_of_shared_transport(self):
+        policy, limiter = RetryPolicy(), RateLimiter()
+        client = APIClient(auth=self.mock_auth, retry_policy=policy, rate_limiter=limiter)
+        self.assertIs(client.transport.retry_policy, policy)
+        self.assertIs(client.transport.rate_limiter, limiter)
+
+        transport = Transport()
+        shared = transport.retry_policy
+        for kwargs in ({"retry_policy": RetryPolicy()}, {"rate_limiter": RateLimiter()}):
+            with self.subTest(kwargs=list(kwargs)), self.assertRaises(ValueError):
+                APIClient(auth=self.mock_auth, transport=transport, **kwargs)
+        self.assertIs(transport.retry_policy, shared)
+        self.assertIsNone(transport.rate_limiter)
+        APIClient(auth=self.mock_auth, transport=transport, retry_policy=shared)
+
     def test_api_client_get_request(self):
         client = APIClient(auth=self.mock_auth)
         mock_response = MagicMock()
@@ -0,0 +1,139 @@
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+import sys
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.arium.api import transport as transport_module
+from api_call.arium.api.transport import Transport
+from api_call.client import APIClient
+from api_call.client_descriptor import ClientDescriptor
+from auth.okta_auth import Auth, InteractiveLoginRequired
+from auth.token_cache import TokenCache
+
+SETTINGS = {
+    "client_id": "client",
+    "client_secret": "secret",
+    "token_url": "https://auth.test.com/token",
+    "base_uri": "https://api.test.com/api",
+    "authorization_code": False,
+}
+
+
+def _token(expires_in=3600, access_token="access"):
+    return {
+        "access_token": access_token,
+        "token_type": "Bearer",
+        "expires_in": expires_in,
+        "expires_at": time.time() + expires_in,
+    }
+
+
+def _child_token(descriptor):
+    client = descriptor.client()
+    return os.getpid(), id(client), client.get_workspace(), client._auth.client.token["access_token"]
+
+
+class TestClientDescriptor(unittest.TestCase):
+    @patch('auth.okta_auth.OAuth2Session.fetch_token', return_value=_token())
+    def setUp(self, mock_fetch_token):
+        auth = Auth(tenant="ws", role="basic", settings=dict(SETTINGS))
+        self.client = APIClient(auth=auth, transport=Transport(pool_maxsize=8))
+
+    def test_pickle(self):
+        descriptor = pickle.loads(pickle.dumps(self.client.descriptor()))
+
+        self.assertEqual(descriptor.tenant, "ws")
+        self.assertEqual(descriptor.token["access_token"], "access")
+        self.assertEqual(descriptor.transport["pool_maxsize"], 8)
+        self.assertNotIn("secret", repr(descriptor))
+        self.assertNotIn("access", repr(descriptor))
+
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_connect_reuses_token(self, mock_fetch_token):
+        client = pickle.loads(pickle.dumps(self.client.descriptor())).connect()
+
+        mock_fetch_token.assert_not_called()
+        self.assertEqual(client.get_workspace(), "ws")
+        self.assertEqual(client._auth.client.token["access_token"], "access")
+        self.assertIsNot(client.transport, self.client.transport)
+
+    @patch('auth.okta_auth.OAuth2Session.fetch_token', return_value=_token(access_token="new"))
+    def test_expired_token_is_replaced(self, mock_fetch_token):
+        descriptor = self.client.descriptor()
+        descriptor.token = _token(expires_in=-10)
+
+        client = descriptor.connect()
+
+        mock_fetch_token.assert_called_once()
+        self.assertEqual(client._auth.client.token["access_token"], "new")
+
+    @patch('auth.okta_auth.Auth._wait_for_response')
+    def test_expired_web_token_does_not_start_the_login(self, mock_wait_for_response):
+        descriptor = self.client.descriptor()
+        descriptor.authorization_code = True
+        descriptor.settings["authorization_url"] = "https://auth.test.com/authorize"
+        descriptor.token = _token(expires_in=-10)
+
+        with self.assertRaises(InteractiveLoginRequired):
+            descriptor.connect()
+        mock_wait_for_response.assert_not_called()
+
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_token_cache_reference(self, mock_fetch_token):
+        with tempfile.TemporaryDirectory() as path:
+            cache = TokenCache(path)
+            cache.save("ws", "basic", "client", _token(access_token="cached"))
+            self.client._auth.token_cache = cache
+
+            descriptor = pickle.loads(pickle.dumps(self.client.descriptor()))
+            client = descriptor.connect()
+
+        self.assertIsNone(descriptor.token)
+        self.assertEqual(descriptor.token_cache.path, path)
+        mock_fetch_token.assert_not_called()
+        self.assertEqual(client._auth.client.token["access_token"], "cached")
+
+    def test_client_is_created_once_per_process(self):
+        descriptor = self.client.descriptor()
+
+        self.assertIs(descriptor.client(), descriptor.client())
+
+    @unittest.skipUnless(
+        "fork" in multiprocessing.get_all_start_methods(), "fork start method"
+    )
+    def test_process_pool(self):
+        descriptor = self.client.descriptor()
+        context = multiprocessing.get_context("fork")
+
+        with ProcessPoolExecutor(max_workers=2, mp_context=context) as executor:
+            results = list(executor.map(_child_token, [descriptor] * 8))
+
+        clients_by_pid = {}
+        for pid, client_id, workspace, access_token in results:
+            self.assertNotEqual(pid, os.getpid())
+            self.assertEqual((workspace, access_token), ("ws", "access"))
+            clients_by_pid.setdefault(pid, set()).add(client_id)
+        self.assertTrue(all(len(ids) == 1 for ids in clients_by_pid.values()))
+
+
+class TestTransportFork(unittest.TestCase):
+    def test_pools_are_reset_after_fork(self):
+        transport = Transport(pool_maxsize=4)
+        pool_manager = transport.adapter.poolmanager
+
+        transport_module._reset_after_fork()
+
+        self.assertIsNot(transport.adapter.poolmanager, pool_manager)
+        self.assertIs(transport.session.get_adapter("https://api.test.com"), transport.adapter)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import MagicMock
+import sys
+
+# Ensure src and the fake server are in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_server import FakeAriumServer
+from api_call.arium.api import request
+from api_call.arium.api.poller import PollingPolicy
+from api_call.arium.api.retry_policy import RetryPolicy
+from api_call.arium.model.activity import ActivitySubmitRequest, ActivityStatus
+
+FAST_POLLING = PollingPolicy(initial=0.0, jitter=0.0)
+
+
+class TestFakeServer(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeAriumServer(processing_polls=1, pdca_polls=1, report_rows=50).start()
+        self.client = self.server.client(retry_policy=RetryPolicy(budget=None, sleep=MagicMock()))
+
+    def tearDown(self):
+        self.client.transport.close()
+        self.server.stop()
+
+    def test_assets(self):
+        portfolios = self.client.portfolios()
+        asset = portfolios.create("p1", data="id,value\n1,2")
+
+        self.assertEqual(asset["status"], "processed")
+        self.assertEqual([a["name"] for a in portfolios.list()], ["p1"])
+        self.assertEqual(portfolios.get_data(asset["id"]), b"id,value\n1,2")
+
+        request.asset_rename(self.client, "portfolios", asset["id"], "p2")
+        self.assertEqual(request.asset_get(self.client, "portfolios", asset["id"])["name"], "p2")
+        request.asset_delete(self.client, "portfolios", asset["id"])
+        self.assertTrue(request.asset_is_empty(self.client, "portfolios"))
+
+    def test_presigned_upload_and_download(self):
+        payload = b'{"rows": [1, 2, 3]}'
+
+        asset = request.asset_post(
+            self.client, "portfolios", "p1", file=io.BytesIO(payload), presigned=True
+        )
+
+        self.assertEqual(asset["status"], "processed")
+        self.assertEqual(self.server.blobs[f"assets/portfolios/{asset['id']}"], payload)
+        self.assertEqual(self.server.count("GET", f"/portfolios/assets/{asset['id']}$"), 3)
+        data = b"".join(request.asset_iter_data(
+            self.client, "portfolios", asset["id"], get_from_location=True
+        ))
+        self.assertEqual(data, payload)
+
+    def test_import_and_copy_polling(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "import.json")
+            with open(path, "w") as file:
+                file.write('{"assets": []}')
+            ids = request.asset_import(self.client, "portfolios", path)
+
+        self.assertEqual(len(ids), 1)
+        self.assertEqual(self.server.count("GET", "/assets/import/"), 2)
+        copy = request.asset_copy_workspace(self.client, "portfolios", "ws1", "ws2", asset_ids=ids)
+        self.assertEqual(copy["state"], "finished")
+
+    def test_activity_and_report(self):
+        submit_request = MagicMock(spec=ActivitySubmitRequest)
+        submit_request.to_dict.return_value = {"name": "calc", "activityType": "calculation"}
+        activities = self.client.activity()
+
+        activity = activities.submit(submit_request)
+        self.assertEqual(activity.status, ActivityStatus.QUEUED)
+        activity = activities.wait(activity.activityId, policy=FAST_POLLING)
+
+        self.assertEqual(activity.status, ActivityStatus.COMPLETED)
+        report = activities.report(activity.activityId)
+        with zipfile.ZipFile(report.bytes()) as zip_file:
+            rows = zip_file.read("report.csv").decode().splitlines()
+        self.assertEqual(len(rows), 51)
+        self.assertEqual(report.size, len(report.bytes().getvalue()))
+
+    def test_pdca(self):
+        pdca = self.client.get_pdca()
+
+        location = pdca.submit_match({"matchInputs": [{"name": "a"}, {"name": "b"}]})
+
+        self.assertEqual(self.client.get_request(location, url="base_uri_pdca").status_code, 202)
+        result = request.get_content(self.client.get_request(location, url="base_uri_pdca"))
+        self.assertEqual(len(result["masterData"]), 2)
+
+    def test_injected_errors_are_retried(self):
+        self.server.fail_next(2)
+
+        self.assertEqual(self.client.portfolios().list(), [])
+        self.assertEqual(self.server.count("GET", "/portfolios/assets$"), 3)
+        self.assertEqual([status for _, _, status in self.server.requests[-3:]], [503, 503, 200])
+
+    def test_error_rate_is_reproducible(self):
+        statuses = []
+        for _ in range(2):
+            with FakeAriumServer(error_rate=0.3, seed=7) as server:
+                client = server.client(retry_policy=RetryPolicy(budget=None, sleep=MagicMock()))
+                for _ in range(10):
+                    client.portfolios().list()
+                statuses.append([status for _, _, status in server.requests])
+                client.transport.close()
+
+        self.assertEqual(statuses[0], statuses[1])
+        self.assertIn(503, statuses[0])
+
+    def test_range_download(self):
+        self.server.blobs["reports/a1/report.zip"] = bytes(range(100))
+        url = f"{self.server.url}/storage/reports/a1/report.zip"
+
+        response = self.client.transport.get(url, headers={"Range": "bytes=10-19"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, bytes(range(10, 20)))
+        self.assertEqual(response.headers["Content-Range"], "bytes 10-19/100")
+
+        response = self.client.transport.get(url, headers={"Range": "bytes=-5"})
+        self.assertEqual(response.content, bytes(range(95, 100)))
+        response = self.client.transport.get(url, headers={"Range": "bytes=200-"})
+        self.assertEqual(response.status_code, 416)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import CancelledError as FutureCancelledError, Future, TimeoutError as FutureTimeoutError
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.arium.api.client_activity import ActivityClient
+from api_call.arium.api.client_assets import AssetsClient
+from api_call.arium.api.futures import ActivityFuture, BackgroundPoller, OperationFuture
+from api_call.arium.api.poller import PollingPolicy, PollStatus
+from api_call.arium.model.activity import Activity, ActivityStatus, ActivitySubmitRequest
+
+FAST = PollingPolicy(initial=0.01, max_interval=0.01, jitter=0)
+
+
+def _activity(activity_id, status):
+    return Activity.from_dict(
+        {"activityId": activity_id, "workspace": "ws", "name": "a", "status": status}
+    )
+
+
+class TestBackgroundPoller(unittest.TestCase):
+    def setUp(self):
+        self.background = BackgroundPoller(policy=FAST)
+
+    def tearDown(self):
+        self.background.close()
+
+    def test_future_completes_with_final_value(self):
+        statuses = iter([PollStatus(False), PollStatus(False), PollStatus(True, "done")])
+        future = self.background.watch(OperationFuture("op"), lambda: next(statuses))
+
+        self.assertIsInstance(future, Future)
+        self.assertEqual(future.result(timeout=5), "done")
+        self.assertEqual(len(self.background), 0)
+
+    def test_callbacks_are_called(self):
+        called = threading.Event()
+        future = OperationFuture("op")
+        future.add_done_callback(lambda f: called.set())
+        self.background.watch(future, lambda: PollStatus(True, 1))
+
+        self.assertTrue(called.wait(5))
+
+    def test_check_error_is_set_on_future(self):
+        def check():
+            raise ValueError("boom")
+
+        future = self.background.watch(OperationFuture("op"), check)
+
+        with self.assertRaises(ValueError):
+            future.result(timeout=5)
+
+    def test_timeout(self):
+        future = self.background.watch(
+            OperationFuture("op"), lambda: PollStatus(False), timeout=0.05
+        )
+
+        with self.assertRaises(TimeoutError):
+            future.result(timeout=5)
+
+    def test_cancel_stops_polling(self):
+        on_cancel = MagicMock()
+        future = self.background.watch(
+            OperationFuture("op", on_cancel=on_cancel), lambda: PollStatus(False)
+        )
+
+        self.assertTrue(future.cancel())
+        on_cancel.assert_called_once_with()
+        self.assertTrue(future.cancelled())
+        self.assertEqual(len(self.background), 0)
+        self.assertFalse(future.cancel())
+
+    def test_failed_cancel_keeps_polling(self):
+        future = self.background.watch(
+            OperationFuture("op", on_cancel=MagicMock(side_effect=Exception("denied"))),
+            lambda: PollStatus(False),
+        )
+
+        self.assertFalse(future.cancel())
+        self.assertFalse(future.done())
+        self.assertEqual(len(self.background), 1)
+
+    def test_cancel_while_resolving_keeps_polling(self):
+        class CancelledFuture(OperationFuture):
+            def set_result(self, result):
+                # cancelled after the poller checked that the future is not done
+                Future.cancel(self)
+                super().set_result(result)
+
+        cancelled = self.background.watch(CancelledFuture("cancelled"), lambda: PollStatus(True, 1))
+        with self.assertRaises(FutureCancelledError):
+            cancelled.result(timeout=5)
+
+        future = self.background.watch(OperationFuture("op"), lambda: PollStatus(True, 2))
+        self.assertEqual(future.result(timeout=5), 2)
+
+    def test_wrap_future(self):
+        future = self.background.watch(OperationFuture("op"), lambda: PollStatus(True, 42))
+
+        async def main():
+            return await asyncio.wrap_future(future)
+
+        self.assertEqual(asyncio.run(main()), 42)
+
+
+class TestActivityFutures(unittest.TestCase):
+    def setUp(self):
+        self.background = BackgroundPoller(policy=FAST)
+        self.mock_api_client = MagicMock()
+        self.mock_api_client.background.return_value = self.background
+        self.client = ActivityClient(self.mock_api_client)
+
+    def tearDown(self):
+        self.background.close()
+
+    def test_submit_async(self):
+        request = MagicMock(spec=ActivitySubmitRequest)
+        request.to_dict.return_value = {"payload": "data"}
+        statuses = iter(["queued", "running", "completed"])
+
+        with patch('api_call.arium.api.client_activity.get_content',
+                   return_value={"data": {"activityId": "new-id"}}), \
+                patch.object(ActivityClient, 'get',
+                             side_effect=lambda activity_id: _activity(activity_id, next(statuses))):
+            future = self.client.submit_async(request, policy=FAST)
+            self.assertIsInstance(future, ActivityFuture)
+            self.assertEqual(future.activity_id, "new-id")
+            activity = future.result(timeout=5)
+
+        self.assertEqual(activity.status, ActivityStatus.COMPLETED)
+
+    def test_cancel_cancels_activity(self):
+        with patch.object(ActivityClient, 'get', return_value=_activity("a1", "running")), \
+                patch.object(ActivityClient, 'cancel') as mock_cancel:
+            future = self.client.wait_async("a1", policy=FAST)
+            self.assertTrue(future.cancel())
+
+        mock_cancel.assert_called_once_with("a1")
+        with self.assertRaises(Exception):
+            future.result(timeout=0)
+
+    def test_wait_async_timeout(self):
+        with patch.object(ActivityClient, 'get', return_value=_activity("a1", "running")):
+            future = self.client.wait_async("a1", timeout_minutes=0.001, policy=FAST)
+            with self.assertRaises(TimeoutError):
+                future.result(timeout=5)
+
+    def test_result_timeout_does_not_cancel(self):
+        with patch.object(ActivityClient, 'get', return_value=_activity("a1", "running")), \
+                patch.object(ActivityClient, 'cancel') as mock_cancel:
+            future = self.client.wait_async("a1", policy=FAST)
+            with self.assertRaises(FutureTimeoutError):
+                future.result(timeout=0.05)
+            self.assertFalse(future.done())
+            mock_cancel.assert_not_called()
+
+
+class TestAssetsFutures(unittest.TestCase):
+    def setUp(self):
+        self.background = BackgroundPoller(policy=FAST)
+        self.mock_api_client = MagicMock()
+        self.mock_api_client.background.return_value = self.background
+        self.client = AssetsClient(self.mock_api_client, "portfolios")
+
+    def tearDown(self):
+        self.background.close()
+
+    @patch('api_call.arium.api.client_assets.request')
+    def test_create_async(self, mock_request):
+        mock_request.encode_payload.return_value = b"data"
+        mock_request.asset_post.return_value = {"id": "p1", "status": "uploading"}
+        mock_request.asset_poll_status.side_effect = [
+            PollStatus(False, {"id": "p1", "status": "processing"}),
+            PollStatus(True, {"id": "p1", "status": "uploaded"}),
+        ]
+
+        future = self.client.create_async("name", {"a": 1}, policy=FAST)
+
+        self.assertEqual(future.result(timeout=5), {"id": "p1", "status": "uploaded"})
+        self.assertFalse(mock_request.asset_post.call_args.kwargs["wait"])
+        mock_request.asset_poll_status.assert_called_with(self.mock_api_client, "portfolios", "p1")
+
+    @patch('api_call.arium.api.client_assets.request')
+    def test_create_async_upload_error(self, mock_request):
+        mock_request.asset_post.side_effect = Exception("upload failed")
+
+        future = self.client.create_async("name", {"a": 1}, policy=FAST)
+
+        with self.assertRaisesRegex(Exception, "upload failed"):
+            future.result(timeout=5)
+        mock_request.asset_poll_status.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+import sys
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call import global_client
+from api_call.global_client import ClientRegistry, UnknownWorkspaceError
+
+SETTINGS = {
+    "client_id": "client",
+    "client_secret": "secret",
+    "token_url": "https://auth.test.com/token",
+    "base_uri": "https://api.test.com/api",
+    "authorization_code": False,
+}
+
+
+def _token():
+    return {
+        "access_token": "access",
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "expires_at": time.time() + 3600,
+    }
+
+
+class TestClientRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ClientRegistry(settings=SETTINGS)
+
+    @patch('auth.okta_auth.OAuth2Session.fetch_token', return_value=_token())
+    def test_clients_share_transport(self, mock_fetch_token):
+        first = self.registry.add("ws1", "basic")
+        second = self.registry.add("ws2", "basic")
+
+        self.assertIs(first.transport, self.registry.transport)
+        self.assertIs(second.transport, self.registry.transport)
+        self.assertIs(
+            first._auth.client.get_adapter("https://api.test.com"),
+            second._auth.client.get_adapter("https://api.test.com"),
+        )
+        self.assertEqual(self.registry.get("ws2").get_workspace(), "ws2")
+        self.assertEqual(self.registry.workspaces(), ["ws1", "ws2"])
+
+    @patch('auth.okta_auth.OAuth2Session.fetch_token', return_value=_token())
+    def test_tenant_and_role_authenticated_once(self, mock_fetch_token):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(executor.map(lambda _: self.registry.add("ws1", "basic"), range(16)))
+
+        mock_fetch_token.assert_called_once()
+        self.assertTrue(all(client is clients[0] for client in clients))
+
+    @patch('auth.okta_auth.OAuth2Session.fetch_token', return_value=_token())
+    def test_unknown_workspace(self, mock_fetch_token):
+        self.registry.add("ws1", "basic")
+
+        with self.assertRaises(UnknownWorkspaceError):
+            self.registry.get("ws2")
+        with self.assertRaises(UnknownWorkspaceError):
+            self.registry.get("ws1", role="admin")
+
+    @patch('auth.okta_auth.OAuth2Session.fetch_token', return_value=_token())
+    def test_several_roles_require_role(self, mock_fetch_token):
+        basic = self.registry.add("ws1", "basic")
+        admin = self.registry.add("ws1", "admin")
+
+        self.assertIs(self.registry.get("ws1", role="admin"), admin)
+        self.assertIs(self.registry.get("ws1", role="basic"), basic)
+        with self.assertRaises(ValueError):
+            self.registry.get("ws1")
+
+        self.registry.remove("ws1", role="admin")
+        self.assertIs(self.registry.get("ws1"), basic)
+
+
+class TestGlobalClient(unittest.TestCase):
+    def setUp(self):
+        global_client.registry = None
+
+    def tearDown(self):
+        global_client.registry = None
+
+    def test_get_client_fails_on_unknown_workspace(self):
+        client = MagicMock()
+        global_client.set_client(client, "ws1")
+
+        self.assertIs(global_client.get_client("ws1"), client)
+        with self.assertRaises(UnknownWorkspaceError):
+            global_client.get_client("ws2")
+
+    def test_registered_client_keeps_its_transport(self):
+        client = MagicMock()
+        transport = client.transport
+        with patch('api_call.global_client.Transport') as mock_transport:
+            global_client.set_client(client, "ws1")
+            global_client.get_client("ws1")
+
+        mock_transport.assert_not_called()
+        self.assertIs(global_client.get_client("ws1").transport, transport)
+
+    def test_get_client_without_clients(self):
+        with self.assertRaises(UnknownWorkspaceError):
+            global_client.get_client("ws1")
+
+
+if __name__ == '__main__':
+    unittest.main()
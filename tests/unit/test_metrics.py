@@ -0,0 +1,140 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.arium.api.hooks import AFTER_RESPONSE, BEFORE_REQUEST, Hooks
+from api_call.arium.api.metrics import Histogram, MetricsCollector, endpoint_name
+from api_call.arium.api.poller import PollingPolicy, PollStatus, poll
+from api_call.arium.api.retry_policy import RetryPolicy
+from api_call.arium.api.transport import Transport
+
+URL = "https://api.test.com/api/ws1/activity/5f0c7a9e-1d2b-4c3d-8e9f-0a1b2c3d4e5f"
+
+
+def _response(status_code, content=b""):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {}
+    response.content = content
+    return response
+
+
+class TestEndpointName(unittest.TestCase):
+    def test_ids_and_query_removed(self):
+        self.assertEqual(
+            endpoint_name("GET", URL + "?X-Amz-Signature=secret"),
+            "GET api.test.com/api/ws1/activity/{id}",
+        )
+        self.assertEqual(
+            endpoint_name("GET", "https://api.test.com/api/ws1/portfolios/123/data"),
+            "GET api.test.com/api/ws1/portfolios/{id}/data",
+        )
+        self.assertEqual(
+            endpoint_name("POST", "https://api.test.com/api/ws1/calculations"),
+            "POST api.test.com/api/ws1/calculations",
+        )
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles(self):
+        histogram = Histogram(buckets=(0.1, 1.0, 10.0))
+        for value in [0.05] * 90 + [0.5] * 9 + [20.0]:
+            histogram.observe(value)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(0.95), 1.0)
+        self.assertEqual(histogram.quantile(1.0), 20.0)
+        self.assertEqual(histogram.to_dict()["buckets"]["inf"], 1)
+
+
+class TestMetricsCollector(unittest.TestCase):
+    def setUp(self):
+        self.sleep = MagicMock()
+        self.transport = Transport(retry_policy=RetryPolicy(budget=None, sleep=self.sleep))
+        self.metrics = MetricsCollector().install(self.transport.hooks)
+
+    def test_requests_and_retries(self):
+        fun = MagicMock(side_effect=[_response(503), _response(200, b"abcd")])
+
+        response = self.transport.send(fun, "GET", URL + "?token=secret")
+
+        self.assertEqual(response.status_code, 200)
+        snapshot = self.metrics.snapshot()
+        endpoint = snapshot["endpoints"]["GET api.test.com/api/ws1/activity/{id}"]
+        self.assertEqual(endpoint["requests"], 2)
+        self.assertEqual(endpoint["statuses"], {"503": 1, "200": 1})
+        self.assertEqual(endpoint["retries"], 1)
+        self.assertEqual(endpoint["bytes_received"], 4)
+        self.assertEqual(snapshot["totals"]["requests"], 2)
+
+    def test_bytes_sent_and_errors(self):
+        fun = MagicMock(side_effect=[ValueError("broken"), _response(200)])
+
+        with self.assertRaises(ValueError):
+            self.transport.send(fun, "PUT", "https://storage.test.com/upload", data=b"12345")
+
+        endpoint = self.metrics.snapshot()["endpoints"]["PUT storage.test.com/upload"]
+        self.assertEqual(endpoint["statuses"], {"ValueError": 1})
+        self.assertEqual(endpoint["bytes_sent"], 5)
+
+    def test_uninstall(self):
+        self.metrics.uninstall()
+        self.transport.send(MagicMock(return_value=_response(200)), "GET", URL)
+
+        self.assertEqual(self.metrics.snapshot()["totals"]["requests"], 0)
+
+    def test_polls(self):
+        statuses = iter([PollStatus(False), PollStatus(False), PollStatus(True, "done")])
+        policy = PollingPolicy(initial=1.0, factor=1.0, jitter=0.0)
+
+        value = poll(
+            lambda: next(statuses),
+            policy=policy,
+            sleep=MagicMock(),
+            on_poll=self.transport.hooks.poll_tick,
+        )
+
+        self.assertEqual(value, "done")
+        polls = self.metrics.snapshot()["polls"]
+        self.assertEqual(polls["polls"], 3)
+        self.assertEqual(polls["completed"], 1)
+        self.assertEqual(polls["wait_seconds"], 2.0)
+
+    def test_json_snapshot(self):
+        self.transport.send(MagicMock(return_value=_response(200)), "GET", URL)
+
+        snapshot = json.loads(self.metrics.to_json())
+
+        self.assertEqual(snapshot["totals"]["requests"], 1)
+        self.assertIn("p95", snapshot["endpoints"]["GET api.test.com/api/ws1/activity/{id}"]["latency"])
+
+
+class TestHooks(unittest.TestCase):
+    def test_failing_hook_is_ignored(self):
+        hooks = Hooks()
+        hooks.add(BEFORE_REQUEST, MagicMock(side_effect=RuntimeError("broken")))
+        after = MagicMock()
+        hooks.add(AFTER_RESPONSE, after)
+        transport = Transport(hooks=hooks)
+
+        with self.assertLogs("api_call.arium.api.hooks", level="WARNING"):
+            response = transport.send(MagicMock(return_value=_response(200)), "GET", URL)
+
+        self.assertEqual(response.status_code, 200)
+        event = after.call_args[0][0]
+        self.assertEqual(event.status, 200)
+        self.assertEqual(event.url, URL)
+
+    def test_unknown_hook(self):
+        with self.assertRaises(ValueError):
+            Hooks().add("on_everything", MagicMock())
+
+
+if __name__ == '__main__':
+    unittest.main()
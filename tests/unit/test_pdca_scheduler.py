@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+import sys
+
+# Ensure src and the fake server are in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_server import FakeAriumServer
+from api_call.arium.api.hooks import ON_POLL
+from api_call.arium.api.poller import PollingPolicy
+from api_call.arium.pdca_data_processing.pdca import PDCACalcScheduler, generate_batch
+
+FAST = PollingPolicy(initial=0.01, max_interval=0.01, jitter=0)
+
+
+class TestPDCACalcScheduler(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeAriumServer(pdca_polls=2).start()
+        self.client = self.server.client()
+        self.addCleanup(self.server.stop)
+        self.addCleanup(self.client.transport.close)
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+
+    def test_jobs_are_polled_with_the_policy(self):
+        rows = [{"name": f"company {n}", "country": "GB"} for n in range(5)]
+        scheduler = PDCACalcScheduler(self.client, 2, 3, 2, policy=FAST)
+        polls = MagicMock()
+        self.client.transport.hooks.add(ON_POLL, polls)
+
+        list(scheduler.process(generate_batch(rows, 2), 1, 1, self.folder.name, {}))
+
+        self.assertTrue(scheduler.done())
+        # each job answers 202 twice at match and at augment
+        self.assertEqual(self.server.count("GET", "/pdca/result/"), 3 * 2 * 3)
+        self.assertTrue(polls.called)
+        self.assertEqual({call.args[0].key for call in polls.call_args_list}, {"pdca"})
+        self.assertEqual(len(os.listdir(f"{self.folder.name}/match_1/augment_1")), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.arium.api.poller import (
+    Poller,
+    PollingPolicy,
+    PollStatus,
+    PollTimeoutError,
+    parse_retry_after,
+    poll,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def countdown(polls, value=None, retry_after=None):
+    state = {"left": polls}
+
+    def check():
+        state["left"] -= 1
+        return PollStatus(state["left"] <= 0, value, retry_after)
+
+    return check
+
+
+class TestPollingPolicy(unittest.TestCase):
+    def test_exponential_backoff_is_capped(self):
+        policy = PollingPolicy(initial=1, factor=2, max_interval=5, jitter=0)
+        intervals = []
+        interval = None
+        for _ in range(5):
+            interval = policy.next_interval(interval)
+            intervals.append(policy.delay(interval))
+        self.assertEqual(intervals, [1, 2, 4, 5, 5])
+
+    def test_jitter_and_retry_after(self):
+        policy = PollingPolicy(initial=10, jitter=0.5, max_interval=100)
+        for _ in range(50):
+            self.assertTrue(5 <= policy.delay(10) <= 15)
+        self.assertEqual(policy.delay(10, retry_after=60), 60)
+
+    def test_parse_retry_after(self):
+        response = MagicMock()
+        response.headers = {"Retry-After": "7"}
+        self.assertEqual(parse_retry_after(response), 7)
+        response.headers = {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        self.assertEqual(parse_retry_after(response), 0)
+        response.headers = {}
+        self.assertIsNone(parse_retry_after(response))
+
+
+class TestPoller(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.policy = PollingPolicy(initial=1, factor=2, max_interval=4, jitter=0)
+
+    def test_poll_single_target_with_backoff(self):
+        value = poll(countdown(4, "done"), policy=self.policy, clock=self.clock, sleep=self.clock.sleep)
+        self.assertEqual(value, "done")
+        self.assertEqual(self.clock.sleeps, [1, 2, 4])
+
+    def test_retry_after_delays_next_poll(self):
+        poll(countdown(2, retry_after=30), policy=self.policy, clock=self.clock, sleep=self.clock.sleep)
+        self.assertEqual(self.clock.sleeps, [30])
+
+    def test_many_targets_in_one_loop(self):
+        poller = Poller(policy=self.policy, clock=self.clock, sleep=self.clock.sleep)
+        poller.watch("slow", countdown(3, "slow"))
+        poller.watch("fast", countdown(1, "fast"))
+        poller.watch("medium", countdown(2, "medium"))
+
+        self.assertEqual([key for key, _ in poller.as_completed()], ["fast", "medium", "slow"])
+        self.assertEqual(self.clock.sleeps, [1, 2])
+
+    def test_batch_check(self):
+        calls = []
+
+        def batch_check(keys):
+            calls.append(sorted(keys))
+            return {key: PollStatus(len(calls) >= int(key), key) for key in keys}
+
+        poller = Poller(policy=self.policy, batch_check=batch_check, clock=self.clock, sleep=self.clock.sleep)
+        for key in ("1", "2", "3"):
+            poller.watch(key)
+
+        self.assertEqual(dict(poller.as_completed()), {"1": "1", "2": "2", "3": "3"})
+        self.assertEqual(calls, [["1", "2", "3"], ["2", "3"], ["3"]])
+
+    def test_deadline(self):
+        with self.assertRaises(PollTimeoutError):
+            poll(lambda: PollStatus(False), policy=self.policy, timeout=10,
+                 clock=self.clock, sleep=self.clock.sleep)
+        self.assertEqual(self.clock.now, 10)
+
+    def test_check_error_is_raised(self):
+        def check():
+            raise ValueError("failed")
+
+        with self.assertRaises(ValueError):
+            poll(check, policy=self.policy, clock=self.clock, sleep=self.clock.sleep)
+
+
+if __name__ == '__main__':
+    unittest.main()
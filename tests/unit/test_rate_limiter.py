@@ -0,0 +1,125 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.arium.api.rate_limiter import (
+    RateLimit,
+    RateLimiter,
+    TokenBucket,
+    endpoint_family,
+)
+from api_call.arium.api.retry_policy import RetryPolicy
+from api_call.arium.api.transport import Transport
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_endpoint_family(self):
+        self.assertEqual(endpoint_family("https://api.test.com/ws/portfolios/assets/1"), "assets")
+        self.assertEqual(endpoint_family("https://api.test.com/ws/activity/1/cancel"), "activity")
+        self.assertEqual(endpoint_family("https://pdca.test.com/match?schema=1"), "pdca_match")
+        self.assertEqual(endpoint_family("https://pdca.test.com/augment?schema=1"), "pdca_augment")
+        self.assertEqual(endpoint_family("https://pdca.test.com/credits"), "default")
+
+    def test_token_bucket(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+        self.assertAlmostEqual(bucket.reserve(), 1.0)
+        clock.now += 1.0
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+
+    def test_rate_is_enforced(self):
+        clock = FakeClock()
+        limiter = RateLimiter({"assets": RateLimit(rate=10, burst=1)}, clock=clock, sleep=clock.sleep)
+
+        for _ in range(11):
+            with limiter.limit("assets"):
+                pass
+
+        self.assertAlmostEqual(clock.now, 1.0)
+        metrics = limiter.metrics()["assets"]
+        self.assertEqual(metrics["requests"], 11)
+        self.assertEqual(metrics["in_flight"], 0)
+
+    def test_max_in_flight(self):
+        limiter = RateLimiter({"storage": RateLimit(max_in_flight=3)})
+        lock = threading.Lock()
+        active = []
+
+        def call(_):
+            with limiter.limit("storage"):
+                with lock:
+                    active.append(limiter.metrics()["storage"]["in_flight"])
+                time.sleep(0.01)
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(call, range(32)))
+
+        self.assertLessEqual(max(active), 3)
+        self.assertEqual(limiter.metrics()["storage"]["peak_in_flight"], 3)
+
+    def test_transport_records_throttling(self):
+        limiter = RateLimiter()
+        transport = Transport(
+            retry_policy=RetryPolicy(budget=None, sleep=MagicMock()), rate_limiter=limiter
+        )
+        responses = [MagicMock(status_code=429, headers={}), MagicMock(status_code=200, headers={})]
+        fun = MagicMock(side_effect=responses)
+
+        transport.send(fun, "GET", "https://api.test.com/ws/activity/1")
+
+        metrics = limiter.metrics()["activity"]
+        self.assertEqual(metrics["requests"], 2)
+        self.assertEqual(metrics["throttled"], 1)
+
+    def test_streamed_response_holds_the_slot_until_closed(self):
+        limiter = RateLimiter({"storage": RateLimit(max_in_flight=2)})
+        transport = Transport(
+            retry_policy=RetryPolicy(budget=None, sleep=MagicMock()), rate_limiter=limiter
+        )
+        fun = MagicMock(side_effect=lambda **kwargs: MagicMock(status_code=200, headers={}))
+
+        first = transport.send(fun, "GET", "https://storage.test.com/a", family="storage", stream=True)
+        second = transport.send(fun, "GET", "https://storage.test.com/b", family="storage", stream=True)
+        self.assertEqual(limiter.metrics()["storage"]["in_flight"], 2)
+
+        third = []
+        thread = threading.Thread(target=lambda: third.append(
+            transport.send(fun, "GET", "https://storage.test.com/c", family="storage", stream=True)
+        ))
+        thread.start()
+        thread.join(0.05)
+        self.assertEqual(third, [])
+
+        first.close()
+        first.close()
+        thread.join(5)
+        self.assertEqual(len(third), 1)
+        second.close()
+        third[0].close()
+        self.assertEqual(limiter.metrics()["storage"]["in_flight"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,267 @@
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from http import HTTPStatus
+from unittest.mock import MagicMock
+import sys
+
+# Ensure src and the fake server are in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fake_server import FakeAriumServer, Reply
+from api_call.arium.api.client_activity import ReportsClient
+from api_call.arium.api.exceptions import AriumAPACResponseException
+from api_call.arium.api.remote_file import RemoteFile, is_remote
+from api_call.arium.api.request import spool_response
+from api_call.arium.api.retry_policy import RetryPolicy
+
+
+def _zip(files: dict) -> bytes:
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for name, content in files.items():
+            zip_file.writestr(name, content)
+    return data.getvalue()
+
+
+ARCHIVE = _zip({
+    "summary.csv": "a,b\n1,2\n",
+    "ylt/": "",
+    "ylt/part-0.csv": "EventId|Loss\n1|10.5\n",
+    "ylt/part-1.csv": "EventId|Loss\n2|20.5\n",
+})
+
+
+class TestSpoolResponse(unittest.TestCase):
+    def _response(self, headers):
+        response = MagicMock()
+        response.headers = headers
+        response.iter_content.side_effect = lambda chunk_size: iter([b"ab", b"cd"])
+        return response
+
+    def test_spill_policy(self):
+        for headers, size, expected in (
+                ({"Content-Length": "4"}, None, io.BytesIO),
+                ({"Content-Length": "4"}, 100, io.BytesIO),
+                ({}, 4, io.BytesIO),
+                ({"Content-Length": "5"}, None, io.BufferedRandom),
+                ({}, None, tempfile.SpooledTemporaryFile),
+        ):
+            with self.subTest(headers=headers, size=size):
+                with spool_response(self._response(headers), spill_size=4, size=size) as file:
+                    self.assertIsInstance(file, expected)
+                    self.assertEqual(file.read(), b"abcd")
+
+
+class TestReports(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeAriumServer().start()
+        self.server.blobs["reports/a1/report.zip"] = ARCHIVE
+        self.client = self.server.client(retry_policy=RetryPolicy(budget=None, sleep=MagicMock()))
+
+    def tearDown(self):
+        self.client.transport.close()
+        self.server.stop()
+
+    def _report(self, spill_size):
+        return ReportsClient(self.client, "a1", spill_size=spill_size).list()[0]
+
+    def test_fetch_in_memory_or_spilled(self):
+        for spill_size, in_memory in ((len(ARCHIVE), True), (len(ARCHIVE) - 1, False)):
+            with self.subTest(spill_size=spill_size):
+                report = self._report(spill_size)
+
+                self.assertEqual(isinstance(report.archive(), io.BytesIO), in_memory)
+                self.assertEqual(report.archive().read(), ARCHIVE)
+                self.assertEqual(report.bytes().getvalue(), ARCHIVE)
+                self.assertEqual(self.server.count("GET", "/storage/reports/a1/"), 1)
+                self.server.requests.clear()
+
+    def test_files(self):
+        report = self._report(0)
+
+        files = dict(report.files())
+        self.assertEqual(list(files), ["summary.csv", "ylt/part-0.csv", "ylt/part-1.csv"])
+        # the files are read after the iteration, in any order
+        self.assertEqual(files["ylt/part-1.csv"].read(), b"EventId|Loss\n2|20.5\n")
+        self.assertEqual(files["summary.csv"].read(), b"a,b\n1,2\n")
+
+        self.assertEqual([name for name, _ in report.files("ylt/*")], ["ylt/part-0.csv", "ylt/part-1.csv"])
+        self.assertEqual([name for name, _ in report.files(["summary.csv"])], ["summary.csv"])
+        self.assertEqual(list(report.rows("summary.csv")), [["a", "b"], ["1", "2"]])
+
+    def test_download(self):
+        report = self._report(0)
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "report.zip")
+            report.download(path)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), ARCHIVE)
+
+    def test_expired_link(self):
+        report = self._report(0)
+        # the storage refuses the presigned link
+        forbidden = lambda request: Reply(HTTPStatus.FORBIDDEN)
+        self.server._routes = [
+            (method, pattern, forbidden if pattern.pattern.startswith("/storage") else handler)
+            for method, pattern, handler in self.server._routes
+        ]
+
+        with self.assertRaises(AriumAPACResponseException):
+            report.archive()
+
+
+class TestRemoteFile(unittest.TestCase):
+    def test_read(self):
+        data = bytes(range(256)) * 4
+        ranges = []
+
+        def get(url, headers):
+            first, last = (int(n) for n in headers["Range"][len("bytes="):].split("-"))
+            ranges.append((first, last))
+            response = MagicMock(status_code=206, content=data[first:last + 1])
+            response.__enter__.return_value = response
+            return response
+
+        file = RemoteFile(get, "url", len(data), tail=data[-100:])
+
+        file.seek(-50, io.SEEK_END)
+        self.assertEqual(file.read(), data[-50:])
+        self.assertEqual(ranges, [])
+        file.seek(10)
+        self.assertEqual(file.read(20), data[10:30])
+        self.assertEqual(file.read(), data[30:])
+        self.assertEqual(ranges, [(10, 29), (30, len(data) - 1)])
+        self.assertEqual((file.requests, file.received), (2, 100 + len(data) - 10))
+
+
+class TestRemoteReports(unittest.TestCase):
+    LARGE = 8 * 1024 * 1024
+
+    def setUp(self):
+        self.archive = io.BytesIO()
+        with zipfile.ZipFile(self.archive, "w") as zip_file:
+            zip_file.writestr("ylt/part-0.csv", os.urandom(self.LARGE))
+            zip_file.writestr("summary.csv", "a,b\n1,2\n")
+            zip_file.writestr("ylt/part-1.csv", os.urandom(self.LARGE))
+
+    def _client(self, **kwargs):
+        server = FakeAriumServer(**kwargs).start()
+        server.blobs["reports/a1/report.zip"] = self.archive.getvalue()
+        client = server.client(retry_policy=RetryPolicy(budget=None, sleep=MagicMock()))
+        self.addCleanup(server.stop)
+        self.addCleanup(client.transport.close)
+        return server, ReportsClient(client, "a1")
+
+    def test_selected_file_only_is_downloaded(self):
+        server, reports = self._client()
+        report = reports.list()[0]
+
+        self.assertEqual([(name, file.read()) for name, file in report.files("summary.csv")],
+                         [("summary.csv", b"a,b\n1,2\n")])
+        self.assertEqual(list(report.rows("summary.csv")), [["a", "b"], ["1", "2"]])
+        self.assertIsNone(report._content)
+
+        file = reports.open("report.zip")
+        self.assertTrue(is_remote(file))
+        with zipfile.ZipFile(file) as zip_file:
+            self.assertEqual(zip_file.read("summary.csv"), b"a,b\n1,2\n")
+        self.assertLess(file.raw.received, 2 * 1024 * 1024)
+
+    def test_whole_file_is_downloaded_without_ranges(self):
+        server, reports = self._client(ranges=False)
+        report = reports.list()[0]
+
+        self.assertEqual(list(report.rows("summary.csv")), [["a", "b"], ["1", "2"]])
+        self.assertEqual(len(dict(report.files())), 3)
+        self.assertEqual(server.count("GET", "/storage/"), 1)
+        self.assertFalse(is_remote(report._content))
+
+
+class TestReportDownload(unittest.TestCase):
+    def setUp(self):
+        self.data = os.urandom(3 * 1024 * 1024 + 100)
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.path = os.path.join(self.folder.name, "report.zip")
+
+    def _report(self, size=None, **kwargs):
+        self.server = FakeAriumServer(**kwargs).start()
+        self.server.blobs["reports/a1/report.zip"] = self.data
+        client = self.server.client(retry_policy=RetryPolicy(budget=None, sleep=MagicMock()))
+        self.addCleanup(self.server.stop)
+        self.addCleanup(client.transport.close)
+        report = ReportsClient(client, "a1").list()[0]
+        if size is not None:
+            report.size = size
+        return report
+
+    def _statuses(self):
+        return [status for method, path, status in self.server.requests if path.startswith("/storage/")]
+
+    def _downloaded(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def test_resume_after_interruptions(self):
+        report = self._report()
+        self.server.cut_next(after=1024 * 1024, count=2)
+
+        report.download(self.path)
+
+        self.assertEqual(self._downloaded(), self.data)
+        self.assertEqual(self._statuses(), [200, 206, 206])
+        self.assertFalse(os.path.exists(self.path + ".part"))
+
+    def test_resume_without_ranges(self):
+        report = self._report(ranges=False)
+        self.server.cut_next(after=1024 * 1024)
+
+        report.download(self.path)
+
+        self.assertEqual(self._downloaded(), self.data)
+        self.assertEqual(self._statuses(), [200, 200])
+
+    def test_no_resume(self):
+        report = self._report()
+        self.server.cut_next(after=1024 * 1024)
+
+        with self.assertRaises(Exception):
+            report.download(self.path, resume=False)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(self._statuses(), [200])
+
+    def test_continue_part_file(self):
+        for part, statuses in ((self.data[:1000], [206]), (self.data, []), (self.data + b"x", [200])):
+            with self.subTest(part=len(part)):
+                report = self._report()
+                with open(self.path + ".part", "wb") as f:
+                    f.write(part)
+
+                report.download(self.path)
+
+                self.assertEqual(self._downloaded(), self.data)
+                self.assertEqual(self._statuses(), statuses)
+
+    def test_no_progress(self):
+        report = self._report()
+        self.server.cut_next(after=0, count=10)
+
+        with self.assertRaises(Exception):
+            report.download(self.path)
+        self.assertEqual(len(self._statuses()), RetryPolicy().max_attempts)
+
+    def test_size_check(self):
+        report = self._report(size=len(self.data) + 1)
+
+        with self.assertRaises(ValueError):
+            report.download(self.path)
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
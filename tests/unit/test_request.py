@@ -0,0 +1,177 @@
+import hashlib
+import io
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.arium.api import request
+from api_call.arium.api.text_file import NormalizedTextFile
+
+
+def streamed_response(chunks, headers=None, status_code=200):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.iter_content.side_effect = lambda chunk_size: iter(chunks)
+    response.__enter__.return_value = response
+    return response
+
+
+class TestAssetData(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.verify = True
+
+    def test_iter_data_follows_presigned_location(self):
+        self.client.get_request.return_value = streamed_response(
+            [], headers={"Location": "https://storage.test.com/payload"}
+        )
+        self.client.transport.get.return_value = streamed_response([b"ab", b"cd"])
+
+        chunks = list(request.asset_iter_data(self.client, "scenarios", "1", chunk_size=2))
+
+        self.assertEqual(chunks, [b"ab", b"cd"])
+        self.client.get_request.assert_called_once_with(
+            endpoint="/{tenant}/scenarios/assets/1/payload?assetPayloadMode=auto",
+            stream=True,
+        )
+        self.client.transport.get.assert_called_once_with(
+            url="https://storage.test.com/payload", stream=True, verify=True
+        )
+
+    def test_get_data_streams_direct_payload_to_file(self):
+        self.client.get_request.return_value = streamed_response([b"a,b\n", b"1,2\n"])
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "portfolio.csv")
+            result = request.asset_get_data(self.client, "portfolios", "1", path=path)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"a,b\n1,2\n")
+
+        self.assertEqual(result, path)
+        self.client.transport.get.assert_not_called()
+
+    def test_failed_download_keeps_existing_file(self):
+        def interrupted(chunk_size):
+            yield b"a,b\n"
+            raise ConnectionError("connection dropped")
+
+        for response in (streamed_response([], status_code=404), streamed_response([])):
+            if response.status_code == 200:
+                response.iter_content.side_effect = interrupted
+            self.client.get_request.return_value = response
+            with self.subTest(status=response.status_code), tempfile.TemporaryDirectory() as folder:
+                path = os.path.join(folder, "portfolio.csv")
+                with open(path, "wb") as f:
+                    f.write(b"previous")
+
+                with self.assertRaises(Exception):
+                    request.asset_get_data(self.client, "portfolios", "1", path=path)
+
+                with open(path, "rb") as f:
+                    self.assertEqual(f.read(), b"previous")
+                self.assertEqual(os.listdir(folder), ["portfolio.csv"])
+
+    def test_iter_data_raises_on_error_status(self):
+        self.client.get_request.return_value = streamed_response([], status_code=404)
+        with self.assertRaises(request.AriumAPACResponseException):
+            list(request.asset_iter_data(self.client, "scenarios", "1"))
+
+
+class TestAssetPost(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        post_response = MagicMock()
+        post_response.status_code = 200
+        post_response.headers = {"Location": "https://storage.test.com/upload"}
+        post_response.content = b'{"id": "new-id"}'
+        self.client.post_request.return_value = post_response
+        get_response = MagicMock()
+        get_response.status_code = 200
+        get_response.headers = {}
+        get_response.content = b'{"id": "new-id", "status": "active"}'
+        self.client.get_request.return_value = get_response
+
+    def test_file_upload_streams_file_with_single_pass_digest(self):
+        content = b"name,limit\n" + b"a,1\n" * 1000
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "portfolio.csv")
+            with open(path, "wb") as f:
+                f.write(content)
+
+            def put(url, data, verify):
+                self.assertEqual(len(data), len(content) - 1)
+                self.assertEqual(data.read(), content.strip())
+
+            self.client.transport.put.side_effect = put
+            asset = request.asset_post(
+                self.client, "portfolios", "p1", file=path, presigned=True, wait=False
+            )
+
+        endpoint = self.client.post_request.call_args.kwargs["endpoint"]
+        self.assertIn(f"digest={hashlib.sha1(content.strip()).hexdigest()}", endpoint)
+        self.client.transport.put.assert_called_once()
+        self.assertEqual(asset["status"], "active")
+
+    def test_crlf_file_is_uploaded_as_data(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "portfolio.csv")
+            with open(path, "wb") as f:
+                f.write(b"\r\n a,b\r\n1,2\r3,4\r\n\r\n")
+            with open(path, encoding="utf8") as f:
+                data = f.read()
+
+            uploads = []
+            self.client.transport.put.side_effect = lambda url, data, verify: uploads.append(
+                data if isinstance(data, bytes) else data.read()
+            )
+            request.asset_post(self.client, "portfolios", "p1", file=path, presigned=True, wait=False)
+            request.asset_post(self.client, "portfolios", "p1", data=data, presigned=True, wait=False)
+
+        self.assertEqual(uploads, [b"a,b\n1,2\n3,4"] * 2)
+        file_endpoint, data_endpoint = (call.kwargs["endpoint"] for call in self.client.post_request.call_args_list)
+        self.assertEqual(file_endpoint, data_endpoint)
+
+    def test_data_upload_is_encoded_once(self):
+        request.asset_post(self.client, "portfolios", "p1", data=" a,b\n", presigned=True, wait=False)
+
+        endpoint = self.client.post_request.call_args.kwargs["endpoint"]
+        self.assertIn(f"digest={hashlib.sha1(b'a,b').hexdigest()}", endpoint)
+        self.assertEqual(self.client.transport.put.call_args.kwargs["data"], b"a,b")
+
+    def test_file_upload_requires_presigned(self):
+        with self.assertRaises(Exception):
+            request.asset_post(self.client, "portfolios", "p1", file="portfolio.csv")
+
+
+class TestNormalizedTextFile(unittest.TestCase):
+    def test_read_in_chunks(self):
+        content = b" \t\r\nname,limit\r\na,1\r\rb,2\n  \r\n" * 3 + b"\r\n\t "
+        expected = content.decode("utf8").replace("\r\n", "\n").replace("\r", "\n").strip().encode("utf8")
+        for chunk_size in (1, 2, 3, 7, 1024):
+            with self.subTest(chunk_size=chunk_size):
+                file = NormalizedTextFile(io.BytesIO(content), chunk_size=chunk_size)
+                self.assertEqual(file.read(), expected)
+                self.assertEqual(len(file), len(expected))
+
+    def test_seek(self):
+        source = io.BytesIO(b"header\n  a\r\nb\r\n")
+        source.seek(7)
+        file = NormalizedTextFile(source, chunk_size=2)
+
+        self.assertEqual(len(file), 3)
+        self.assertEqual(file.seek(2), 2)
+        self.assertEqual(file.read(), b"b")
+        file.seek(0)
+        self.assertEqual(file.read(), b"a\nb")
+        self.assertEqual(file.seek(-2, io.SEEK_END), 1)
+        self.assertEqual(file.read(), b"\nb")
+
+
+if __name__ == '__main__':
+    unittest.main()
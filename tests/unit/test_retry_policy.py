@@ -0,0 +1,147 @@
+import io
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+import requests
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.arium.api.retry_policy import RetryBudget, RetryPolicy
+from api_call.arium.api.transport import Transport
+
+
+def _response(status_code, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        self.sleep = MagicMock()
+        self.policy = RetryPolicy(max_attempts=4, budget=None, sleep=self.sleep)
+
+    def test_classification(self):
+        self.assertTrue(self.policy.is_retryable("GET", _response(503)))
+        self.assertTrue(self.policy.is_retryable("PUT", _response(502)))
+        self.assertFalse(self.policy.is_retryable("GET", _response(500)))
+        self.assertFalse(self.policy.is_retryable("GET", _response(404)))
+        self.assertTrue(self.policy.is_retryable("POST", _response(429)))
+        self.assertFalse(self.policy.is_retryable("POST", _response(502)))
+        self.assertTrue(self.policy.is_retryable("GET", exception=requests.exceptions.ReadTimeout()))
+        self.assertFalse(self.policy.is_retryable("POST", exception=requests.exceptions.ReadTimeout()))
+        self.assertTrue(self.policy.is_retryable("POST", exception=requests.exceptions.ConnectTimeout()))
+        self.assertFalse(self.policy.is_retryable("POST", exception=requests.exceptions.ConnectionError()))
+        self.assertFalse(self.policy.is_retryable("POST", exception=requests.exceptions.ChunkedEncodingError()))
+
+    def test_post_retried_when_connection_not_established(self):
+        for address in ("http://127.0.0.1:1/", "http://arium.invalid/"):
+            with self.subTest(address):
+                try:
+                    requests.post(address, timeout=5)
+                except requests.exceptions.ConnectionError as e:
+                    exception = e
+                self.assertTrue(self.policy.is_retryable("POST", exception=exception))
+        self.assertFalse(self.policy.is_retryable("GET", exception=ValueError()))
+
+    def test_retries_until_success(self):
+        send = MagicMock(side_effect=[_response(503), _response(504), _response(200)])
+
+        response = self.policy.call(send, "GET")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(send.call_count, 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_returns_last_response_after_max_attempts(self):
+        send = MagicMock(return_value=_response(503))
+
+        response = self.policy.call(send, "GET")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(send.call_count, 4)
+
+    def test_raises_last_error(self):
+        send = MagicMock(side_effect=requests.exceptions.ConnectionError("down"))
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.policy.call(send, "GET", max_attempts=2)
+        self.assertEqual(send.call_count, 2)
+
+    def test_post_not_retried_after_gateway_error(self):
+        send = MagicMock(return_value=_response(502))
+
+        self.policy.call(send, "POST")
+
+        send.assert_called_once()
+
+    def test_retry_after(self):
+        send = MagicMock(side_effect=[_response(429, {"Retry-After": "7"}), _response(200)])
+
+        self.policy.call(send, "POST")
+
+        self.sleep.assert_called_once_with(7.0)
+
+    def test_full_jitter_backoff(self):
+        for attempt in range(10):
+            delay = self.policy.backoff(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(self.policy.backoff_max, self.policy.backoff_base * 2 ** attempt))
+
+    def test_budget_stops_retries(self):
+        clock = FakeClock()
+        self.policy.budget = RetryBudget(ratio=0.0, min_per_second=0.0, capacity=2, clock=clock)
+        send = MagicMock(return_value=_response(503))
+
+        self.policy.call(send, "GET")
+        self.assertEqual(send.call_count, 3)
+
+        send.reset_mock()
+        self.policy.call(send, "GET")
+        send.assert_called_once()
+
+
+class TestRetryBudget(unittest.TestCase):
+    def test_deposit_and_refill(self):
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.5, min_per_second=1.0, capacity=1, clock=clock)
+
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+        budget.deposit()
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+        clock.now += 1
+        self.assertTrue(budget.withdraw())
+
+
+class TestTransportRetries(unittest.TestCase):
+    def test_file_body_is_rewound(self):
+        transport = Transport(retry_policy=RetryPolicy(budget=None, sleep=MagicMock()))
+        body = io.BytesIO(b"payload")
+        bodies = []
+
+        def put(url, data, **kwargs):
+            bodies.append(data.read())
+            return _response(503 if len(bodies) == 1 else 200)
+
+        response = transport.send(put, "PUT", "https://storage.test.com/file", data=body)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(bodies, [b"payload", b"payload"])
+
+
+if __name__ == '__main__':
+    unittest.main()
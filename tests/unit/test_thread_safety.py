@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+import sys
+
+import requests
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.arium.api.client_assets import AssetsClient
+from api_call.client import APIClient
+from auth.okta_auth import Auth
+
+WORKERS = 32
+
+SETTINGS = {
+    "client_id": "client",
+    "client_secret": "secret",
+    "token_url": "https://auth.test.com/token",
+    "base_uri": "https://api.test.com/api",
+    "authorization_code": False,
+}
+
+
+def _token(expires_in, access_token):
+    return {
+        "access_token": access_token,
+        "token_type": "Bearer",
+        "expires_in": expires_in,
+        "expires_at": time.time() + expires_in,
+    }
+
+
+def _send(request, **kwargs):
+    time.sleep(0.001)
+    response = requests.Response()
+    response.status_code = 200
+    response.request = request
+    response.url = request.url
+    response._content = request.headers["Authorization"].encode("utf-8")
+    return response
+
+
+class TestSharedAPIClient(unittest.TestCase):
+    @patch('requests.adapters.HTTPAdapter.send', side_effect=_send)
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_requests_from_many_workers(self, mock_fetch_token, mock_send):
+        # the first token expires within the refresh margin, so the first requests renew it
+        mock_fetch_token.side_effect = [_token(5, "old"), _token(3600, "new")]
+        auth = Auth(tenant="ws", role="basic", settings=dict(SETTINGS))
+        client = APIClient(auth=auth)
+
+        def call(i):
+            return client.get_request(endpoint=f"/{{tenant}}/portfolios/assets/{i}").content
+
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            results = list(executor.map(call, range(WORKERS * 10)))
+
+        self.assertEqual(mock_fetch_token.call_count, 2)
+        self.assertEqual(set(results), {b"Bearer new"})
+        self.assertEqual(mock_send.call_count, WORKERS * 10)
+        self.assertIs(auth.client.get_adapter("https://api.test.com/api"), client.transport.adapter)
+
+
+class TestAssetNameCacheThreads(unittest.TestCase):
+    def test_listing_is_loaded_once(self):
+        client = AssetsClient(MagicMock(), "portfolios")
+        calls = []
+
+        def listing(*args, **kwargs):
+            calls.append(1)
+            time.sleep(0.05)
+            return [{"id": str(i), "name": f"asset-{i}"} for i in range(100)]
+
+        with patch.object(AssetsClient, 'list', side_effect=listing):
+            with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+                results = list(executor.map(lambda i: client.get_by_name(f"asset-{i}"), range(WORKERS)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([result[0]["id"] for result in results], [str(i) for i in range(WORKERS)])
+
+    def test_lookups_during_reloads(self):
+        client = AssetsClient(MagicMock(), "portfolios")
+        counter = iter(range(10 ** 6))
+        lock = threading.Lock()
+
+        def listing(*args, **kwargs):
+            with lock:
+                n = next(counter)
+            return [{"id": f"{n}-{i}", "name": f"asset-{i}"} for i in range(50)]
+
+        def work(i):
+            if i % 4 == 0:
+                client.invalidate_cache()
+            found = client.get_by_name("asset-", exact=False)
+            exact = client.get_by_name(f"asset-{i % 50}")
+            return len(found), len(exact)
+
+        with patch.object(AssetsClient, 'list', side_effect=listing):
+            with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+                results = list(executor.map(work, range(WORKERS * 20)))
+
+        self.assertEqual(set(results), {(50, 1)})
+
+
+if __name__ == '__main__':
+    unittest.main()
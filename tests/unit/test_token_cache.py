@@ -0,0 +1,173 @@
+import os
+import stat
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import sys
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from auth.okta_auth import Auth
+from auth.token_cache import TokenCache, is_expired
+
+SETTINGS = {
+    "client_id": "client",
+    "client_secret": "secret",
+    "token_url": "https://auth.test.com/token",
+    "authorization_code": False,
+}
+
+
+def _token(expires_in=3600, refresh_token=None, access_token="access"):
+    token = {
+        "access_token": access_token,
+        "token_type": "Bearer",
+        "expires_in": expires_in,
+        "expires_at": time.time() + expires_in,
+    }
+    if refresh_token:
+        token["refresh_token"] = refresh_token
+    return token
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = TokenCache(os.path.join(self.dir.name, "tokens"))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_save_and_load(self):
+        token = _token()
+        self.cache.save("ws", "basic", "client", token)
+
+        self.assertEqual(self.cache.load("ws", "basic", "client"), token)
+        self.assertIsNone(self.cache.load("ws", "admin", "client"))
+        self.assertIsNone(self.cache.load("other", "basic", "client"))
+
+    @unittest.skipIf(os.name == "nt", "POSIX permissions")
+    def test_permissions(self):
+        self.cache.save("ws", "basic", "client", _token())
+
+        file = self.cache._file(self.cache.key("ws", "basic", "client"))
+        self.assertEqual(stat.S_IMODE(os.stat(file).st_mode), 0o600)
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache.path).st_mode), 0o700)
+
+    def test_remove(self):
+        self.cache.save("ws", "basic", "client", _token())
+        self.cache.remove("ws", "basic", "client")
+        self.cache.remove("ws", "basic", "client")
+
+        self.assertIsNone(self.cache.load("ws", "basic", "client"))
+
+    def test_concurrent_writers(self):
+        def write(i):
+            with self.cache.lock("ws", "basic", "client"):
+                self.cache.save("ws", "basic", "client", _token(access_token=str(i)))
+                return self.cache.load("ws", "basic", "client")["access_token"]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(write, range(32)))
+
+        self.assertEqual(results, [str(i) for i in range(32)])
+
+    def test_is_expired(self):
+        self.assertFalse(is_expired(_token(3600)))
+        self.assertTrue(is_expired(_token(30)))
+        self.assertTrue(is_expired({"access_token": "a"}))
+
+
+class TestAuthTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache = TokenCache(self.dir.name)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _auth(self):
+        return Auth(tenant="ws", role="basic", settings=dict(SETTINGS), token_cache=self.cache)
+
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_token_is_fetched_once(self, mock_fetch_token):
+        mock_fetch_token.return_value = _token()
+
+        first = self._auth()
+        second = self._auth()
+
+        mock_fetch_token.assert_called_once()
+        self.assertEqual(second.client.token["access_token"], first.client.token["access_token"])
+        self.assertEqual(self.cache.load("ws", "basic", "client")["access_token"], "access")
+
+    @patch('auth.okta_auth.OAuth2Session.refresh_token')
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_expired_token_is_refreshed(self, mock_fetch_token, mock_refresh_token):
+        self.cache.save("ws", "basic", "client", _token(expires_in=-10, refresh_token="refresh"))
+        mock_refresh_token.return_value = _token(access_token="refreshed", refresh_token="refresh")
+
+        auth = self._auth()
+
+        mock_fetch_token.assert_not_called()
+        self.assertEqual(mock_refresh_token.call_args.kwargs["refresh_token"], "refresh")
+        self.assertEqual(auth.client.token["access_token"], "refreshed")
+        self.assertEqual(self.cache.load("ws", "basic", "client")["access_token"], "refreshed")
+
+    @patch('auth.okta_auth.OAuth2Session.refresh_token')
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_failed_refresh_falls_back_to_flow(self, mock_fetch_token, mock_refresh_token):
+        self.cache.save("ws", "basic", "client", _token(expires_in=-10, refresh_token="refresh"))
+        mock_refresh_token.side_effect = Exception("invalid_grant")
+        mock_fetch_token.return_value = _token(access_token="new")
+
+        auth = self._auth()
+
+        self.assertEqual(auth.client.token["access_token"], "new")
+        self.assertEqual(self.cache.load("ws", "basic", "client")["access_token"], "new")
+
+    @patch('auth.okta_auth.OAuth2Session.refresh_token')
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_token_is_refreshed_once_by_the_processes(self, mock_fetch_token, mock_refresh_token):
+        mock_fetch_token.return_value = _token(expires_in=30, refresh_token="refresh-1")
+        mock_refresh_token.return_value = _token(access_token="refreshed", refresh_token="refresh-2")
+        first = self._auth()
+        second = self._auth()
+
+        first.refresh(lead_time=60)
+        token = second.refresh(lead_time=60)
+
+        mock_refresh_token.assert_called_once()
+        self.assertEqual(mock_refresh_token.call_args.kwargs["refresh_token"], "refresh-1")
+        self.assertEqual(token["access_token"], "refreshed")
+        self.assertEqual(second.client.token["access_token"], "refreshed")
+        self.assertEqual(self.cache.load("ws", "basic", "client")["access_token"], "refreshed")
+
+    @patch('auth.okta_auth.OAuth2Session.refresh_token')
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_refresh_uses_the_latest_refresh_token(self, mock_fetch_token, mock_refresh_token):
+        mock_fetch_token.return_value = _token(expires_in=30, refresh_token="refresh-1")
+        auth = self._auth()
+        # refreshed by another process, expiring soon too
+        self.cache.save("ws", "basic", "client", _token(expires_in=40, refresh_token="refresh-2"))
+        mock_refresh_token.return_value = _token(access_token="refreshed", refresh_token="refresh-3")
+
+        auth.refresh(lead_time=60)
+
+        self.assertEqual(mock_refresh_token.call_args.kwargs["refresh_token"], "refresh-2")
+        self.assertEqual(self.cache.load("ws", "basic", "client")["refresh_token"], "refresh-3")
+
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_updated_token_is_cached(self, mock_fetch_token):
+        mock_fetch_token.return_value = _token()
+        auth = self._auth()
+
+        auth._token_updated(_token(access_token="updated"))
+
+        self.assertEqual(self.cache.load("ws", "basic", "client")["access_token"], "updated")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from auth.okta_auth import Auth
+from auth.token_refresher import TokenRefresher
+
+SETTINGS = {
+    "client_id": "client",
+    "client_secret": "secret",
+    "token_url": "https://auth.test.com/token",
+    "authorization_code": False,
+}
+
+
+def _token(expires_in=3600, access_token="access", refresh_token=None):
+    token = {
+        "access_token": access_token,
+        "token_type": "Bearer",
+        "expires_in": expires_in,
+        "expires_at": time.time() + expires_in,
+    }
+    if refresh_token:
+        token["refresh_token"] = refresh_token
+    return token
+
+
+class TestAuthRefresh(unittest.TestCase):
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_refresh_is_skipped_for_valid_token(self, mock_fetch_token):
+        mock_fetch_token.return_value = _token()
+        auth = Auth(tenant="ws", role="basic", settings=dict(SETTINGS))
+
+        auth.refresh(lead_time=60)
+
+        mock_fetch_token.assert_called_once()
+
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_refresh_swaps_token(self, mock_fetch_token):
+        mock_fetch_token.side_effect = [_token(), _token(access_token="new")]
+        auth = Auth(tenant="ws", role="basic", settings=dict(SETTINGS))
+        client = auth.client
+
+        auth.refresh(lead_time=7200)
+
+        self.assertIs(auth.client, client)
+        self.assertEqual(auth.client.token["access_token"], "new")
+        self.assertEqual(auth.client.access_token, "new")
+
+    @patch('auth.okta_auth.OAuth2Session.refresh_token')
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_refresh_uses_refresh_token(self, mock_fetch_token, mock_refresh_token):
+        mock_fetch_token.return_value = _token(refresh_token="refresh")
+        mock_refresh_token.return_value = _token(access_token="refreshed", refresh_token="refresh")
+        auth = Auth(tenant="ws", role="basic", settings=dict(SETTINGS))
+
+        auth.refresh(force=True)
+
+        mock_fetch_token.assert_called_once()
+        self.assertEqual(auth.client.access_token, "refreshed")
+
+    @patch('auth.okta_auth.OAuth2Session.fetch_token')
+    def test_concurrent_refresh_fetches_once(self, mock_fetch_token):
+        mock_fetch_token.return_value = _token(expires_in=30)
+        auth = Auth(tenant="ws", role="basic", settings=dict(SETTINGS))
+        mock_fetch_token.return_value = _token()
+
+        threads = [threading.Thread(target=auth.refresh, kwargs={"lead_time": 60}) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(mock_fetch_token.call_count, 2)
+
+
+class TestTokenRefresher(unittest.TestCase):
+    def _auth(self, token):
+        auth = MagicMock()
+        auth.client.token = token
+        return auth
+
+    def test_next_refresh(self):
+        token = _token(expires_in=3600)
+        refresher = TokenRefresher(self._auth(token), lead_time=300, clock=lambda: token["expires_at"] - 3600)
+
+        self.assertAlmostEqual(refresher.next_refresh_in(), 3300)
+
+    def test_lead_time_is_limited_for_short_tokens(self):
+        token = _token(expires_in=120)
+        refresher = TokenRefresher(self._auth(token), lead_time=300)
+
+        self.assertEqual(refresher.effective_lead_time(), 60)
+
+    def test_token_without_expiry(self):
+        refresher = TokenRefresher(self._auth({"access_token": "a"}))
+
+        self.assertIsNone(refresher.next_refresh_in())
+
+    def test_background_refresh(self):
+        auth = self._auth(_token(expires_in=0.2))
+        refreshed = threading.Event()
+
+        def refresh(lead_time):
+            auth.client.token = _token()
+            refreshed.set()
+
+        auth.refresh.side_effect = refresh
+        refresher = TokenRefresher(auth, lead_time=0)
+        refresher.start()
+        try:
+            self.assertTrue(refreshed.wait(5))
+        finally:
+            refresher.stop(timeout=5)
+        self.assertFalse(refresher._thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+
+import requests
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.arium.api.client_activity import ActivityClient
+from api_call.arium.api.poller import PollingPolicy
+from api_call.arium.api.retry_policy import RetryPolicy
+from api_call.arium.api.tracing import NOOP_SPAN, JsonLinesExporter, SpanExporter, Tracer, current_span
+from api_call.arium.api.transport import Transport
+from api_call.arium.model.activity import Activity, ActivitySubmitRequest
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def by_name(self, name):
+        return [span for span in self.spans if span.name == name]
+
+
+def _response(status_code, content=b""):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = {}
+    response.content = content
+    return response
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self):
+        self.exporter = ListExporter()
+        self.tracer = Tracer(self.exporter)
+
+    def test_children(self):
+        with self.tracer.span("parent", job="a") as parent:
+            with self.tracer.span("child") as child:
+                child.add("bytes", 10)
+                child.add("bytes", 5)
+                self.assertIs(current_span(), child)
+            self.assertIs(current_span(), parent)
+
+        self.assertEqual([span.name for span in self.exporter.spans], ["child", "parent"])
+        self.assertEqual(child.parent_id, parent.span_id)
+        self.assertEqual(child.trace_id, parent.trace_id)
+        self.assertIsNone(parent.parent_id)
+        self.assertEqual(child.attributes, {"bytes": 15})
+        self.assertEqual(parent.attributes, {"job": "a"})
+        self.assertIsNotNone(parent.cpu)
+        self.assertGreaterEqual(parent.duration, child.duration)
+
+    def test_error(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.span("failing"):
+                raise ValueError("broken")
+
+        span = self.exporter.spans[0]
+        self.assertEqual(span.status, "error")
+        self.assertEqual(span.error, "ValueError: broken")
+
+    def test_threads_do_not_share_current_span(self):
+        parents = []
+        with self.tracer.span("main"):
+            thread = threading.Thread(target=lambda: parents.append(current_span()))
+            thread.start()
+            thread.join()
+
+        self.assertIs(parents[0], NOOP_SPAN)
+
+    def test_manual_span(self):
+        with self.tracer.span("process") as process:
+            job = self.tracer.start_span("job", parent=process)
+        with self.tracer.use(job):
+            with self.tracer.span("request"):
+                pass
+        job.end()
+        job.end()
+
+        self.assertEqual(self.exporter.by_name("request")[0].parent_id, job.span_id)
+        self.assertEqual(len(self.exporter.by_name("job")), 1)
+
+    def test_disabled(self):
+        tracer = Tracer()
+
+        with tracer.span("operation", job="a") as span:
+            span.add("bytes", 10)
+            self.assertIs(current_span(), NOOP_SPAN)
+
+        self.assertIs(span, NOOP_SPAN)
+        self.assertEqual(span.attributes, {})
+
+    def test_failing_exporter_is_ignored(self):
+        exporter = MagicMock()
+        exporter.export.side_effect = OSError("disk full")
+
+        with self.assertLogs("api_call.arium.api.tracing", level="WARNING"):
+            with Tracer(exporter).span("operation"):
+                pass
+
+    def test_json_lines_exporter(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "spans.jsonl")
+            tracer = Tracer(JsonLinesExporter(path))
+            with tracer.span("parent", activity_id="a1"):
+                with tracer.span("child"):
+                    pass
+
+            with open(path) as file:
+                spans = [json.loads(line) for line in file]
+
+        self.assertEqual([span["name"] for span in spans], ["child", "parent"])
+        self.assertEqual(spans[0]["parent_id"], spans[1]["span_id"])
+        self.assertEqual(spans[1]["attributes"], {"activity_id": "a1"})
+
+
+class TestTransportSpans(unittest.TestCase):
+    def setUp(self):
+        self.exporter = ListExporter()
+        self.transport = Transport(
+            retry_policy=RetryPolicy(budget=None, sleep=MagicMock()),
+            tracer=Tracer(self.exporter),
+        )
+
+    def test_request_attempts_are_child_spans(self):
+        fun = MagicMock(side_effect=[_response(503), _response(200, b"abc")])
+
+        with self.transport.tracer.span("operation") as operation:
+            self.transport.send(fun, "GET", "https://api.test.com/api/ws1/activity?token=secret")
+
+        requests = self.exporter.by_name("HTTP GET")
+        self.assertEqual([span.attributes["attempt"] for span in requests], [1, 2])
+        self.assertEqual([span.attributes["status"] for span in requests], [503, 200])
+        self.assertEqual(requests[1].attributes["bytes_received"], 3)
+        self.assertEqual(requests[1].attributes["url"], "https://api.test.com/api/ws1/activity")
+        self.assertTrue(all(span.parent_id == operation.span_id for span in requests))
+        self.assertEqual(operation.attributes["retries"], 1)
+
+    def test_request_error(self):
+        sent = requests.Request("POST", "https://api.test.com/api/ws1/activity", json={"a": 1}).prepare()
+        fun = MagicMock(side_effect=requests.exceptions.InvalidURL("broken", request=sent))
+
+        with self.assertRaises(requests.exceptions.InvalidURL):
+            self.transport.send(fun, "POST", "https://api.test.com/api/ws1/activity", json={"a": 1})
+
+        span = self.exporter.by_name("HTTP POST")[0]
+        self.assertEqual(span.status, "error")
+        self.assertEqual(span.attributes["bytes_sent"], len(json.dumps({"a": 1})))
+
+    def test_json_body_size_is_taken_from_the_sent_request(self):
+        body = {"name": "é" * 10}
+        response = _response(200)
+        response.request = requests.Request("POST", "https://api.test.com/api/ws1/activity", json=body).prepare()
+
+        self.transport.send(MagicMock(return_value=response), "POST", "https://api.test.com/api/ws1/activity", json=body)
+
+        span = self.exporter.by_name("HTTP POST")[0]
+        self.assertEqual(span.attributes["bytes_sent"], len(response.request.body))
+
+
+class TestActivitySpans(unittest.TestCase):
+    def setUp(self):
+        self.exporter = ListExporter()
+        self.api_client = MagicMock()
+        self.api_client.transport = Transport(tracer=Tracer(self.exporter))
+        self.client = ActivityClient(self.api_client)
+
+    def _activity(self, status):
+        return Activity.from_dict(
+            {"activityId": "a1", "workspace": "ws", "name": "a", "status": status}
+        )
+
+    def test_submit(self):
+        request = MagicMock(spec=ActivitySubmitRequest)
+        request.to_dict.return_value = {}
+
+        with patch('api_call.arium.api.client_activity.get_content',
+                   return_value={"data": {"activityId": "a1"}}), \
+                patch.object(ActivityClient, 'get', return_value=self._activity("queued")):
+            self.client.submit(request)
+
+        submit = self.exporter.by_name("activity.submit")[0]
+        self.assertEqual(submit.attributes, {"wait": False, "activity_id": "a1"})
+
+    def test_wait(self):
+        activities = [self._activity(status) for status in ("queued", "running", "completed")]
+
+        with patch.object(ActivityClient, 'get', side_effect=activities):
+            with self.api_client.transport.tracer.span("job") as job:
+                self.client.wait("a1", policy=PollingPolicy(initial=0.0, jitter=0.0))
+
+        wait = self.exporter.by_name("activity.wait")[0]
+        self.assertEqual(wait.parent_id, job.span_id)
+        self.assertEqual(wait.attributes["activity_id"], "a1")
+        self.assertEqual(wait.attributes["polls"], 3)
+        self.assertEqual(wait.attributes["status"], "completed")
+        self.assertIn("queued_seconds", wait.attributes)
+        self.assertIn("running_seconds", wait.attributes)
+
+
+if __name__ == '__main__':
+    unittest.main()
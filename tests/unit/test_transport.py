@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.arium.api.request import get_content
+from api_call.arium.api.transport import Transport, TimeoutHTTPAdapter
+
+
+class TestTransport(unittest.TestCase):
+    def test_adapter_configuration(self):
+        transport = Transport(pool_connections=4, pool_maxsize=64, timeout=(1, 2))
+        adapter = transport.session.get_adapter("https://storage.test.com/file")
+        self.assertIs(adapter, transport.adapter)
+        self.assertIsInstance(adapter, TimeoutHTTPAdapter)
+        self.assertEqual(adapter._pool_maxsize, 64)
+        self.assertEqual(adapter.timeout, (1, 2))
+
+    def test_mount_shares_adapter(self):
+        transport = Transport(keep_alive=False)
+        session = MagicMock()
+        session.headers = {}
+        transport.mount(session)
+        session.mount.assert_any_call("https://", transport.adapter)
+        self.assertEqual(session.headers["Connection"], "close")
+
+    def test_adapter_default_timeout(self):
+        adapter = TimeoutHTTPAdapter(timeout=(3, 4))
+        with patch('requests.adapters.HTTPAdapter.send') as mock_send:
+            adapter.send(MagicMock())
+            self.assertEqual(mock_send.call_args.kwargs["timeout"], (3, 4))
+            adapter.send(MagicMock(), timeout=9)
+            self.assertEqual(mock_send.call_args.kwargs["timeout"], 9)
+
+    def test_get_content_follows_location_with_transport(self):
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {"Location": "https://storage.test.com/payload"}
+        location_response = MagicMock()
+        location_response.content = b'{"id": "1"}'
+        transport = MagicMock()
+        transport.get.return_value = location_response
+
+        content = get_content(response, transport=transport)
+
+        transport.get.assert_called_once_with(url="https://storage.test.com/payload", verify=True)
+        self.assertEqual(content, {"id": "1"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import hashlib
+import unittest
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.arium.api import request
+from api_call.arium.api.client_assets import AssetsClient, PortfoliosClient
+from api_call.arium.api.upload_index import UploadIndex
+
+
+class TestUploadIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = UploadIndex(":memory:")
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_lookup_add_remove(self):
+        self.assertIsNone(self.index.lookup("ws", "portfolios", "abc", "p1"))
+        self.index.add("ws", "portfolios", "abc", "p1", "id-1")
+        self.assertEqual(self.index.lookup("ws", "portfolios", "abc", "p1")["id"], "id-1")
+        self.assertIsNone(self.index.lookup("ws2", "portfolios", "abc", "p1"))
+        self.assertIsNone(self.index.lookup("ws", "scenarios", "abc", "p1"))
+        self.index.remove("ws", "portfolios", "id-1")
+        self.assertIsNone(self.index.lookup("ws", "portfolios", "abc", "p1"))
+
+    def test_add_replaces_previous_content_of_the_name(self):
+        self.index.add("ws", "portfolios", "abc", "p1", "id-1")
+        self.index.add("ws", "portfolios", "def", "p1", "id-2")
+        self.index.add("ws", "portfolios", "abc", "p2", "id-3")
+        self.assertIsNone(self.index.lookup("ws", "portfolios", "abc", "p1"))
+        self.assertEqual(self.index.lookup("ws", "portfolios", "def", "p1")["id"], "id-2")
+        self.assertEqual(self.index.lookup("ws", "portfolios", "abc", "p2")["id"], "id-3")
+
+
+class TestAssetsClientDedupe(unittest.TestCase):
+    def setUp(self):
+        self.mock_api_client = MagicMock()
+        self.mock_api_client.get_workspace.return_value = "test-tenant"
+        self.index = UploadIndex(":memory:")
+        self.client = AssetsClient(self.mock_api_client, "scenarios", upload_index=self.index)
+
+    def _listed(self, *assets):
+        return patch('api_call.arium.api.client_assets.request.asset_list', return_value=list(assets))
+
+    def test_identical_content_is_uploaded_once(self):
+        server_asset = {"id": "id-1", "name": "e1", "status": "processed", "version": 1}
+        with patch('api_call.arium.api.client_assets.request.asset_post',
+                   return_value={"id": "id-1", "name": "e1", "status": "processed"}) as mock_post, \
+                patch('api_call.arium.api.client_assets.request.asset_get', return_value=server_asset), \
+                self._listed(server_asset):
+            first = self.client.create("e1", {"events": [1, 2]})
+            second = self.client.create("e1", {"events": [1, 2]})
+            self.client.create("e1", {"events": [1, 2, 3]})
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(first["id"], "id-1")
+        self.assertEqual(second, server_asset)
+        self.assertIn("digest", mock_post.call_args.kwargs["params"])
+
+    def test_unprocessed_or_failed_upload_is_not_indexed(self):
+        for status in ("uploading", "processing", "error"):
+            with self.subTest(status), \
+                    patch('api_call.arium.api.client_assets.request.asset_post',
+                          return_value={"id": "id-1", "name": "e1", "status": status}) as mock_post:
+                self.client.create("e1", {"events": [1]}, wait=status != "uploading")
+                self.client.create("e1", {"events": [1]})
+
+            self.assertEqual(mock_post.call_count, 2)
+            digest = mock_post.call_args.kwargs["params"]["digest"]
+            self.assertIsNone(self.index.lookup("test-tenant", "scenarios", digest, "e1"))
+
+    def test_processed_async_upload_is_indexed(self):
+        with patch('api_call.arium.api.client_assets.request.asset_post',
+                   return_value={"id": "id-1", "name": "e1", "status": "uploading"}):
+            self.client.create("e1", {"events": [1]}, wait=False)
+
+        digest = next(iter(self.client._pending_uploads.values()))[1]
+        self.assertIsNone(self.index.lookup("test-tenant", "scenarios", digest, "e1"))
+
+        future = Future()
+        future.set_result({"id": "id-1", "name": "e1", "status": "processed"})
+        self.client._upload_processed("id-1", future)
+
+        self.assertEqual(self.client._pending_uploads, {})
+        self.assertEqual(self.index.lookup("test-tenant", "scenarios", digest, "e1")["id"], "id-1")
+
+    def test_delete_and_rename_invalidate(self):
+        with patch('api_call.arium.api.client_assets.request.asset_post',
+                   return_value={"id": "id-1", "name": "e1", "status": "processed"}) as mock_post, \
+                patch('api_call.arium.api.client_assets.request.asset_get',
+                      return_value={"id": "id-1", "name": "e1", "status": "processed"}), \
+                self._listed({"id": "id-1", "name": "e1"}), \
+                patch('api_call.arium.api.client_assets.request.asset_delete'), \
+                patch('api_call.arium.api.client_assets.request.asset_rename'):
+            self.client.create("e1", {"events": [1]})
+            self.client.delete("id-1")
+            self.client.create("e1", {"events": [1]})
+            self.client.rename("id-1", "e2")
+            self.client.create("e1", {"events": [1]})
+
+        self.assertEqual(mock_post.call_count, 3)
+
+    def test_verify_against_server(self):
+        with patch('api_call.arium.api.client_assets.request.asset_post',
+                   return_value={"id": "id-1", "name": "e1", "status": "processed"}) as mock_post, \
+                patch('api_call.arium.api.client_assets.request.asset_get',
+                      return_value={"id": "id-1", "name": "e1", "status": "error"}), \
+                self._listed({"id": "id-1", "name": "e1"}):
+            self.client.create("e1", {"events": [1]})
+            self.client.create("e1", {"events": [1]})
+
+        self.assertEqual(mock_post.call_count, 2)
+
+    def test_previous_content_is_uploaded_again(self):
+        # the server keeps the last upload of a name as the latest asset
+        assets = {}
+        latest = {}
+
+        def post(asset_name, data, **kwargs):
+            asset = {"id": f"id-{len(assets) + 1}", "name": asset_name, "status": "processed", "data": data}
+            assets[asset["id"]] = latest[asset_name] = asset
+            return asset
+
+        with patch('api_call.arium.api.client_assets.request.asset_post', side_effect=post) as mock_post, \
+                patch('api_call.arium.api.client_assets.request.asset_get',
+                      side_effect=lambda asset_id, **kwargs: assets[asset_id]), \
+                patch('api_call.arium.api.client_assets.request.asset_list',
+                      side_effect=lambda **kwargs: list(latest.values())):
+            self.client.create("x", {"content": "A"})
+            self.client.create("x", {"content": "B"})
+            third = self.client.create("x", {"content": "A"})
+            fourth = self.client.create("x", {"content": "A"})
+
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(third["id"], "id-3")
+        self.assertEqual(fourth, third)
+        self.assertEqual(latest["x"]["data"], {"content": "A"})
+
+    def test_stale_index_entry_is_not_reused(self):
+        # another content was uploaded with the name without this index
+        digest = hashlib.sha1(request.encode_payload({"events": [1]})).hexdigest()
+        self.index.add("test-tenant", "scenarios", digest, "e1", "id-1")
+        with patch('api_call.arium.api.client_assets.request.asset_post',
+                   return_value={"id": "id-3", "name": "e1", "status": "processed"}) as mock_post, \
+                patch('api_call.arium.api.client_assets.request.asset_get',
+                      return_value={"id": "id-1", "name": "e1", "status": "processed"}), \
+                self._listed({"id": "id-2", "name": "e1"}):
+            asset = self.client.create("e1", {"events": [1]})
+
+        mock_post.assert_called_once()
+        self.assertEqual(asset["id"], "id-3")
+
+    def test_portfolio_file_is_deduplicated(self):
+        client = PortfoliosClient(self.mock_api_client)
+        client.upload_index = self.index
+        with patch('api_call.arium.api.client_assets.request.asset_post',
+                   return_value={"id": "id-1", "name": "p1", "status": "processed"}) as mock_post, \
+                patch('api_call.arium.api.client_assets.request.asset_get',
+                      return_value={"id": "id-1", "name": "p1", "status": "processed"}), \
+                self._listed({"id": "id-1", "name": "p1"}):
+            client.create("p1", data="a,b\n1,2")
+            asset = client.create("p1", data="a,b\n1,2")
+
+        mock_post.assert_called_once()
+        self.assertEqual(asset["id"], "id-1")
+
+
+if __name__ == '__main__':
+    unittest.main()
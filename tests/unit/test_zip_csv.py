@@ -0,0 +1,139 @@
+import io
+import os
+import tempfile
+import tracemalloc
+import unittest
+import zipfile
+from unittest.mock import MagicMock
+import sys
+
+# Ensure src is in sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
+
+from api_call.arium.api.request import get_content
+from api_call.arium.api.zip_csv import iter_zip_csv, select_members
+from api_call.arium.model.activity import Report
+
+
+def _zip(files: dict) -> bytes:
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for name, content in files.items():
+            zip_file.writestr(name, content)
+    return data.getvalue()
+
+
+def _response(content: bytes):
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {}
+    response.content = content
+    return response
+
+
+ARCHIVE = _zip({
+    "summary.csv": "a,b\n1,2\n",
+    "ylt/": "",
+    "ylt/part-0.csv": "EventId|Loss\n1|10.5\n",
+    "ylt/part-1.csv": "EventId|Loss\n2|\"20|5\"\n",
+})
+
+
+class TestSelectMembers(unittest.TestCase):
+    def setUp(self):
+        self.zip_file = zipfile.ZipFile(io.BytesIO(ARCHIVE))
+
+    def _names(self, members):
+        return [info.filename for info in select_members(self.zip_file, members)]
+
+    def test_select(self):
+        self.assertEqual(self._names(None), ["summary.csv", "ylt/part-0.csv", "ylt/part-1.csv"])
+        self.assertEqual(self._names("summary.csv"), ["summary.csv"])
+        self.assertEqual(self._names("ylt/*.csv"), ["ylt/part-0.csv", "ylt/part-1.csv"])
+        self.assertEqual(self._names(["ylt/part-1.csv", "summary.csv"]), ["summary.csv", "ylt/part-1.csv"])
+        self.assertEqual(self._names("*.txt"), [])
+
+    def test_missing_name(self):
+        with self.assertRaises(KeyError):
+            select_members(self.zip_file, "missing.csv")
+
+
+class TestIterZipCsv(unittest.TestCase):
+    def test_members_and_delimiters(self):
+        self.assertEqual(list(iter_zip_csv(ARCHIVE, "summary.csv")), [["a", "b"], ["1", "2"]])
+        self.assertEqual(
+            list(iter_zip_csv(ARCHIVE, "ylt/*", delimiter="|", with_member=True)),
+            [
+                ("ylt/part-0.csv", ["EventId", "Loss"]),
+                ("ylt/part-0.csv", ["1", "10.5"]),
+                ("ylt/part-1.csv", ["EventId", "Loss"]),
+                ("ylt/part-1.csv", ["2", "20|5"]),
+            ],
+        )
+
+    def test_detect_delimiter(self):
+        rows = list(iter_zip_csv(ARCHIVE, delimiter=None))
+
+        self.assertEqual(rows[:2], [["a", "b"], ["1", "2"]])
+        self.assertEqual(rows[-1], ["2", "20|5"])
+
+    def test_sources(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "report.zip")
+            with open(path, "wb") as f:
+                f.write(ARCHIVE)
+
+            for source in (path, io.BytesIO(ARCHIVE), zipfile.ZipFile(path)):
+                with self.subTest(type(source).__name__):
+                    self.assertEqual(len(list(iter_zip_csv(source, "summary.csv"))), 2)
+
+    def test_quoted_new_lines(self):
+        archive = _zip({"report.csv": 'id,comment\r\n1,"two\r\nlines"\r\n2,x\r\n'})
+
+        self.assertEqual(list(iter_zip_csv(archive)), [["id", "comment"], ["1", "two\r\nlines"], ["2", "x"]])
+
+    def test_constant_memory(self):
+        rows = 100_000
+        text = "EventId|Portfolio|Loss\n" + "".join(f"{n}|portfolio-{n % 10}|{n * 1.5:.2f}\n" for n in range(rows))
+        archive = io.BytesIO(_zip({"yelt.csv": text}))
+        del text
+
+        tracemalloc.start()
+        count = sum(1 for _ in iter_zip_csv(archive, delimiter="|"))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertEqual(count, rows + 1)
+        self.assertLess(peak, 1024 * 1024)
+
+
+class TestGetContent(unittest.TestCase):
+    def test_first_member_of_zip(self):
+        content = get_content(_response(ARCHIVE), get_from_location=False, csv_content=True)
+
+        self.assertEqual(content, [["a", "b"], ["1", "2"]])
+
+    def test_csv(self):
+        content = get_content(
+            _response(b"a,b\r\n1,2\r\n"), get_from_location=False, csv_content=True, unzip=False
+        )
+
+        self.assertEqual(content, [["a", "b"], ["1", "2"]])
+
+    def test_not_a_zip_is_returned_as_text(self):
+        content = get_content(_response(b"not a zip"), get_from_location=False, csv_content=True)
+
+        self.assertEqual(content, "not a zip")
+
+
+class TestReportRows(unittest.TestCase):
+    def test_rows(self):
+        report = Report(file="report.zip", size=len(ARCHIVE), compressed=True, activityId="a1")
+        report._fetch = lambda: io.BytesIO(ARCHIVE)
+
+        self.assertEqual(list(report.rows("ylt/part-0.csv", delimiter="|")), [["EventId", "Loss"], ["1", "10.5"]])
+        self.assertEqual(len(list(report.rows())), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()